@@ -0,0 +1,604 @@
+"""
+GoalDetector 벤치마크
+게임 화면 없이 합성 프레임 / 녹화 프레임으로 감지 단계별 지연 시간, 메모리, 정확도를 측정
+
+사용법:
+    python benchmark.py alloc                  # 버퍼 재사용 ON/OFF 비교
+    python benchmark.py alloc --width 1920 --height 1080 --iterations 100
+    python benchmark.py lut                    # HSV 변환 vs 색상 룩업 테이블 비교
+    python benchmark.py stripes --workers 4    # 색상 마스크 가로 띠 병렬 처리 비교
+    python benchmark.py tracking               # 후보 추적 중 캡처 영역이 줄어드는지 확인 (아니면 종료 코드 1)
+    python benchmark.py make-corpus corpus/    # 합성 프레임 코퍼스 생성 (라벨 포함)
+    python benchmark.py corpus corpus/         # 녹화 프레임 폴더 재생
+    python benchmark.py corpus run.mp4 --save-baseline baseline.json
+    python benchmark.py corpus corpus/ --baseline baseline.json   # 회귀 시 종료 코드 1
+
+코퍼스 형식:
+    이미지 폴더: *.png / *.jpg / *.bmp (하위 폴더 포함, 이름순)
+        라벨은 폴더의 labels.json ({"파일 상대 경로": true/false})
+        또는 하위 폴더 이름 (goal/ = GOAL, other/ = GOAL 아님)
+    동영상: cv2.VideoCapture로 읽을 수 있는 파일
+        라벨은 같은 이름의 .labels.json ({"goal_frames": [[시작, 끝], ...]}, 끝 포함)
+        라벨 파일이 있으면 구간 밖 프레임은 GOAL 아님
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from capture_backends import FrameBackend
+from goal_detector import GoalDetector
+
+
+# ========================================
+# 합성 프레임
+# ========================================
+
+def synthetic_frame(
+    width: int,
+    height: int,
+    goal: bool,
+    seed: int = 0,
+    banner_ratio: float = 0.4
+) -> np.ndarray:
+    """
+    테스트용 BGR 프레임 생성
+    
+    어두운 노이즈 배경 + (goal=True면) 흰 테두리의 오렌지-골드 GOAL 배너
+    (배너 너비 = 화면 너비 x banner_ratio)
+    """
+    rng = np.random.default_rng(seed)
+    background = (rng.random((max(1, height // 8), max(1, width // 8), 3)) * 120).astype(np.uint8)
+    image = cv2.resize(background, (width, height), interpolation=cv2.INTER_LINEAR)
+    
+    if goal:
+        box_width = int(width * banner_ratio)
+        box_height = box_width // 4
+        x0 = (width - box_width) // 2
+        y0 = int(height * 0.15)
+        cv2.rectangle(image, (x0 - 6, y0 - 6), (x0 + box_width + 6, y0 + box_height + 6), (255, 255, 255), -1)
+        cv2.rectangle(image, (x0, y0), (x0 + box_width, y0 + box_height), (0, 200, 255), -1)
+        cv2.putText(
+            image, "GOAL", (x0 + box_width // 10, y0 + box_height * 4 // 5),
+            cv2.FONT_HERSHEY_SIMPLEX, box_width / 260, (0, 140, 230), max(2, box_width // 60)
+        )
+    return image
+
+
+# ========================================
+# 측정 도구
+# ========================================
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """
+    fn을 반복 실행해서 지연 시간과 호출당 최대 추가 메모리 측정
+    
+    Returns:
+        mean_ms, p50_ms, p95_ms, alloc_kb (호출당 tracemalloc 최대 증가량 평균)
+    """
+    for _ in range(warmup):
+        fn()
+    
+    latencies: List[float] = []
+    peaks: List[int] = []
+    
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - started) * 1000)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "alloc_kb": statistics.fmean(peaks) / 1024,
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    """선형 보간 백분위수 (values가 비어 있으면 0)"""
+    if not values:
+        return 0.0
+    return float(np.percentile(values, q))
+
+
+# ========================================
+# 버퍼 재사용 벤치마크
+# ========================================
+
+def run_alloc_benchmark(width: int, height: int, iterations: int) -> None:
+    """버퍼 재사용 OFF/ON 상태로 각 단계 비교 출력"""
+    frame = synthetic_frame(width, height, goal=True)
+    screen_size = (width, height)
+    
+    print(f"Frame: {width}x{height}, iterations: {iterations}")
+    print(f"{'stage':<16}{'buffers':<10}{'mean ms':>10}{'p95 ms':>10}{'alloc KB':>12}")
+    
+    for reuse in (False, True):
+        detector = GoalDetector(reuse_buffers=reuse)
+        region = detector.get_capture_region(screen_size)
+        roi = frame[region.top:region.top + region.height, region.left:region.left + region.width]
+        offset = (region.left, region.top)
+        
+        stages = {
+            "color": lambda: detector.detect_goal_by_color_and_shape(roi, screen_size, offset),
+            "coarse_to_fine": lambda: detector.detect_goal_coarse_to_fine(roi, screen_size, offset),
+            "edge": lambda: detector.detect_goal_by_edge(roi, screen_size, offset),
+        }
+        for name, fn in stages.items():
+            stats = measure(fn, iterations)
+            print(
+                f"{name:<16}{'reuse' if reuse else 'alloc':<10}"
+                f"{stats['mean_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['alloc_kb']:>12.1f}"
+            )
+
+
+# ========================================
+# 색상 룩업 테이블 벤치마크
+# ========================================
+
+def run_lut_benchmark(width: int, height: int, iterations: int) -> None:
+    """색상 마스크 생성: HSV 변환 + inRange vs 룩업 테이블 (속도/일치율)"""
+    rng = np.random.default_rng(0)
+    frames = {
+        "synthetic": synthetic_frame(width, height, goal=True),
+        "random": rng.integers(0, 256, (height, width, 3), dtype=np.uint8),
+    }
+    hsv_detector = GoalDetector(use_color_lut=False)
+    lut_detector = GoalDetector(use_color_lut=True)
+    
+    started = time.perf_counter()
+    lut_detector.get_color_lut()
+    print(f"LUT build: {(time.perf_counter() - started) * 1000:.1f} ms "
+          f"({1 << (3 * lut_detector.COLOR_LUT_BITS)} entries)")
+    print(f"{'frame':<12}{'hsv ms':>10}{'lut ms':>10}{'mismatch %':>12}")
+    
+    for name, frame in frames.items():
+        hsv_workspace = hsv_detector._workspace(frame.shape)
+        lut_workspace = lut_detector._workspace(frame.shape)
+        
+        # 형태학 처리 전 색상 분류 단계만 비교
+        hsv_stats = measure(lambda: hsv_detector._classify_colors(frame, hsv_workspace), iterations)
+        lut_stats = measure(lambda: lut_detector._classify_colors(frame, lut_workspace), iterations)
+        
+        reference = hsv_detector._classify_colors(frame, hsv_workspace)
+        lut_mask = lut_detector._classify_colors(frame, lut_workspace)
+        mismatch = float(np.mean(reference != lut_mask)) * 100
+        
+        print(f"{name:<12}{hsv_stats['mean_ms']:>10.2f}{lut_stats['mean_ms']:>10.2f}{mismatch:>12.3f}")
+
+
+# ========================================
+# 가로 띠 병렬 처리 벤치마크
+# ========================================
+
+def run_stripe_benchmark(width: int, height: int, iterations: int, workers: int) -> None:
+    """색상 마스크 + 형태학 처리: 한 번에 vs 가로 띠 병렬 (속도/결과 일치 여부)"""
+    frame = synthetic_frame(width, height, goal=True)
+    serial = GoalDetector(stripe_workers=0)
+    striped = GoalDetector(stripe_workers=workers)
+    
+    same = np.array_equal(serial._build_color_mask(frame), striped._build_color_mask(frame))
+    serial_stats = measure(lambda: serial._build_color_mask(frame), iterations)
+    striped_stats = measure(lambda: striped._build_color_mask(frame), iterations)
+    
+    print(f"Frame: {width}x{height}, workers: {workers}, OpenCV threads: {cv2.getNumThreads()}")
+    print(f"{'mode':<10}{'mean ms':>10}{'p95 ms':>10}")
+    print(f"{'serial':<10}{serial_stats['mean_ms']:>10.2f}{serial_stats['p95_ms']:>10.2f}")
+    print(f"{'striped':<10}{striped_stats['mean_ms']:>10.2f}{striped_stats['p95_ms']:>10.2f}")
+    print(f"Masks identical: {same}")
+
+
+class _RecordingFrameBackend(FrameBackend):
+    """캡처 영역 크기를 기록하는 FrameBackend"""
+    
+    def __init__(self, frame: np.ndarray):
+        super().__init__(frame)
+        self.grab_sizes: List[Tuple[int, int]] = []
+    
+    def grab(self, rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        self.grab_sizes.append((rect["width"], rect["height"]))
+        return super().grab(rect, dst)
+
+
+def run_tracking_check(width: int, height: int, ticks: int) -> bool:
+    """
+    캡처 전용 스레드 + 후보 추적: 후보를 찾은 뒤 스레드가 추적 창만 캡처하는지 확인
+    
+    확정되면 추적이 끝나므로 confirm_frames를 틱 수보다 크게 둔다.
+    
+    Returns:
+        추적 중 캡처 영역이 ROI보다 작으면 True
+    """
+    frame = synthetic_frame(width, height, goal=True)
+    last_grab: Dict[bool, Tuple[int, int]] = {}
+    for tracking in (False, True):
+        backend = _RecordingFrameBackend(frame)
+        detector = GoalDetector(capture_backend=backend, use_tracking=tracking, confirm_frames=ticks + 1)
+        detector.start_capture_thread(interval=0.01)
+        try:
+            for _ in range(ticks):
+                detector.check_for_goal()
+                time.sleep(0.05)
+        finally:
+            detector.stop_capture_thread()
+        last_grab[tracking] = backend.grab_sizes[-1]
+    
+    roi_pixels = last_grab[False][0] * last_grab[False][1]
+    tracked_pixels = last_grab[True][0] * last_grab[True][1]
+    print(f"Frame: {width}x{height}, ticks: {ticks}")
+    print(f"ROI grab:      {last_grab[False][0]}x{last_grab[False][1]}")
+    print(f"Tracking grab: {last_grab[True][0]}x{last_grab[True][1]} ({tracked_pixels / roi_pixels:.0%} of ROI)")
+    return tracked_pixels < roi_pixels
+
+
+# ========================================
+# 녹화 프레임 코퍼스 벤치마크
+# ========================================
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+GOAL_DIR_NAMES = ("goal",)
+OTHER_DIR_NAMES = ("other", "none", "negative")
+DEFAULT_TEMPLATE = Path(__file__).parent / "assets" / "goal_template.png"
+
+# 회귀 판정 허용치: 지연 시간/메모리는 기준 대비 비율 + 절대값, 정확도는 절대값
+LATENCY_TOLERANCE = (0.15, 0.5)     # +15% 그리고 +0.5ms 넘게 느려지면 실패
+MEMORY_TOLERANCE = (0.2, 64.0)      # +20% 그리고 +64KB 넘게 늘면 실패
+ACCURACY_TOLERANCE = 0.0            # 정밀도/재현율은 조금이라도 떨어지면 실패
+
+
+def _label_from_dir(relative: Path) -> Optional[bool]:
+    """하위 폴더 이름으로 라벨 판단 (모르면 None)"""
+    for part in relative.parts[:-1]:
+        name = part.lower()
+        if name in GOAL_DIR_NAMES:
+            return True
+        if name in OTHER_DIR_NAMES:
+            return False
+    return None
+
+
+def iter_image_dir(root: Path) -> Iterator[Tuple[str, np.ndarray, Optional[bool]]]:
+    """이미지 폴더 -> (이름, BGR 이미지, 라벨)"""
+    labels_path = root / "labels.json"
+    labels = json.loads(labels_path.read_text(encoding="utf-8")) if labels_path.exists() else {}
+    
+    paths = sorted(p for p in root.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+    for path in paths:
+        relative = path.relative_to(root)
+        name = relative.as_posix()
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"[WARNING] Unreadable frame skipped: {name}")
+            continue
+        label = labels.get(name, _label_from_dir(relative))
+        yield name, image, None if label is None else bool(label)
+
+
+def iter_video(path: Path) -> Iterator[Tuple[str, np.ndarray, Optional[bool]]]:
+    """동영상 -> (프레임 번호, BGR 이미지, 라벨)"""
+    labels_path = path.with_suffix(".labels.json")
+    goal_ranges = None
+    if labels_path.exists():
+        goal_ranges = json.loads(labels_path.read_text(encoding="utf-8")).get("goal_frames", [])
+    
+    video = cv2.VideoCapture(str(path))
+    if not video.isOpened():
+        raise ValueError(f"Cannot open video: {path}")
+    try:
+        index = 0
+        while True:
+            ok, image = video.read()
+            if not ok:
+                break
+            label = None
+            if goal_ranges is not None:
+                label = any(start <= index <= end for start, end in goal_ranges)
+            yield str(index), image, label
+            index += 1
+    finally:
+        video.release()
+
+
+def iter_corpus(path: Path) -> Iterator[Tuple[str, np.ndarray, Optional[bool]]]:
+    """폴더면 이미지 시퀀스, 파일이면 동영상으로 읽기"""
+    if path.is_dir():
+        return iter_image_dir(path)
+    return iter_video(path)
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": max(values, default=0.0),
+    }
+
+
+def run_corpus_benchmark(
+    path: Path,
+    template_path: Optional[Path] = DEFAULT_TEMPLATE,
+    detector_options: Optional[dict] = None,
+    verbose: bool = False
+) -> dict:
+    """
+    코퍼스의 모든 프레임을 check_for_goal로 재생
+    
+    쿨다운은 프레임마다 초기화하므로 각 프레임의 판정이 그대로 집계된다.
+    (화면 변화 감지는 실제처럼 연속 프레임 사이에서 동작)
+    
+    Returns:
+        stages (단계별 지연 백분위수), total, fps, memory, accuracy
+    """
+    backend = FrameBackend()
+    template = str(template_path) if template_path and template_path.exists() else None
+    detector = GoalDetector(template, capture_backend=backend, **(detector_options or {}))
+    
+    stage_timings: Dict[str, List[float]] = {name: [] for name in detector.STAGES}
+    totals: List[float] = []
+    peaks: List[int] = []
+    counts = {"tp": 0, "fp": 0, "fn": 0, "tn": 0, "unlabelled": 0}
+    
+    tracemalloc.start()
+    try:
+        for name, image, label in iter_corpus(path):
+            backend.set_frame(image)
+            detector.reset_cooldown()
+            
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            started = time.perf_counter()
+            result = detector.check_for_goal()
+            totals.append((time.perf_counter() - started) * 1000)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - current)
+            
+            for stage, elapsed_ms in detector.last_timings.items():
+                stage_timings.setdefault(stage, []).append(elapsed_ms)
+            
+            detected = bool(result and result.detected)
+            if label is None:
+                counts["unlabelled"] += 1
+            else:
+                key = ("tp" if label else "fp") if detected else ("fn" if label else "tn")
+                counts[key] += 1
+                if verbose and detected != label:
+                    confidence = result.confidence if result else 0.0
+                    print(f"[INFO] {key.upper()} {name} (confidence {confidence:.2f})")
+    finally:
+        tracemalloc.stop()
+    
+    if not totals:
+        raise ValueError(f"No frames found: {path}")
+    
+    tp, fp, fn = counts["tp"], counts["fp"], counts["fn"]
+    return {
+        "frames": len(totals),
+        "stages": {name: _latency_summary(values) for name, values in stage_timings.items() if values},
+        "total": _latency_summary(totals),
+        "fps": len(totals) / (sum(totals) / 1000) if sum(totals) > 0 else 0.0,
+        "memory": {
+            "mean_peak_kb": statistics.fmean(peaks) / 1024,
+            "max_peak_kb": max(peaks) / 1024,
+        },
+        "accuracy": {
+            **counts,
+            "precision": tp / (tp + fp) if tp + fp else 1.0,
+            "recall": tp / (tp + fn) if tp + fn else 1.0,
+        },
+    }
+
+
+def print_corpus_report(report: dict) -> None:
+    print(f"Frames: {report['frames']}, analysis FPS: {report['fps']:.1f}")
+    print(f"{'stage':<14}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(report["stages"].items()) + [("total", report["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:<14}{stats['runs']:>6}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+    
+    memory = report["memory"]
+    print(f"Memory peak per frame: mean {memory['mean_peak_kb']:.1f} KB, max {memory['max_peak_kb']:.1f} KB")
+    
+    accuracy = report["accuracy"]
+    print(
+        f"Precision {accuracy['precision']:.3f}, recall {accuracy['recall']:.3f} "
+        f"(TP {accuracy['tp']}, FP {accuracy['fp']}, FN {accuracy['fn']}, TN {accuracy['tn']}, "
+        f"unlabelled {accuracy['unlabelled']})"
+    )
+
+
+def _worse(current: float, baseline: float, tolerance: Tuple[float, float]) -> bool:
+    ratio, absolute = tolerance
+    return current > baseline * (1 + ratio) and current > baseline + absolute
+
+
+def compare_with_baseline(report: dict, baseline: dict) -> List[str]:
+    """기준 결과보다 나빠진 항목 목록 (비어 있으면 통과)"""
+    failures = []
+    
+    for name, stats in baseline.get("stages", {}).items():
+        current = report["stages"].get(name)
+        if current is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if _worse(current[key], stats[key], LATENCY_TOLERANCE):
+                failures.append(f"{name} {key}: {stats[key]:.2f} -> {current[key]:.2f}")
+    
+    for key in ("p50_ms", "p95_ms"):
+        if _worse(report["total"][key], baseline["total"][key], LATENCY_TOLERANCE):
+            failures.append(f"total {key}: {baseline['total'][key]:.2f} -> {report['total'][key]:.2f}")
+    
+    if report["fps"] < baseline["fps"] / (1 + LATENCY_TOLERANCE[0]):
+        failures.append(f"fps: {baseline['fps']:.1f} -> {report['fps']:.1f}")
+    
+    key = "mean_peak_kb"
+    if _worse(report["memory"][key], baseline["memory"][key], MEMORY_TOLERANCE):
+        failures.append(f"memory {key}: {baseline['memory'][key]:.1f} -> {report['memory'][key]:.1f}")
+    
+    for key in ("precision", "recall"):
+        if report["accuracy"][key] < baseline["accuracy"][key] - ACCURACY_TOLERANCE:
+            failures.append(f"{key}: {baseline['accuracy'][key]:.3f} -> {report['accuracy'][key]:.3f}")
+    
+    return failures
+
+
+def make_synthetic_corpus(
+    root: Path,
+    width: int,
+    height: int,
+    count: int,
+    banner_ratio: float = 0.4,
+    static_background: bool = False
+) -> None:
+    """
+    합성 프레임으로 코퍼스 생성 (실제 녹화가 없을 때 CI용)
+    
+    기본은 프레임마다 배경이 다른 goal/, other/ 폴더.
+    static_background면 같은 배경에 배너만 나타났다 사라지는 연속 프레임 (3장마다 GOAL)을
+    순서대로 쓰고 labels.json으로 라벨을 붙인다 -> 화면 변화 감지가 작은 배너를 놓치는지 확인용
+    """
+    if static_background:
+        root.mkdir(parents=True, exist_ok=True)
+        labels = {}
+        for i in range(count):
+            goal = i % 3 == 2
+            name = f"frame_{i:04d}.png"
+            cv2.imwrite(str(root / name), synthetic_frame(width, height, goal=goal, banner_ratio=banner_ratio))
+            labels[name] = goal
+        (root / "labels.json").write_text(json.dumps(labels, indent=2), encoding="utf-8")
+        print(f"[INFO] Wrote {count} frames on a static background to {root}")
+        return
+    
+    for folder in ("goal", "other"):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        goal = i % 2 == 0
+        image = synthetic_frame(width, height, goal=goal, seed=i, banner_ratio=banner_ratio)
+        folder = "goal" if goal else "other"
+        cv2.imwrite(str(root / folder / f"frame_{i:04d}.png"), image)
+    print(f"[INFO] Wrote {count} frames to {root}")
+
+
+# ========================================
+# 엔트리포인트
+# ========================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GoalDetector benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    alloc = subparsers.add_parser("alloc", help="버퍼 재사용 ON/OFF 비교")
+    alloc.add_argument("--width", type=int, default=2560)
+    alloc.add_argument("--height", type=int, default=1440)
+    alloc.add_argument("--iterations", type=int, default=50)
+    
+    lut = subparsers.add_parser("lut", help="HSV 변환 vs 색상 룩업 테이블 비교")
+    lut.add_argument("--width", type=int, default=2048)
+    lut.add_argument("--height", type=int, default=1152)
+    lut.add_argument("--iterations", type=int, default=30)
+    
+    stripes = subparsers.add_parser("stripes", help="색상 마스크 가로 띠 병렬 처리 비교")
+    stripes.add_argument("--width", type=int, default=3840)
+    stripes.add_argument("--height", type=int, default=2160)
+    stripes.add_argument("--iterations", type=int, default=30)
+    stripes.add_argument("--workers", type=int, default=4)
+    
+    tracking = subparsers.add_parser("tracking", help="후보 추적 중 캡처 영역 축소 확인")
+    tracking.add_argument("--width", type=int, default=2560)
+    tracking.add_argument("--height", type=int, default=1440)
+    tracking.add_argument("--ticks", type=int, default=5)
+    
+    corpus = subparsers.add_parser("corpus", help="녹화 프레임 폴더/동영상 재생 + 정확도")
+    corpus.add_argument("path", type=Path, help="이미지 폴더 또는 동영상 파일")
+    corpus.add_argument("--template", type=Path, default=DEFAULT_TEMPLATE)
+    corpus.add_argument("--no-template", action="store_true", help="템플릿 없이 (에지 확인만)")
+    corpus.add_argument("--no-roi", action="store_true")
+    corpus.add_argument("--no-pyramid", action="store_true")
+    corpus.add_argument("--color-lut", action="store_true")
+    corpus.add_argument("--stripe-workers", type=int, default=0)
+    corpus.add_argument("--tracking", action="store_true", help="후보 추적 모드 (연속 프레임 코퍼스용)")
+    corpus.add_argument("--confirm-frames", type=int, default=1, help="연속 감지 확정 횟수")
+    corpus.add_argument("--baseline", type=Path, help="비교할 기준 결과 JSON (나빠지면 종료 코드 1)")
+    corpus.add_argument("--save-baseline", type=Path, help="이번 결과를 기준 JSON으로 저장")
+    corpus.add_argument("--verbose", action="store_true", help="오탐/미탐 프레임 출력")
+    
+    make_corpus = subparsers.add_parser("make-corpus", help="합성 프레임 코퍼스 생성")
+    make_corpus.add_argument("path", type=Path)
+    make_corpus.add_argument("--width", type=int, default=2560)
+    make_corpus.add_argument("--height", type=int, default=1440)
+    make_corpus.add_argument("--count", type=int, default=40)
+    make_corpus.add_argument("--banner-ratio", type=float, default=0.4, help="GOAL 배너 너비 / 화면 너비")
+    make_corpus.add_argument(
+        "--static-background", action="store_true", help="같은 배경의 연속 프레임 (화면 변화 감지 확인용)"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.command == "alloc":
+        run_alloc_benchmark(args.width, args.height, args.iterations)
+    elif args.command == "lut":
+        run_lut_benchmark(args.width, args.height, args.iterations)
+    elif args.command == "stripes":
+        run_stripe_benchmark(args.width, args.height, args.iterations, args.workers)
+    elif args.command == "tracking":
+        if not run_tracking_check(args.width, args.height, args.ticks):
+            print("[ERROR] Capture area did not shrink while tracking")
+            sys.exit(1)
+    elif args.command == "make-corpus":
+        make_synthetic_corpus(
+            args.path, args.width, args.height, args.count,
+            banner_ratio=args.banner_ratio, static_background=args.static_background
+        )
+    elif args.command == "corpus":
+        report = run_corpus_benchmark(
+            args.path,
+            template_path=None if args.no_template else args.template,
+            detector_options={
+                "use_roi": not args.no_roi,
+                "use_pyramid": not args.no_pyramid,
+                "use_color_lut": args.color_lut,
+                "stripe_workers": args.stripe_workers,
+                "use_tracking": args.tracking,
+                "confirm_frames": args.confirm_frames,
+            },
+            verbose=args.verbose
+        )
+        print_corpus_report(report)
+        
+        if args.save_baseline:
+            args.save_baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"[INFO] Baseline saved: {args.save_baseline}")
+        
+        if args.baseline:
+            failures = compare_with_baseline(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+            if failures:
+                print("[ERROR] Regression against baseline:")
+                for failure in failures:
+                    print(f"  - {failure}")
+                sys.exit(1)
+            print("[INFO] No regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+WebSocket 브로드캐스트 모듈
+클라이언트마다 전송 대기열 + 전송 태스크를 따로 둬서
+느린 브라우저 탭 하나가 다른 클라이언트나 감지 루프를 막지 않게 함:
+1. 메시지는 형식(JSON/msgpack)별로 한 번만 직렬화해서 모든 대기열이 공유
+2. 대기열이 밀리면 대기 중인 state_update/state_patch를 최신 전체 상태 하나로 바꿈
+   (goal_detected는 버리지 않음)
+3. 계속 밀려 있거나 전송이 멈춘 클라이언트는 연결을 끊음
+"""
+
+import asyncio
+import time
+from collections import deque
+from itertools import count
+from typing import Callable, Deque, Dict, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket
+
+from metrics import registry as metrics
+from ws_protocol import JSON_CODEC
+
+
+QUEUE_DEPTH = metrics.gauge("tr_ws_queue_depth", "Messages waiting in the deepest client queue")
+QUEUED_MESSAGES = metrics.gauge("tr_ws_queued_messages", "Messages waiting across all client queues")
+DROPPED_TOTAL = metrics.counter(
+    "tr_ws_dropped_messages_total", "Messages dropped or coalesced before sending", ("type", "reason")
+)
+EVICTED_TOTAL = metrics.counter("tr_ws_evicted_clients_total", "Clients disconnected for falling behind", ("reason",))
+
+
+class ClientConnection:
+    """
+    클라이언트 하나의 전송 대기열 + 전송 태스크
+    
+    대기열 항목은 (메시지 타입, 직렬화된 메시지 - JSON은 str, msgpack은 bytes, 전송 완료 콜백).
+    state_update는 전체 상태라서 대기 중인 state_update/state_patch를 모두 대신한다.
+    대기열이 가득 차면 대기 중인 상태 메시지를 snapshot_provider가 주는 최신 state_update
+    하나로 바꾸고, 상태 메시지가 없으면 버려도 되는 가장 오래된 메시지를 버린다.
+    """
+    
+    MAX_QUEUE = 32                 # 대기열 최대 길이
+    STATE_TYPES = ("state_update", "state_patch")  # 최신 state_update 하나로 대체 가능
+    KEEP_TYPES = ("goal_detected",)                # 대기열이 가득 차도 버리지 않음
+    SEND_TIMEOUT = 5.0             # 메시지 하나 전송이 이보다 오래 걸리면 연결 끊음
+    EVICT_AFTER_SECONDS = 10.0     # 대기열이 이 시간 넘게 가득 차 있으면 연결 끊음
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        client_id: int,
+        on_close,
+        codec=JSON_CODEC,
+        snapshot_provider: Optional[Callable[[], dict]] = None
+    ):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.codec = codec
+        self._snapshot_provider = snapshot_provider
+        self._queue: Deque[Tuple[str, Union[str, bytes], Optional[Callable[[int], None]]]] = deque()
+        self._wakeup = asyncio.Event()
+        self._on_close = on_close
+        self._lagging_since: Optional[float] = None
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._task = asyncio.create_task(self._writer(), name=f"ws-writer-{client_id}")
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+    
+    def enqueue(
+        self,
+        message_type: str,
+        payload: Union[str, bytes],
+        on_sent: Optional[Callable[[int], None]] = None
+    ) -> bool:
+        """
+        전송 대기열에 추가 (기다리지 않음)
+        
+        Args:
+            on_sent: 전송이 끝나면 클라이언트 ID로 호출 (지연 추적용)
+        
+        Returns:
+            False면 이 클라이언트는 밀려서 연결을 끊었음
+        """
+        if self._closed:
+            return False
+        
+        if message_type == "state_update":
+            # 전체 상태가 대기 중인 상태 메시지를 모두 대신함 (순서는 새 위치로)
+            self._drop_state_messages("coalesced")
+        
+        if len(self._queue) >= self.MAX_QUEUE:
+            now = time.monotonic()
+            if self._lagging_since is None:
+                self._lagging_since = now
+            elif now - self._lagging_since > self.EVICT_AFTER_SECONDS:
+                self.evict("lagging")
+                return False
+            
+            replaced = False
+            state_pending = message_type in self.STATE_TYPES or any(
+                queued_type in self.STATE_TYPES for queued_type, _, _ in self._queue
+            )
+            if state_pending and self._snapshot_provider is not None:
+                # 대기 중인 상태 메시지 + 새 상태 메시지 -> 지금의 전체 상태 하나
+                self._replace_with_snapshot()
+                if message_type in self.STATE_TYPES:
+                    self._count_drop(message_type, "queue_full")  # 스냅샷에 이미 반영됨
+                    return True
+                replaced = True
+            
+            if len(self._queue) >= self.MAX_QUEUE:
+                victim = self._pick_victim(keep_state=replaced)
+                if victim is not None:
+                    dropped_type, _, _ = self._queue[victim]
+                    del self._queue[victim]
+                    self._count_drop(dropped_type, "queue_full")
+                elif message_type not in self.KEEP_TYPES:
+                    self._count_drop(message_type, "queue_full")
+                    return True
+                # 남은 게 전부 goal_detected고 새 메시지도 goal_detected면 MAX_QUEUE를 넘겨서라도 넣음
+        
+        self._queue.append((message_type, payload, on_sent))
+        self._wakeup.set()
+        return True
+    
+    def _pick_victim(self, keep_state: bool) -> Optional[int]:
+        """
+        대기열이 가득 찼을 때 버릴 항목 (goal_detected는 버리지 않음)
+        
+        Args:
+            keep_state: 방금 만든 스냅샷을 지키려면 True (아니면 상태 메시지부터 버림)
+        """
+        types = list(enumerate(queued_type for queued_type, _, _ in self._queue))
+        if not keep_state:
+            victim = next((i for i, queued_type in types if queued_type in self.STATE_TYPES), None)
+            if victim is not None:
+                return victim
+        return next(
+            (i for i, queued_type in types
+             if queued_type not in self.KEEP_TYPES and queued_type not in self.STATE_TYPES),
+            None
+        )
+    
+    def _drop_state_messages(self, reason: str) -> None:
+        """대기 중인 state_update/state_patch 모두 삭제"""
+        kept = deque()
+        for item in self._queue:
+            if item[0] in self.STATE_TYPES:
+                self._count_drop(item[0], reason)
+            else:
+                kept.append(item)
+        self._queue = kept
+    
+    def _replace_with_snapshot(self) -> None:
+        """대기 중인 상태 메시지를 지금의 전체 상태(state_update) 하나로 교체"""
+        self._drop_state_messages("queue_full")
+        self._queue.append(("state_update", self.codec.encode(self._snapshot_provider()), None))
+    
+    def _count_drop(self, message_type: str, reason: str) -> None:
+        self.dropped += 1
+        DROPPED_TOTAL.labels(message_type, reason).inc()
+    
+    async def _writer(self) -> None:
+        try:
+            while True:
+                if not self._queue:
+                    self._lagging_since = None
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, payload, on_sent = self._queue.popleft()
+                if isinstance(payload, bytes):
+                    send = self.websocket.send_bytes(payload)
+                else:
+                    send = self.websocket.send_text(payload)
+                try:
+                    await asyncio.wait_for(send, self.SEND_TIMEOUT)
+                except asyncio.TimeoutError:
+                    self.evict("send_timeout")
+                    return
+                self.sent += 1
+                if on_sent is not None:
+                    on_sent(self.client_id)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # 연결 끊김 등
+            self._close()
+    
+    def evict(self, reason: str) -> None:
+        """밀린 클라이언트 연결 끊기"""
+        if self._closed:
+            return
+        print(f"[WS] Evicting client {self.client_id} ({reason}, queue {len(self._queue)})")
+        EVICTED_TOTAL.labels(reason).inc()
+        self._close()
+        asyncio.create_task(self._close_socket())
+    
+    async def _close_socket(self) -> None:
+        try:
+            await self.websocket.close(code=1013)  # Try Again Later
+        except Exception:
+            pass
+    
+    def _close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._on_close(self)
+    
+    async def close(self) -> None:
+        """정상 종료 (수신 루프가 끝났을 때)"""
+        self._close()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class Broadcaster:
+    """연결된 클라이언트 목록 + 브로드캐스트"""
+    
+    def __init__(self, snapshot_provider: Optional[Callable[[], dict]] = None):
+        """
+        Args:
+            snapshot_provider: 전체 상태 메시지(state_update)를 만드는 함수
+                               (밀린 대기열의 상태 메시지를 하나로 바꿀 때 사용)
+        """
+        self.clients: Set[ClientConnection] = set()
+        self._ids = count(1)
+        self._snapshot_provider = snapshot_provider
+    
+    def add(self, websocket: WebSocket, codec=JSON_CODEC) -> ClientConnection:
+        client = ClientConnection(
+            websocket, next(self._ids), self.clients.discard, codec, self._snapshot_provider
+        )
+        self.clients.add(client)
+        return client
+    
+    async def remove(self, client: ClientConnection) -> None:
+        await client.close()
+    
+    def send(self, client: ClientConnection, message: dict) -> None:
+        """클라이언트 하나에게 전송 (대기열 경유라서 순서 유지)"""
+        client.enqueue(message.get("type", ""), client.codec.encode(message))
+    
+    def broadcast(self, message: dict, on_sent: Optional[Callable[[int], None]] = None) -> int:
+        """
+        모든 클라이언트 대기열에 추가 (직렬화는 형식별로 한 번, 전송은 기다리지 않음)
+        
+        Args:
+            on_sent: 클라이언트마다 전송이 끝나면 클라이언트 ID로 호출
+        
+        Returns:
+            대기열에 넣은 클라이언트 수
+        """
+        if not self.clients:
+            return 0
+        message_type = message.get("type", "")
+        payloads: Dict[str, Union[str, bytes]] = {}
+        queued = 0
+        for client in list(self.clients):
+            codec = client.codec
+            payload = payloads.get(codec.name)
+            if payload is None:
+                payload = payloads[codec.name] = codec.encode(message)
+            queued += client.enqueue(message_type, payload, on_sent)
+        return queued
+    
+    def stats(self) -> Dict[str, int]:
+        depths = [client.queue_depth for client in self.clients]
+        return {
+            "clients": len(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queued_messages": sum(depths),
+        }
+    
+    def update_metrics(self) -> None:
+        stats = self.stats()
+        QUEUE_DEPTH.set(stats["max_queue_depth"])
+        QUEUED_MESSAGES.set(stats["queued_messages"])
@@ -0,0 +1,357 @@
+"""
+감지 조건 자동 보정 모듈
+GOAL이 나오는 몇 초 분량의 프레임 + goal_template.png로 현재 해상도/창 배치에 맞는 조건을 학습:
+1. 템플릿으로 확인된 GOAL 박스들에서 글자 픽셀의 HSV 분포 -> 색상 범위를 좁힘
+2. 박스 크기/위치 -> 면적/비율/너비/y 한계를 좁히고 캡처 ROI를 박스 주변으로 줄임
+3. 결과를 (레이아웃, 해상도)별 프로필 JSON으로 저장
+   -> 다음 시작부터는 감지기가 화면 크기를 보고 해당 프로필을 바로 읽어서 적용
+
+학습한 값은 항상 GoalDetector 기본 조건보다 좁은 쪽으로만 바뀐다.
+(기본 범위 밖의 색상/크기를 새로 허용하지 않음)
+
+사용법 (게임에서 GOAL 화면이 나오는 동안 실행):
+    python calibration.py                          # 주 모니터 5초
+    python calibration.py --source client1 --seconds 8
+    python calibration.py --recording run.mp4      # 녹화 파일 (동영상 또는 이미지 폴더)에서
+"""
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from capture_backends import CaptureBackend, FrameBackend, ImageSequenceBackend, VideoBackend
+from goal_detector import GoalDetector
+
+
+# 프로필 저장 위치 ({레이아웃}_{너비}x{높이}.json)
+DEFAULT_PROFILE_DIR = Path(__file__).parent / "data" / "calibration"
+DEFAULT_TEMPLATE_PATH = Path(__file__).parent / "assets" / "goal_template.png"
+DEFAULT_LAYOUT = "primary"
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class CalibrationProfile:
+    """해상도 하나에 대해 학습한 감지 조건 (비율은 모두 화면 크기 기준)"""
+    layout: str
+    screen_size: Tuple[int, int]
+    hsv_ranges: List[Tuple[List[int], List[int]]]       # (하한 HSV, 상한 HSV) 목록
+    min_area_ratio: float
+    max_y_ratio: float
+    edge_max_y_ratio: float
+    min_aspect_ratio: float
+    width_ratio_range: Tuple[float, float]
+    roi: Tuple[float, float, float, float]              # 캡처 ROI (left, top, right, bottom)
+    goal_box: Tuple[float, float, float, float]         # 감지된 GOAL 박스 중앙값 (x, y, w, h)
+    frames: int = 0                                     # 학습에 쓴 프레임 수
+    detections: int = 0                                 # 그중 템플릿으로 확인된 GOAL 수
+    created_at: float = 0.0
+    version: int = PROFILE_VERSION
+    
+    def detector_overrides(self) -> Dict[str, object]:
+        """GoalDetector.apply_calibration에 넘길 값"""
+        return {
+            "HSV_RANGES": [
+                (np.array(lower), np.array(upper)) for lower, upper in self.hsv_ranges
+            ],
+            "MIN_AREA_RATIO": self.min_area_ratio,
+            "MAX_Y_RATIO": self.max_y_ratio,
+            "EDGE_MAX_Y_RATIO": self.edge_max_y_ratio,
+            "MIN_ASPECT_RATIO": self.min_aspect_ratio,
+            "WIDTH_RATIO_RANGE": tuple(self.width_ratio_range),
+        }
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "CalibrationProfile":
+        """
+        Raises:
+            ValueError: 다른 버전의 프로필
+        """
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported calibration profile version: {data.get('version')}")
+        return cls(**{
+            **data,
+            "screen_size": tuple(data["screen_size"]),
+            "hsv_ranges": [(list(lower), list(upper)) for lower, upper in data["hsv_ranges"]],
+            "width_ratio_range": tuple(data["width_ratio_range"]),
+            "roi": tuple(data["roi"]),
+            "goal_box": tuple(data["goal_box"]),
+        })
+
+
+class ProfileStore:
+    """
+    레이아웃(소스) 하나의 해상도별 프로필 파일
+    
+    get()은 GoalDetector의 profile_provider로 쓴다.
+    해상도별로 파일을 한 번만 읽고 (없는 것도) 기억한다.
+    """
+    
+    def __init__(self, layout: str = DEFAULT_LAYOUT, directory: Path = DEFAULT_PROFILE_DIR):
+        self.layout = layout
+        self.directory = Path(directory)
+        self._cache: Dict[Tuple[int, int], Optional[CalibrationProfile]] = {}
+    
+    def path(self, screen_size: Tuple[int, int]) -> Path:
+        width, height = screen_size
+        return self.directory / f"{self.layout}_{width}x{height}.json"
+    
+    def get(self, screen_size: Tuple[int, int]) -> Optional[CalibrationProfile]:
+        screen_size = tuple(screen_size)
+        if screen_size in self._cache:
+            return self._cache[screen_size]
+        
+        path = self.path(screen_size)
+        profile = None
+        if path.exists():
+            try:
+                profile = CalibrationProfile.from_dict(json.loads(path.read_text(encoding="utf-8")))
+                print(f"[INFO] Calibration profile loaded: {path.name}")
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"[WARNING] Calibration profile ignored ({path.name}): {e}")
+        self._cache[screen_size] = profile
+        return profile
+    
+    def save(self, profile: CalibrationProfile) -> Path:
+        path = self.path(profile.screen_size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(profile.to_dict(), indent=2), encoding="utf-8")
+        self._cache[tuple(profile.screen_size)] = profile
+        return path
+
+
+# ========================================
+# 학습
+# ========================================
+
+class Calibrator:
+    """
+    프레임을 하나씩 받아서 GOAL 표본을 모으고 finish()로 프로필 생성
+    
+    프레임은 화면 전체여야 한다 (ROI도 학습 대상).
+    표본은 프레임마다 일부 픽셀만 남기므로 긴 녹화도 메모리를 많이 쓰지 않는다.
+    """
+    
+    MIN_DETECTIONS = 3              # 이보다 적게 확인되면 보정 실패
+    SAMPLES_PER_FRAME = 4000        # 프레임당 보관할 GOAL 픽셀 수
+    COLOR_PERCENTILES = (1, 99)     # 색상 범위로 쓸 HSV 백분위 (양 끝 이상치 제외)
+    HSV_MARGIN = (2, 15, 15)        # 백분위 범위 바깥 여유 (H, S, V)
+    MIN_RANGE_SHARE = 0.02          # GOAL 픽셀 중 이 비율 미만인 색상 범위는 버림
+    SIZE_MARGIN = 0.2               # 관측한 너비/비율 범위 바깥 여유 (확대 애니메이션 대비)
+    AREA_MARGIN = 0.5               # 최소 면적 = 관측 최소 색상 픽셀 수의 이 배
+    Y_MARGIN = 0.05                 # y 한계 여유 (화면 높이 대비)
+    ROI_PADDING = (0.08, 0.05)      # ROI 여유 (화면 너비, 높이 대비)
+    
+    def __init__(self, template_path: Optional[Path] = DEFAULT_TEMPLATE_PATH, layout: str = DEFAULT_LAYOUT):
+        """
+        Raises:
+            FileNotFoundError: 템플릿 이미지가 없음 (확인 없이 학습하면 배경을 배울 수 있음)
+        """
+        if template_path is None or not Path(template_path).exists():
+            raise FileNotFoundError(f"GOAL template not found: {template_path}")
+        self.layout = layout
+        self._backend = FrameBackend()
+        # 기본 조건 그대로, 화면 전체를 원본 해상도로 분석
+        self._detector = GoalDetector(
+            str(template_path), use_roi=False, use_pyramid=False, capture_backend=self._backend
+        )
+        self.screen_size: Optional[Tuple[int, int]] = None
+        self.frames = 0
+        self._boxes: List[Tuple[int, int, int, int]] = []
+        self._pixel_counts: List[int] = []
+        self._samples: List[np.ndarray] = []
+    
+    @property
+    def detections(self) -> int:
+        return len(self._boxes)
+    
+    def add_frame(self, frame: np.ndarray) -> bool:
+        """
+        프레임 하나 분석 (템플릿으로 확인된 GOAL이면 표본 추가)
+        
+        Returns:
+            표본으로 쓰였으면 True
+        
+        Raises:
+            ValueError: 보정 도중 해상도가 바뀜
+        """
+        height, width = frame.shape[:2]
+        if self.screen_size is None:
+            self.screen_size = (width, height)
+        elif self.screen_size != (width, height):
+            raise ValueError(f"Resolution changed during calibration: {self.screen_size} -> {(width, height)}")
+        self.frames += 1
+        
+        detector = self._detector
+        template_passes = detector.get_stage_stats()["template"]["passes"]
+        self._backend.set_frame(frame)
+        detector.reset_cooldown()
+        result = detector.check_for_goal()
+        confirmed = detector.get_stage_stats()["template"]["passes"] > template_passes
+        if result is None or not result.detected or not confirmed or result.bbox is None:
+            return False
+        
+        x, y, w, h = result.bbox
+        hsv = cv2.cvtColor(np.ascontiguousarray(frame[y:y + h, x:x + w]), cv2.COLOR_BGR2HSV)
+        mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
+        for lower, upper in GoalDetector.HSV_RANGES:
+            mask |= cv2.inRange(hsv, lower, upper)
+        pixels = hsv[mask > 0]
+        if len(pixels) == 0:
+            return False
+        
+        step = max(1, len(pixels) // self.SAMPLES_PER_FRAME)
+        self._samples.append(pixels[::step])
+        self._pixel_counts.append(len(pixels))
+        self._boxes.append(result.bbox)
+        return True
+    
+    def _learn_hsv_ranges(self, pixels: np.ndarray) -> List[Tuple[List[int], List[int]]]:
+        """기본 색상 범위마다 그 안에 든 GOAL 픽셀의 백분위 범위로 좁힘"""
+        low_q, high_q = self.COLOR_PERCENTILES
+        margin = np.array(self.HSV_MARGIN)
+        ranges = []
+        for lower, upper in GoalDetector.HSV_RANGES:
+            inside = pixels[np.all((pixels >= lower) & (pixels <= upper), axis=1)]
+            if len(inside) < len(pixels) * self.MIN_RANGE_SHARE:
+                continue
+            learned_lower = np.maximum(lower, np.percentile(inside, low_q, axis=0).astype(int) - margin)
+            learned_upper = np.minimum(upper, np.percentile(inside, high_q, axis=0).astype(int) + margin)
+            ranges.append(([int(v) for v in learned_lower], [int(v) for v in learned_upper]))
+        return ranges
+    
+    def finish(self) -> CalibrationProfile:
+        """
+        모은 표본으로 프로필 생성
+        
+        Raises:
+            ValueError: 확인된 GOAL이 MIN_DETECTIONS개 미만
+        """
+        if self.detections < self.MIN_DETECTIONS:
+            raise ValueError(
+                f"Only {self.detections} confirmed GOAL frame(s) in {self.frames} frames "
+                f"(need {self.MIN_DETECTIONS}); run calibration while GOAL is on screen"
+            )
+        
+        screen_width, screen_height = self.screen_size
+        boxes = np.array(self._boxes, dtype=np.float64)
+        xs, ys = boxes[:, 0] / screen_width, boxes[:, 1] / screen_height
+        widths, heights = boxes[:, 2] / screen_width, boxes[:, 3] / screen_height
+        aspects = boxes[:, 2] / boxes[:, 3]
+        area_ratio = min(self._pixel_counts) / (screen_width * screen_height)
+        
+        # 기본 조건보다 좁은 쪽으로만
+        min_width, max_width = GoalDetector.WIDTH_RATIO_RANGE
+        max_y = float(ys.max()) + self.Y_MARGIN
+        pad_x, pad_y = self.ROI_PADDING
+        
+        return CalibrationProfile(
+            layout=self.layout,
+            screen_size=self.screen_size,
+            hsv_ranges=self._learn_hsv_ranges(np.concatenate(self._samples)),
+            min_area_ratio=max(GoalDetector.MIN_AREA_RATIO, area_ratio * self.AREA_MARGIN),
+            max_y_ratio=min(GoalDetector.MAX_Y_RATIO, max_y),
+            edge_max_y_ratio=min(GoalDetector.EDGE_MAX_Y_RATIO, max_y),
+            min_aspect_ratio=max(GoalDetector.MIN_ASPECT_RATIO, float(aspects.min()) * (1 - self.SIZE_MARGIN)),
+            width_ratio_range=(
+                max(min_width, float(widths.min()) * (1 - self.SIZE_MARGIN)),
+                min(max_width, float(widths.max()) * (1 + self.SIZE_MARGIN)),
+            ),
+            roi=(
+                max(0.0, float(xs.min()) - pad_x),
+                max(0.0, float(ys.min()) - pad_y),
+                min(1.0, float((xs + widths).max()) + pad_x),
+                min(1.0, float((ys + heights).max()) + pad_y),
+            ),
+            goal_box=tuple(float(np.median(values)) for values in (xs, ys, widths, heights)),
+            frames=self.frames,
+            detections=self.detections,
+            created_at=time.time()
+        )
+
+
+def calibrate(
+    frames: Iterable[np.ndarray],
+    template_path: Optional[Path] = DEFAULT_TEMPLATE_PATH,
+    layout: str = DEFAULT_LAYOUT
+) -> CalibrationProfile:
+    """프레임들로 프로필 학습 (저장은 ProfileStore.save)"""
+    calibrator = Calibrator(template_path, layout)
+    for frame in frames:
+        calibrator.add_frame(frame)
+    return calibrator.finish()
+
+
+def capture_frames(backend: CaptureBackend, seconds: float, interval: float = 0.1) -> Iterator[np.ndarray]:
+    """백엔드에서 seconds초 동안 화면 전체를 interval 간격으로 캡처"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        yield backend.grab(backend.get_monitor())
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def recorded_frames(backend: FrameBackend) -> Iterator[np.ndarray]:
+    """녹화 백엔드 (VideoBackend / ImageSequenceBackend)의 프레임을 끝까지"""
+    while backend.advance():
+        yield backend.frame
+
+
+# ========================================
+# 엔트리포인트
+# ========================================
+
+def main() -> None:
+    # multi_source가 이 모듈을 import하므로 여기서 import
+    from multi_source import PRIMARY_SOURCE_ID, create_backend, load_source_configs
+    
+    parser = argparse.ArgumentParser(description="GoalDetector calibration")
+    parser.add_argument("--source", default=PRIMARY_SOURCE_ID, help="sources.json의 소스 ID (프로필 레이아웃 이름)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="캡처 시간 (초)")
+    parser.add_argument("--interval", type=float, default=0.1, help="캡처 간격 (초)")
+    parser.add_argument("--recording", type=Path, help="캡처 대신 녹화 파일 (동영상 또는 이미지 폴더)")
+    parser.add_argument("--template", type=Path, default=DEFAULT_TEMPLATE_PATH)
+    parser.add_argument("--profile-dir", type=Path, default=DEFAULT_PROFILE_DIR)
+    args = parser.parse_args()
+    
+    if args.recording is not None:
+        recording = (
+            ImageSequenceBackend(args.recording, auto_advance=False) if args.recording.is_dir()
+            else VideoBackend(args.recording, auto_advance=False)
+        )
+        backend, frames = recording, recorded_frames(recording)
+    else:
+        configs = {config.source_id: config for config in load_source_configs()}
+        if args.source not in configs:
+            parser.error(f"Unknown source: {args.source}")
+        backend = create_backend(configs[args.source])
+        print(f"[INFO] Capturing {args.seconds:g}s from '{args.source}' - show the GOAL screen now")
+        frames = capture_frames(backend, args.seconds, args.interval)
+    
+    try:
+        profile = calibrate(frames, args.template, layout=args.source)
+    finally:
+        backend.close()
+    
+    path = ProfileStore(args.source, args.profile_dir).save(profile)
+    print(f"[INFO] Calibration profile saved: {path}")
+    print(f"  frames {profile.frames}, confirmed GOAL {profile.detections}")
+    print(f"  ROI {tuple(round(v, 3) for v in profile.roi)}")
+    print(f"  width {tuple(round(v, 3) for v in profile.width_ratio_range)}, "
+          f"min aspect {profile.min_aspect_ratio:.2f}, max y {profile.max_y_ratio:.2f}")
+    for lower, upper in profile.hsv_ranges:
+        print(f"  HSV {lower} ~ {upper}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+"""
+캡처 백엔드 모듈
+GoalDetector / CaptureThread가 프레임을 얻는 방법을 바꿔 끼울 수 있도록 분리:
+1. MssMonitorBackend: mss로 모니터 캡처 (기본)
+2. MssRegionBackend: mss로 화면의 고정 영역(창 모드 게임 등)을 모니터처럼 캡처
+3. VideoBackend / ImageSequenceBackend: 녹화 파일 재생
+4. SharedMemoryBackend: 다른 프로세스(녹화/방송 프로그램)가 공유 메모리에 쓴 프레임 사용
+
+좌표는 모두 가상 화면 기준 dict (left, top, width, height).
+grab()이 반환한 배열은 다음 grab() 전까지만 유효하다고 보고 사용한다
+(파일/공유 메모리 백엔드는 복사 없이 내부 버퍼의 뷰를 반환).
+"""
+
+import threading
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import cv2
+import mss
+import numpy as np
+
+
+Rect = Dict[str, int]
+
+
+def _to_bgr(screenshot, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    mss 스크린샷 -> 연속 메모리 BGR 배열
+    
+    np.array(screenshot)[:, :, :3]는 BGRA 복사 + 비연속 뷰라서
+    OpenCV가 한 번 더 복사한다. 원본 버퍼를 그대로 보고 변환 한 번으로 끝낸다.
+    
+    Args:
+        screenshot: mss.grab() 결과
+        dst: 결과를 쓸 (h, w, 3) uint8 버퍼 (없으면 새로 할당)
+    """
+    height, width = screenshot.height, screenshot.width
+    bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(height, width, 4)
+    return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=dst)
+
+
+def _crop(frame: np.ndarray, origin: Rect, rect: Rect, dst: Optional[np.ndarray]) -> np.ndarray:
+    """
+    frame(가상 화면 기준 origin에 위치)에서 rect 영역 뷰 (dst가 있으면 복사)
+    
+    Raises:
+        ValueError: rect가 frame 밖으로 나가는 경우 (잘린 뷰를 돌려주지 않음)
+    """
+    x = rect["left"] - origin["left"]
+    y = rect["top"] - origin["top"]
+    height, width = frame.shape[:2]
+    if x < 0 or y < 0 or x + rect["width"] > width or y + rect["height"] > height:
+        raise ValueError(f"Capture rect {rect} is outside the {width}x{height} frame at {origin}")
+    view = frame[y:y + rect["height"], x:x + rect["width"]]
+    if dst is None:
+        return view
+    np.copyto(dst, view)
+    return dst
+
+
+class CaptureBackend:
+    """
+    캡처 백엔드 인터페이스
+    
+    get_monitor()로 화면 크기/위치를 알려주고, grab(rect)로 그 안의 영역을 BGR로 반환한다.
+    한 번의 캡처는 get_monitor() -> grab() 순서로 호출된다.
+    """
+    
+    def get_monitor(self) -> Rect:
+        """캡처 대상 화면 (left, top, width, height)"""
+        raise NotImplementedError
+    
+    def grab(self, rect: Rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        화면 영역을 BGR 이미지로 반환
+        
+        Args:
+            rect: 캡처할 영역 (get_monitor() 범위 안, 가상 화면 기준)
+            dst: 결과를 쓸 (h, w, 3) uint8 버퍼 (없으면 백엔드가 할당하거나 뷰 반환)
+        """
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        pass
+    
+    def __enter__(self) -> "CaptureBackend":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ========================================
+# mss 화면 캡처
+# ========================================
+
+class MssMonitorBackend(CaptureBackend):
+    """
+    mss로 모니터 캡처 (요청한 영역만 grab)
+    
+    mss 인스턴스는 만든 스레드에서만 쓸 수 있으므로 스레드별로 만든다.
+    """
+    
+    def __init__(self, monitor_index: int = 1):
+        """
+        Args:
+            monitor_index: mss 모니터 번호 (1 = 주 모니터, 0 = 전체 가상 화면)
+        """
+        self._monitor_index = monitor_index
+        self._local = threading.local()
+        self._instances: List[mss.mss] = []
+        self._lock = threading.Lock()
+    
+    def _sct(self) -> mss.mss:
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._instances.append(sct)
+        return sct
+    
+    def get_monitor(self) -> Rect:
+        monitor = self._sct().monitors[self._monitor_index]
+        return {key: monitor[key] for key in ("left", "top", "width", "height")}
+    
+    def grab(self, rect: Rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        return _to_bgr(self._sct().grab(rect), dst=dst)
+    
+    def close(self) -> None:
+        # 다른 스레드가 만든 인스턴스도 닫는다 (종료 시점에만 호출)
+        with self._lock:
+            instances, self._instances = self._instances, []
+        for sct in instances:
+            sct.close()
+        self._local = threading.local()
+
+
+class MssRegionBackend(MssMonitorBackend):
+    """
+    화면의 고정 영역을 모니터처럼 캡처 (창 모드 게임 등)
+    
+    감지기의 ROI 비율과 크기 기준이 이 영역 기준으로 적용된다.
+    """
+    
+    def __init__(self, left: int, top: int, width: int, height: int):
+        super().__init__()
+        self._region = {"left": left, "top": top, "width": width, "height": height}
+    
+    def set_region(self, left: int, top: int, width: int, height: int) -> None:
+        """영역 변경 (창 이동/크기 변경 시)"""
+        self._region = {"left": left, "top": top, "width": width, "height": height}
+    
+    def get_monitor(self) -> Rect:
+        return dict(self._region)
+
+
+# ========================================
+# 파일 재생
+# ========================================
+
+class FrameBackend(CaptureBackend):
+    """
+    메모리의 프레임 한 장을 화면으로 보는 백엔드 (벤치마크/테스트용)
+    
+    set_frame()으로 넣은 프레임 전체가 (0, 0) 위치의 모니터가 된다.
+    """
+    
+    def __init__(self, frame: Optional[np.ndarray] = None):
+        self.frame = frame
+    
+    def set_frame(self, frame: np.ndarray) -> None:
+        self.frame = frame
+    
+    def get_monitor(self) -> Rect:
+        if self.frame is None:
+            raise RuntimeError("No frame to capture")
+        height, width = self.frame.shape[:2]
+        return {"left": 0, "top": 0, "width": width, "height": height}
+    
+    def grab(self, rect: Rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        return _crop(self.frame, {"left": 0, "top": 0}, rect, dst)
+
+
+class _IteratingFrameBackend(FrameBackend):
+    """
+    프레임 이터레이터를 재생하는 백엔드
+    
+    auto_advance=True면 캡처 한 번(get_monitor -> grab)마다 다음 프레임으로 넘어간다.
+    False면 advance()를 직접 호출한다. 끝나면 마지막 프레임에서 멈추고 finished가 True.
+    """
+    
+    def __init__(self, auto_advance: bool = True, loop: bool = False):
+        super().__init__()
+        self._auto_advance = auto_advance
+        self._loop = loop
+        self._frames: Optional[Iterator[np.ndarray]] = None
+        self._consumed = True
+        self.finished = False
+        self.index = -1
+    
+    def _open(self) -> Iterator[np.ndarray]:
+        raise NotImplementedError
+    
+    def advance(self) -> bool:
+        """다음 프레임으로 이동 (더 없으면 False)"""
+        if self._frames is None:
+            self._frames = self._open()
+        frame = next(self._frames, None)
+        if frame is None and self._loop and self.index >= 0:
+            self._frames = self._open()
+            self.index = -1
+            frame = next(self._frames, None)
+        if frame is None:
+            self.finished = True
+            return False
+        self.frame = frame
+        self.index += 1
+        return True
+    
+    def get_monitor(self) -> Rect:
+        if self._auto_advance and self._consumed:
+            self.advance()
+            self._consumed = False
+        return super().get_monitor()
+    
+    def grab(self, rect: Rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        self._consumed = True
+        return super().grab(rect, dst)
+
+
+class VideoBackend(_IteratingFrameBackend):
+    """동영상 파일 재생 (cv2.VideoCapture)"""
+    
+    def __init__(self, path: Union[str, Path], auto_advance: bool = True, loop: bool = False):
+        super().__init__(auto_advance, loop)
+        self._path = str(path)
+        self._video: Optional[cv2.VideoCapture] = None
+    
+    def _open(self) -> Iterator[np.ndarray]:
+        self.close()
+        self._video = cv2.VideoCapture(self._path)
+        if not self._video.isOpened():
+            raise ValueError(f"Cannot open video: {self._path}")
+        return self._read_frames(self._video)
+    
+    @staticmethod
+    def _read_frames(video: cv2.VideoCapture) -> Iterator[np.ndarray]:
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                return
+            yield frame
+    
+    def close(self) -> None:
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+
+class ImageSequenceBackend(_IteratingFrameBackend):
+    """이미지 파일 목록 (또는 폴더의 이미지들) 순서대로 재생"""
+    
+    IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+    
+    def __init__(
+        self,
+        paths: Union[str, Path, Iterable[Union[str, Path]]],
+        auto_advance: bool = True,
+        loop: bool = False
+    ):
+        super().__init__(auto_advance, loop)
+        if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+            paths = sorted(
+                p for p in Path(paths).rglob("*") if p.suffix.lower() in self.IMAGE_EXTENSIONS
+            )
+        self.paths = [Path(p) for p in paths]
+    
+    def _open(self) -> Iterator[np.ndarray]:
+        for path in self.paths:
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                print(f"[WARNING] Unreadable frame skipped: {path}")
+                continue
+            yield frame
+
+
+# ========================================
+# 공유 메모리 (다른 프로세스가 프레임을 씀)
+# ========================================
+
+class _SharedFrameLayout:
+    """
+    공유 메모리 배치
+    
+    [헤더 int64 x HEADER_FIELDS][슬롯별 정보 int64 x SLOT_FIELDS][슬롯별 BGR 버퍼]
+    쓰는 쪽은 최신 슬롯/읽는 중 슬롯이 아닌 슬롯에 쓰고 latest를 바꾼다.
+    읽는 쪽은 reader에 읽을 슬롯을 기록한 뒤 latest가 그대로인지 다시 확인한다.
+    (읽는 쪽은 하나만 가정)
+    """
+    
+    MAGIC = 0x474F414C  # "GOAL"
+    HEADER_FIELDS = 8   # magic, slots, max_height, max_width, latest, reader, sequence, reserved
+    SLOT_FIELDS = 6     # height, width, left, top, sequence, timestamp_ns
+    
+    MAGIC_F, SLOTS_F, MAX_HEIGHT_F, MAX_WIDTH_F, LATEST_F, READER_F, SEQUENCE_F = range(7)
+    
+    def __init__(self, buffer: memoryview, slots: int, max_height: int, max_width: int):
+        self.slots = slots
+        fields = self.HEADER_FIELDS + slots * self.SLOT_FIELDS
+        self.header = np.ndarray((fields,), dtype=np.int64, buffer=buffer)
+        self.slot_info = self.header[self.HEADER_FIELDS:].reshape(slots, self.SLOT_FIELDS)
+        self.frames = np.ndarray(
+            (slots, max_height, max_width, 3), dtype=np.uint8,
+            buffer=buffer, offset=fields * 8
+        )
+    
+    @classmethod
+    def size(cls, slots: int, max_height: int, max_width: int) -> int:
+        return (cls.HEADER_FIELDS + slots * cls.SLOT_FIELDS) * 8 + slots * max_height * max_width * 3
+
+
+class SharedMemoryFrameWriter:
+    """
+    프레임을 공유 메모리에 쓰는 쪽 (녹화/방송 프로그램 쪽 프로세스에서 사용)
+    
+    사용법:
+        writer = SharedMemoryFrameWriter("talesrunner-frames", 1920, 1080)
+        writer.write(bgr_frame)   # 매 프레임
+        writer.close()
+    """
+    
+    def __init__(self, name: str, max_width: int, max_height: int, slots: int = 3):
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=_SharedFrameLayout.size(slots, max_height, max_width)
+        )
+        self._layout = _SharedFrameLayout(self._shm.buf, slots, max_height, max_width)
+        header = self._layout.header
+        header[:] = 0
+        header[_SharedFrameLayout.SLOTS_F] = slots
+        header[_SharedFrameLayout.MAX_HEIGHT_F] = max_height
+        header[_SharedFrameLayout.MAX_WIDTH_F] = max_width
+        header[_SharedFrameLayout.LATEST_F] = -1
+        header[_SharedFrameLayout.READER_F] = -1
+        header[_SharedFrameLayout.MAGIC_F] = _SharedFrameLayout.MAGIC
+    
+    @property
+    def name(self) -> str:
+        return self._shm.name
+    
+    def write(self, frame: np.ndarray, left: int = 0, top: int = 0) -> int:
+        """
+        BGR 프레임 기록
+        
+        Args:
+            frame: (h, w, 3) uint8, 최대 크기 이하
+            left, top: 프레임 원점의 가상 화면 기준 좌표
+        
+        Returns:
+            프레임 번호
+        """
+        layout = self._layout
+        header = layout.header
+        height, width = frame.shape[:2]
+        if height > layout.frames.shape[1] or width > layout.frames.shape[2]:
+            raise ValueError(f"Frame {width}x{height} exceeds shared buffer")
+        
+        latest = int(header[_SharedFrameLayout.LATEST_F])
+        reader = int(header[_SharedFrameLayout.READER_F])
+        slot = next(s for s in range(layout.slots) if s != latest and s != reader)
+        
+        layout.frames[slot, :height, :width] = frame
+        sequence = int(header[_SharedFrameLayout.SEQUENCE_F]) + 1
+        layout.slot_info[slot] = (height, width, left, top, sequence, time.time_ns())
+        header[_SharedFrameLayout.SEQUENCE_F] = sequence
+        header[_SharedFrameLayout.LATEST_F] = slot
+        return sequence
+    
+    def close(self, unlink: bool = True) -> None:
+        layout, self._layout = self._layout, None
+        del layout
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    기존 공유 메모리에 연결
+    
+    Python 3.13 미만의 POSIX에서는 연결만 해도 resource_tracker가 종료 시 지워버리므로
+    가능하면 track=False로 연결한다 (Windows는 해당 없음).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedMemoryBackend(CaptureBackend):
+    """
+    SharedMemoryFrameWriter가 쓴 최신 프레임을 복사 없이 읽는 백엔드
+    
+    grab()이 반환한 뷰의 슬롯은 다음 grab() 또는 release() 전까지 쓰는 쪽이 건드리지 않는다.
+    get_monitor()가 잡은 슬롯을 바로 다음 grab()이 그대로 쓰므로
+    그 사이 크기/위치가 다른 프레임이 나와도 영역 계산과 잘라내기가 같은 프레임에서 이뤄진다.
+    """
+    
+    def __init__(self, name: str, timeout: float = 1.0):
+        """
+        Args:
+            name: 공유 메모리 이름 (SharedMemoryFrameWriter와 같게)
+            timeout: 첫 프레임을 기다리는 최대 시간 (초)
+        """
+        self._shm = _attach_shared_memory(name)
+        header = np.ndarray((_SharedFrameLayout.HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+        if header[_SharedFrameLayout.MAGIC_F] != _SharedFrameLayout.MAGIC:
+            del header
+            self._shm.close()
+            raise ValueError(f"Not a frame buffer: {name}")
+        self._layout = _SharedFrameLayout(
+            self._shm.buf,
+            int(header[_SharedFrameLayout.SLOTS_F]),
+            int(header[_SharedFrameLayout.MAX_HEIGHT_F]),
+            int(header[_SharedFrameLayout.MAX_WIDTH_F])
+        )
+        del header
+        self._timeout = timeout
+        self._monitor_slot: Optional[int] = None  # get_monitor()가 잡은 슬롯 (다음 grab()에서 사용)
+        self.sequence = 0
+    
+    def _acquire_latest(self) -> int:
+        """최신 슬롯을 읽는 중으로 표시하고 반환"""
+        header = self._layout.header
+        deadline = time.monotonic() + self._timeout
+        while True:
+            latest = int(header[_SharedFrameLayout.LATEST_F])
+            if latest >= 0:
+                header[_SharedFrameLayout.READER_F] = latest
+                # 표시하는 사이 새 프레임이 나왔으면 다시
+                if int(header[_SharedFrameLayout.LATEST_F]) == latest:
+                    return latest
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError("No frame in shared memory yet")
+            time.sleep(0.01)
+    
+    def get_monitor(self) -> Rect:
+        slot = self._acquire_latest()
+        self._monitor_slot = slot
+        height, width, left, top = (int(v) for v in self._layout.slot_info[slot, :4])
+        return {"left": left, "top": top, "width": width, "height": height}
+    
+    def grab(self, rect: Rect, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        slot, self._monitor_slot = self._monitor_slot, None
+        if slot is None:
+            slot = self._acquire_latest()
+        height, width, left, top, sequence, _ = (int(v) for v in self._layout.slot_info[slot])
+        self.sequence = sequence
+        frame = self._layout.frames[slot, :height, :width]
+        return _crop(frame, {"left": left, "top": top}, rect, dst)
+    
+    def release(self) -> None:
+        """읽는 중 표시 해제 (쓰는 쪽이 모든 슬롯을 쓸 수 있게)"""
+        if self._layout is not None:
+            self._layout.header[_SharedFrameLayout.READER_F] = -1
+        self._monitor_slot = None
+    
+    def close(self) -> None:
+        if self._layout is None:
+            return
+        self.release()
+        layout, self._layout = self._layout, None
+        del layout
+        self._shm.close()
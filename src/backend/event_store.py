@@ -0,0 +1,232 @@
+"""
+이벤트 저장 모듈
+진행 상태 변경을 SQLite (WAL 모드)에 추가 전용 이벤트 로그로 기록:
+1. append()는 대기열에 넣기만 하고, 전용 스레드가 모아서 한 트랜잭션으로 기록
+   -> 이벤트 루프가 디스크 I/O를 기다리지 않음
+2. 주기적으로 전체 상태 스냅샷을 저장하고 그 이전 이벤트는 삭제 (로그 압축)
+3. 시작 시 최신 스냅샷 + 그 뒤 이벤트만 읽어서 상태 복원
+
+이벤트 타입 (payload):
+    increment            {"map_id"}
+    reset                {"map_id"}
+    map_added            {"map_id", "map_name", "category"}
+    auto_detect_toggled  {"enabled"}
+    goal_detected        {"map_id", "source_id", "confidence"}
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from metrics import registry as metrics
+
+
+# 기본 DB 위치
+DEFAULT_DB_PATH = Path(__file__).parent / "data" / "progress.db"
+
+FLUSH_SECONDS = metrics.histogram("tr_event_log_flush_seconds", "Time to write one batch to the event log")
+EVENTS_WRITTEN_TOTAL = metrics.counter("tr_event_log_events_total", "Events written to the event log")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    last_event_id INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class StoredEvent:
+    """로그에서 읽은 이벤트"""
+    event_id: int
+    ts: float
+    type: str
+    payload: dict
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path))
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 NORMAL도 손상 없음 (마지막 몇 건만 유실 가능)
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+class EventStore:
+    """
+    SQLite 이벤트 로그 + 스냅샷
+    
+    쓰기는 모두 대기열을 거쳐 전용 스레드에서 순서대로 처리되므로,
+    append() 직후 호출한 snapshot()은 그때까지의 이벤트를 정확히 포함한다.
+    같은 DB를 쓰는 다른 모듈(완주 기록 등)도 execute()로 이 스레드에 쓰기를 맡긴다.
+    """
+    
+    BATCH_SIZE = 256                # 한 트랜잭션에 기록할 최대 이벤트 수
+    FLUSH_INTERVAL = 0.5            # 이벤트가 적어도 이 간격(초)마다 기록
+    SNAPSHOT_EVERY = 500            # 이 개수만큼 이벤트가 쌓이면 스냅샷 + 압축
+    
+    _STOP = object()
+    
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.events_since_snapshot = 0
+    
+    # ========================================
+    # 시작 시 복원
+    # ========================================
+    
+    def load(self) -> Tuple[Optional[dict], List[StoredEvent]]:
+        """
+        최신 스냅샷 + 그 뒤 이벤트 읽기 (작성 스레드 시작 전에 호출)
+        
+        Returns:
+            (스냅샷 상태 또는 None, 스냅샷 이후 이벤트 목록)
+        """
+        connection = _connect(self.path)
+        try:
+            row = connection.execute(
+                "SELECT last_event_id, state FROM snapshots ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            last_event_id, state = (row[0], json.loads(row[1])) if row else (0, None)
+            events = [
+                StoredEvent(event_id, ts, event_type, json.loads(payload))
+                for event_id, ts, event_type, payload in connection.execute(
+                    "SELECT id, ts, type, payload FROM events WHERE id > ? ORDER BY id", (last_event_id,)
+                )
+            ]
+        finally:
+            connection.close()
+        self.events_since_snapshot = len(events)
+        return state, events
+    
+    # ========================================
+    # 기록 (이벤트 루프 쪽, 기다리지 않음)
+    # ========================================
+    
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._writer, name="event-store", daemon=True)
+        self._thread.start()
+    
+    def append(self, event_type: str, payload: dict) -> None:
+        """이벤트 추가 (대기열에 넣기만 함)"""
+        self._queue.put(("event", time.time(), event_type, json.dumps(payload, ensure_ascii=False)))
+        self.events_since_snapshot += 1
+    
+    @property
+    def snapshot_due(self) -> bool:
+        return self.events_since_snapshot >= self.SNAPSHOT_EVERY
+    
+    def execute(self, sql: str, params: tuple = ()) -> None:
+        """다른 모듈의 쓰기를 같은 작성 스레드/트랜잭션에서 실행 (대기열 경유)"""
+        self._queue.put(("sql", sql, params))
+    
+    def snapshot(self, state: dict) -> None:
+        """전체 상태 스냅샷 저장 + 그 이전 이벤트 삭제 (대기열 경유)"""
+        self._queue.put(("snapshot", time.time(), json.dumps(state, ensure_ascii=False)))
+        self.events_since_snapshot = 0
+    
+    def close(self, final_state: Optional[dict] = None) -> None:
+        """남은 이벤트 기록 후 종료 (final_state가 있으면 마지막 스냅샷)"""
+        if self._thread is None:
+            return
+        if final_state is not None:
+            self.snapshot(final_state)
+        self._queue.put(self._STOP)
+        self._thread.join(timeout=10.0)
+        self._thread = None
+    
+    # ========================================
+    # 작성 스레드
+    # ========================================
+    
+    def _writer(self) -> None:
+        connection = _connect(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                try:
+                    batch = [self._queue.get(timeout=self.FLUSH_INTERVAL)]
+                except queue.Empty:
+                    continue
+                # 이미 쌓여 있는 것들을 한 번에
+                while len(batch) < self.BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is self._STOP:
+                    batch.pop()
+                    stopping = True
+                try:
+                    with FLUSH_SECONDS.time():
+                        self._write_batch(connection, batch)
+                except sqlite3.Error as e:
+                    print(f"[ERROR] Event log write failed ({len(batch)} items): {e}")
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def _execute_isolated(connection: sqlite3.Connection, sql: str, params: tuple) -> None:
+        """
+        다른 모듈의 쓰기 하나를 세이브포인트 안에서 실행
+        실패하면 그 쓰기만 되돌리고 배치의 나머지(이벤트/스냅샷)는 그대로 기록
+        """
+        if not connection.in_transaction:
+            connection.execute("BEGIN")  # 세이브포인트가 바깥 트랜잭션이 되면 RELEASE에서 커밋되므로
+        connection.execute("SAVEPOINT sql_item")
+        try:
+            connection.execute(sql, params)
+        except sqlite3.Error as e:
+            connection.execute("ROLLBACK TO sql_item")
+            print(f"[ERROR] Event log SQL write failed: {e}")
+        connection.execute("RELEASE sql_item")
+    
+    @staticmethod
+    def _write_batch(connection: sqlite3.Connection, batch: list) -> None:
+        events: list = []
+        with connection:
+            for item in batch:
+                if item[0] == "event":
+                    events.append(item[1:])
+                    continue
+                # 이벤트가 아닌 항목 앞에서는 모아 둔 이벤트를 먼저 기록 (대기열 순서 유지)
+                EventStore._insert_events(connection, events)
+                events = []
+                if item[0] == "sql":
+                    EventStore._execute_isolated(connection, item[1], item[2])
+                    continue
+                # 스냅샷: 앞의 이벤트까지 포함해야 last_event_id가 맞음
+                _, ts, state = item
+                last_event_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+                cursor = connection.execute(
+                    "INSERT INTO snapshots (ts, last_event_id, state) VALUES (?, ?, ?)",
+                    (ts, last_event_id, state)
+                )
+                connection.execute("DELETE FROM events WHERE id <= ?", (last_event_id,))
+                connection.execute("DELETE FROM snapshots WHERE id < ?", (cursor.lastrowid,))
+            EventStore._insert_events(connection, events)
+    
+    @staticmethod
+    def _insert_events(connection: sqlite3.Connection, events: list) -> None:
+        """모아 둔 이벤트를 한 번에 기록"""
+        if events:
+            connection.executemany("INSERT INTO events (ts, type, payload) VALUES (?, ?, ?)", events)
+            EVENTS_WRITTEN_TOTAL.inc(len(events))
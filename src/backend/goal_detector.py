@@ -9,11 +9,16 @@ GOAL 이미지 감지 모듈 (개선 버전)
 import cv2
 import numpy as np
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple, Optional
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Optional
+from dataclasses import dataclass, asdict
 
-from screen_capture import capture_primary_monitor
+from capture_backends import CaptureBackend
+from screen_capture import CaptureThread, get_default_backend
+from template_matcher import TemplateMatcher
 
 
 @dataclass
@@ -23,6 +28,90 @@ class DetectionResult:
     confidence: float
     location: Optional[Tuple[int, int]] = None
     timestamp: float = 0.0
+    bbox: Optional[Tuple[int, int, int, int]] = None  # 후보 박스 (x, y, w, h), 화면 기준
+    skipped: bool = False  # 화면 변화가 없어 분석을 건너뛴 경우
+
+
+@dataclass
+class StageStats:
+    """감지 단계별 통과율/소요 시간 통계"""
+    runs: int = 0
+    passes: int = 0
+    total_seconds: float = 0.0
+    
+    @property
+    def pass_rate(self) -> float:
+        return self.passes / self.runs if self.runs else 0.0
+    
+    @property
+    def avg_ms(self) -> float:
+        return self.total_seconds / self.runs * 1000 if self.runs else 0.0
+
+
+@dataclass(frozen=True)
+class Region:
+    """캡처 영역 (모니터 기준 상대 좌표)"""
+    left: int
+    top: int
+    width: int
+    height: int
+
+
+class _Workspace:
+    """
+    해상도별 재사용 버퍼 묶음
+    
+    buffer()는 같은 이름이면 같은 배열을 돌려주므로 OpenCV의 dst=로 넘겨서
+    매 프레임 새로 할당하지 않는다. 비활성화 시 None을 돌려줘서 OpenCV가 새로 할당.
+    """
+    
+    def __init__(self, height: int, width: int, enabled: bool):
+        self.height = height
+        self.width = width
+        self.enabled = enabled
+        self._buffers: Dict[str, np.ndarray] = {}
+    
+    def buffer(self, name: str, channels: int = 1, dtype: type = np.uint8) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+        buf = self._buffers.get(name)
+        if buf is None:
+            shape = (self.height, self.width) if channels == 1 else (self.height, self.width, channels)
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+        return buf
+
+
+def build_color_lut(hsv_ranges: List[Tuple[np.ndarray, np.ndarray]], bits: int = 5) -> np.ndarray:
+    """
+    양자화한 BGR -> "GOAL 색상 여부" 룩업 테이블 생성
+    
+    채널당 bits 비트로 양자화한 칸마다 칸 안의 4x4x4 샘플을 HSV 범위로 판정해서
+    절반 이상이 범위 안이면 255. HSV 변환은 테이블을 만들 때 한 번만 한다.
+    
+    Returns:
+        길이 2^(3*bits)의 uint8 배열, 인덱스 = (B << 2*bits) | (G << bits) | R (양자화 값)
+    """
+    levels = 1 << bits
+    step = 256 // levels
+    # 칸 안의 샘플 위치 (칸 크기 8이면 1, 3, 5, 7)
+    offsets = (np.arange(4) * step // 4 + step // 8).astype(np.uint8)
+    
+    bins = np.arange(levels, dtype=np.uint8) * step
+    samples = (bins[:, None] + offsets[None, :]).reshape(-1)  # levels * 4
+    
+    # (B, G, R) 모든 조합 -> 1줄짜리 이미지로 만들어 한 번에 HSV 변환
+    b, g, r = np.meshgrid(samples, samples, samples, indexing="ij")
+    bgr = np.stack([b, g, r], axis=-1).reshape(1, -1, 3)
+    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+    
+    inside = np.zeros(hsv.shape[:2], dtype=np.uint8)
+    for lower, upper in hsv_ranges:
+        inside |= cv2.inRange(hsv, lower, upper)
+    
+    # (levels, 4, levels, 4, levels, 4) -> 칸별 샘플 비율
+    votes = (inside.reshape(levels, 4, levels, 4, levels, 4) > 0).mean(axis=(1, 3, 5))
+    return np.where(votes >= 0.5, 255, 0).astype(np.uint8).reshape(-1)
 
 
 class GoalDetector:
@@ -51,147 +140,842 @@ class GoalDetector:
         (np.array([25, 120, 180]), np.array([40, 255, 255])),
     ]
     
-    def __init__(self, template_path: Optional[str] = None):
+    # 후보 검증 조건 (모두 전체 화면 크기 기준 비율)
+    MIN_AREA_RATIO = 0.005          # 최소 면적 (화면의 0.5%)
+    MAX_Y_RATIO = 0.6               # 색상 후보 상단 y 한계
+    EDGE_MAX_Y_RATIO = 0.5          # 에지 후보 상단 y 한계
+    MIN_ASPECT_RATIO = 1.5          # 최소 가로:세로 비율
+    WIDTH_RATIO_RANGE = (0.15, 0.7) # 화면 너비 대비 GOAL 너비
+    
+    # 보정 프로필 (calibration.py)로 감지기마다 덮어쓸 수 있는 값
+    CALIBRATED_ATTRIBUTES = (
+        "HSV_RANGES", "MIN_AREA_RATIO", "MAX_Y_RATIO", "EDGE_MAX_Y_RATIO", "MIN_ASPECT_RATIO", "WIDTH_RATIO_RANGE"
+    )
+    
+    # 캡처 ROI 자동 계산용 값
+    # GOAL 상단은 MAX_Y_RATIO 위에 있고 글자 높이는 화면의 20% 정도를 넘지 않음
+    GOAL_MAX_HEIGHT_RATIO = 0.2
+    # GOAL은 가운데 정렬이므로 좌우 가장자리는 캡처하지 않음
+    ROI_HORIZONTAL_MARGIN = 0.1
+    
+    # 다중 해상도 감지 설정
+    PYRAMID_SCALE = 0.25            # 1차 탐색 프레임 축소 비율
+    PYRAMID_PADDING = 4             # 후보 박스 여유 (축소 프레임 픽셀 단위)
+    
+    # 형태학 커널 (매 호출마다 만들지 않도록 한 번만 생성)
+    _KERNEL_SMALL = np.ones((3, 3), np.uint8)
+    _KERNEL_LARGE = np.ones((7, 7), np.uint8)
+    _KERNEL_EDGE = np.ones((5, 5), np.uint8)
+    WORKSPACE_CACHE_SIZE = 8        # 유지할 해상도별 버퍼 묶음 수
+    
+    # 색상 룩업 테이블 (use_color_lut=True일 때 HSV 변환 대신 사용)
+    COLOR_LUT_BITS = 5              # 채널당 양자화 비트 (5 -> 32^3 테이블, 32KB)
+    
+    # 가로 띠 병렬 처리 (stripe_workers > 1일 때 색상 마스크 + 형태학 처리를 띠별로 동시에)
+    # 띠 경계 결과가 전체 처리와 같도록 형태학 처리 전체의 영향 반경만큼 겹친다
+    # (열기 3x3: 1+1, 닫기 7x7: 3+3, 팽창 3x3 x2: 1+1 -> 10줄)
+    STRIPE_OVERLAP = 10
+    STRIPE_MIN_ROWS = 128           # 띠 하나의 최소 높이 (이보다 작으면 나누지 않음)
+    
+    # 감지 단계 (캐스케이드) 설정
+    # 간이 필터: STRIDE 간격으로 샘플링한 픽셀 중 GOAL 색상 비율로 판단
+    # GOAL 최소 면적의 일부(RELAX)만큼도 색상 픽셀이 없으면 바로 종료
+    PREFILTER_STRIDE = 8
+    PREFILTER_RELAX = 0.3
+    CONFIRM_PADDING_RATIO = 0.02    # 확인 단계 분석 영역 여유 (화면 너비 대비)
+    STAGES = ("change_gate", "prefilter", "color", "template", "edge")
+    
+    # 템플릿 안의 GOAL 글자 영역: 색상 마스크 덩어리 중 템플릿 면적의 2% 이상인 것들
+    TEMPLATE_TEXT_MIN_AREA_RATIO = 0.02
+    
+    # 화면 변화 감지 (로비/메뉴/일시정지 등 정지 화면은 분석 생략)
+    CHANGE_GATE_STRIDE = 16         # 썸네일 샘플링 간격
+    CHANGE_GATE_PIXEL_DELTA = 24    # 썸네일 픽셀이 바뀌었다고 볼 밝기 차이 (0~255, 압축 노이즈보다 크게)
+    CHANGE_GATE_MIN_PIXELS = 4      # 바뀐 썸네일 픽셀이 이만큼 있으면 화면 변화
+    CHANGE_GATE_MAX_SKIPS = 20      # 연속 생략 최대 횟수 (이후 강제 분석)
+    
+    # 후보 추적 (찾은 후보 박스 주변만 다시 캡처/분석)
+    TRACK_PADDING_RATIO = 0.05      # 추적 창 여유 (화면 너비 대비, GOAL 확대 애니메이션 대비)
+    TRACK_MAX_MISSES = 3            # 창 안에서 연속으로 못 찾으면 전체 탐색으로 복귀
+    TRACK_MAX_FRAMES = 10           # 같은 후보를 이만큼 추적하면 전체 탐색 한 번 (다른 후보를 놓치지 않게)
+    
+    def __init__(
+        self,
+        template_path: Optional[str] = None,
+        roi: Optional[Tuple[float, float, float, float]] = None,
+        use_roi: bool = True,
+        use_pyramid: bool = True,
+        reuse_buffers: bool = True,
+        use_color_lut: bool = False,
+        capture_backend: Optional[CaptureBackend] = None,
+        stripe_workers: int = 0,
+        use_tracking: bool = False,
+        confirm_frames: int = 1,
+        profile_provider: Optional[Callable[[Tuple[int, int]], Optional[Any]]] = None
+    ):
+        """
+        Args:
+            template_path: GOAL 템플릿 이미지 경로
+            roi: 캡처 영역 비율 (left, top, right, bottom), None이면 자동 계산
+            use_roi: False면 기존처럼 모니터 전체를 캡처
+            use_pyramid: 축소 프레임에서 후보를 먼저 찾는 다중 해상도 감지 사용
+            reuse_buffers: 해상도별 작업 버퍼를 재사용 (False면 매번 새로 할당)
+            use_color_lut: 색상 마스크를 HSV 변환 대신 BGR 룩업 테이블로 생성
+            capture_backend: 프레임을 공급할 캡처 백엔드 (녹화 재생, 공유 메모리 등)
+                             None이면 mss로 주 모니터를 캡처
+            stripe_workers: 2 이상이면 큰 이미지의 색상 마스크를 가로 띠로 나눠 스레드 병렬 처리
+            use_tracking: 색상 후보를 찾으면 다음 틱부터 그 박스 주변 창만 캡처/분석
+            confirm_frames: 이 횟수만큼 연속으로 감지되어야 GOAL로 확정
+            profile_provider: 화면 크기 -> 보정 프로필 (calibration.CalibrationProfile) 함수
+                              화면 크기가 바뀔 때마다 호출해서 프로필 값으로 감지 조건을 바꿈
+        """
         self._last_detection_time: float = 0.0
         self._consecutive_detections: int = 0
         
-        # 템플릿 로드 (있으면)
-        self._template = None
+        # 캡처 ROI 설정
+        self._use_roi = use_roi
+        self._configured_roi = roi
+        self._roi_ratios = roi if roi is not None else self.default_roi_ratios()
+        self._roi_cache: Optional[Tuple[Tuple[int, int], Region]] = None
+        
+        # 해상도별 보정 프로필
+        self._profile_provider = profile_provider
+        self._profile_screen: Optional[Tuple[int, int]] = None
+        
+        # 다중 해상도 감지
+        self._use_pyramid = use_pyramid
+        
+        # 해상도별 작업 버퍼
+        self._reuse_buffers = reuse_buffers
+        self._workspaces: "OrderedDict[Tuple[int, int], _Workspace]" = OrderedDict()
+        
+        # 색상 룩업 테이블 (HSV_RANGES가 바뀌면 다시 생성)
+        self._use_color_lut = use_color_lut
+        self._color_lut: Optional[np.ndarray] = None
+        self._color_lut_key: Optional[tuple] = None
+        
+        # 가로 띠 병렬 처리 (OpenCV는 GIL을 풀어서 스레드로 충분)
+        self._stripe_workers = stripe_workers
+        self._stripe_pool: Optional[ThreadPoolExecutor] = None
+        if stripe_workers > 1:
+            self._stripe_pool = ThreadPoolExecutor(max_workers=stripe_workers, thread_name_prefix="stripe")
+        # 해상도별 띠 작업 버퍼 (띠마다 따로 -> 스레드끼리 버퍼 공유 없음)
+        self._stripe_workspaces: Dict[Tuple[int, int], List[Tuple[int, int, int, _Workspace]]] = {}
+        
+        # 캡처 전용 스레드 (없으면 매 틱 직접 캡처)
+        self._capture_thread: Optional[CaptureThread] = None
+        self._capture_backend: CaptureBackend = capture_backend or get_default_backend()
+        
+        # 단계별 통계 + 마지막 프레임의 단계/세부 작업별 소요 시간 (ms)
+        self._stage_stats: Dict[str, StageStats] = {name: StageStats() for name in self.STAGES}
+        self.last_timings: Dict[str, float] = {}
+        
+        # 마지막 감지의 시각 기록 (time.time): captured / analysis_started / analysis_finished
+        # (GOAL 지연 추적용, 프로세스 작업자와 서버가 같은 시계를 쓴다)
+        self.last_trace: Dict[str, float] = {}
+        self._last_frame_time = 0.0
+        
+        # 화면 변화 감지 상태
+        self._last_thumbnail: Optional[np.ndarray] = None
+        self._last_analyzed_detected: bool = False
+        self._skipped_frames: int = 0
+        self._last_change_time: float = time.time()
+        
+        # 후보 추적 상태 (박스는 화면 기준 x/y/w/h)
+        self._use_tracking = use_tracking
+        self._confirm_frames = max(1, confirm_frames)
+        self._track_bbox: Optional[Tuple[int, int, int, int]] = None
+        self._track_misses: int = 0
+        self._track_frames: int = 0
+        
+        # 템플릿 매처 (있으면 확인 단계에서 에지 대신 사용)
+        self._template_matcher: Optional[TemplateMatcher] = None
         if template_path and Path(template_path).exists():
-            self._template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+            template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+            if template is not None:
+                self._template_matcher = TemplateMatcher(
+                    template, self._find_template_text_bbox(template), width_range=self.WIDTH_RATIO_RANGE
+                )
+    
+    @classmethod
+    def default_roi_ratios(cls) -> Tuple[float, float, float, float]:
+        """
+        검증 조건에서 ROI 비율을 자동 계산
+        
+        y 한계(MAX_Y_RATIO) 아래에서 시작하는 후보는 어차피 버려지므로
+        상단 밴드 + GOAL 글자 높이만큼만 캡처한다.
+        """
+        bottom = min(1.0, max(cls.MAX_Y_RATIO, cls.EDGE_MAX_Y_RATIO) + cls.GOAL_MAX_HEIGHT_RATIO)
+        margin = cls.ROI_HORIZONTAL_MARGIN
+        return (margin, 0.0, 1.0 - margin, bottom)
+    
+    def get_capture_region(self, screen_size: Tuple[int, int]) -> Region:
+        """
+        화면 크기에 맞는 캡처 ROI 반환 (화면 크기가 바뀔 때만 다시 계산)
+        
+        Args:
+            screen_size: (width, height) 모니터 크기
+        """
+        if self._roi_cache is not None and self._roi_cache[0] == screen_size:
+            return self._roi_cache[1]
+        
+        width, height = screen_size
+        left_ratio, top_ratio, right_ratio, bottom_ratio = self._roi_ratios
+        left = int(width * left_ratio)
+        top = int(height * top_ratio)
+        right = max(left + 1, int(round(width * right_ratio)))
+        bottom = max(top + 1, int(round(height * bottom_ratio)))
+        region = Region(left=left, top=top, width=min(right, width) - left, height=min(bottom, height) - top)
+        
+        self._roi_cache = (screen_size, region)
+        return region
+    
+    def apply_calibration(
+        self,
+        overrides: Optional[Dict[str, Any]] = None,
+        roi: Optional[Tuple[float, float, float, float]] = None
+    ) -> None:
+        """
+        감지 조건을 인스턴스 값으로 덮어쓰기 (None이면 클래스 기본값으로 복귀)
+        
+        Args:
+            overrides: CALIBRATED_ATTRIBUTES 중 바꿀 값 (HSV_RANGES가 바뀌면 룩업 테이블도 다시 생성되고
+                       WIDTH_RATIO_RANGE는 템플릿 피라미드에도 반영됨)
+            roi: 캡처 ROI 비율, 생성자에서 roi를 직접 지정했으면 무시
+        
+        Raises:
+            ValueError: 보정할 수 없는 속성 이름
+        """
+        unknown = set(overrides or {}) - set(self.CALIBRATED_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Not calibratable: {', '.join(sorted(unknown))}")
+        for name in self.CALIBRATED_ATTRIBUTES:
+            self.__dict__.pop(name, None)
+        for name, value in (overrides or {}).items():
+            setattr(self, name, value)
+        
+        # 템플릿 피라미드도 보정된 GOAL 너비 범위로
+        if self._template_matcher is not None:
+            self._template_matcher.set_width_range(self.WIDTH_RATIO_RANGE)
+        
+        if self._configured_roi is None:
+            self._roi_ratios = roi if roi is not None else self.default_roi_ratios()
+            self._roi_cache = None
     
-    def detect_goal_by_color_and_shape(self, image: np.ndarray) -> DetectionResult:
+    def _sync_calibration(self, screen_size: Tuple[int, int]) -> None:
+        """화면 크기가 바뀌었으면 그 해상도의 보정 프로필 적용 (없으면 기본값)"""
+        if self._profile_provider is None or self._profile_screen == screen_size:
+            return
+        self._profile_screen = screen_size
+        profile = self._profile_provider(screen_size)
+        if profile is None:
+            self.apply_calibration(None)
+        else:
+            self.apply_calibration(profile.detector_overrides(), profile.roi)
+    
+    def get_capture_rect(self, monitor: Dict[str, int]) -> Dict[str, int]:
+        """
+        모니터 정보 -> 실제 캡처 영역 (가상 화면 기준 좌표)
+        CaptureThread의 rect_provider로 사용 (후보 추적 중이면 추적 창만 캡처)
+        """
+        window = self._tracking_region((monitor["width"], monitor["height"]))
+        if window is not None:
+            return self._region_rect(monitor, window)
+        return self._roi_rect(monitor)
+    
+    def _roi_rect(self, monitor: Dict[str, int]) -> Dict[str, int]:
+        """ROI(또는 모니터 전체) 캡처 영역"""
+        if not self._use_roi:
+            return dict(monitor)
+        return self._region_rect(monitor, self.get_capture_region((monitor["width"], monitor["height"])))
+    
+    @staticmethod
+    def _region_rect(monitor: Dict[str, int], region: Region) -> Dict[str, int]:
+        return {
+            "left": monitor["left"] + region.left,
+            "top": monitor["top"] + region.top,
+            "width": region.width,
+            "height": region.height
+        }
+    
+    def attach_capture_thread(self, capture_thread: Optional[CaptureThread]) -> None:
+        """
+        캡처 전용 스레드 연결 (None이면 해제)
+        연결하면 check_for_goal이 직접 캡처하지 않고 스레드의 최신 프레임을 사용
+        """
+        self._capture_thread = capture_thread
+    
+    def start_capture_thread(self, interval: float = 0.25, linger: Optional[float] = None) -> CaptureThread:
+        """
+        이 감지기의 ROI를 캡처하는 전용 스레드를 만들어 시작하고 연결
+        
+        Args:
+            interval: 캡처 간격 (초)
+            linger: 감지 요청이 끊긴 뒤 캡처를 계속할 시간 (CaptureThread 참고)
+        """
+        capture_thread = CaptureThread(
+            rect_provider=self.get_capture_rect, interval=interval, backend=self._capture_backend, linger=linger
+        ).start()
+        self.attach_capture_thread(capture_thread)
+        return capture_thread
+    
+    def stop_capture_thread(self) -> None:
+        """연결된 캡처 전용 스레드를 해제하고 정지"""
+        capture_thread, self._capture_thread = self._capture_thread, None
+        if capture_thread is not None:
+            capture_thread.stop()
+    
+    @property
+    def capture_backend(self) -> CaptureBackend:
+        return self._capture_backend
+    
+    @contextmanager
+    def _screen(self) -> Iterator[Tuple[np.ndarray, Tuple[int, int], Tuple[int, int], bool]]:
+        """
+        분석할 화면 (capture_screen과 같은 형식 + 추적 창 여부)
+        
+        추적 중이면 후보 박스 주변 창만 캡처한다 (get_capture_rect가 추적 창을 돌려줌).
+        캡처 스레드가 있으면 최신 프레임을 복사 없이 빌려 쓰고 블록이 끝나면 반납
+        -> 스레드도 다음 캡처부터 추적 창만 찍고, 그 전에 찍힌 ROI 프레임은 창만큼 잘라서 씀
+        """
+        if self._capture_thread is None:
+            monitor = self._capture_backend.get_monitor()
+            self._sync_calibration((monitor["width"], monitor["height"]))
+            window = self._tracking_region((monitor["width"], monitor["height"]))
+            # capture_region과 같은 방식으로 창 영역만 캡처
+            rect = self._roi_rect(monitor) if window is None else self._region_rect(monitor, window)
+            captured = self._grab(monitor, rect)
+            self._last_frame_time = time.time()
+            yield (*captured, window is not None)
+            return
+        
+        with self._capture_thread.lease_latest() as frame:
+            self._last_frame_time = frame.timestamp
+            monitor, rect = frame.monitor, frame.rect
+            screen_size = (monitor["width"], monitor["height"])
+            self._sync_calibration(screen_size)
+            offset_x, offset_y = rect["left"] - monitor["left"], rect["top"] - monitor["top"]
+            image = frame.image
+            
+            window = self._tracking_region(screen_size)
+            if window is not None:
+                height, width = image.shape[:2]
+                x0 = min(max(0, window.left - offset_x), width)
+                y0 = min(max(0, window.top - offset_y), height)
+                x1 = min(width, window.left + window.width - offset_x)
+                y1 = min(height, window.top + window.height - offset_y)
+                if x1 > x0 and y1 > y0:
+                    yield image[y0:y1, x0:x1], screen_size, (offset_x + x0, offset_y + y0), True
+                    return
+            yield image, screen_size, (offset_x, offset_y), False
+    
+    def capture_screen(self) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]:
+        """
+        ROI(또는 모니터 전체)를 캡처
+        
+        Returns:
+            (이미지, 모니터 크기 (w, h), 이미지 원점의 모니터 기준 좌표 (x, y))
+        """
+        monitor = self._capture_backend.get_monitor()
+        return self._grab(monitor, self._roi_rect(monitor))
+    
+    def _grab(
+        self,
+        monitor: Dict[str, int],
+        rect: Dict[str, int]
+    ) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]:
+        image = self._capture_backend.grab(rect)
+        return (
+            image,
+            (monitor["width"], monitor["height"]),
+            (rect["left"] - monitor["left"], rect["top"] - monitor["top"])
+        )
+    
+    # ========================================
+    # 후보 추적
+    # ========================================
+    
+    def _tracking_region(self, screen_size: Tuple[int, int]) -> Optional[Region]:
+        """
+        이번 틱에 분석할 추적 창 (화면 기준), 전체 탐색할 차례면 None
+        
+        창은 후보 박스에 TRACK_PADDING_RATIO만큼 여유를 두고 캡처 ROI 안으로 자른다.
+        """
+        if not self._use_tracking or self._track_bbox is None or self._track_frames >= self.TRACK_MAX_FRAMES:
+            return None
+        
+        width, height = screen_size
+        bounds = self.get_capture_region(screen_size) if self._use_roi else Region(0, 0, width, height)
+        x, y, w, h = self._track_bbox
+        padding = int(width * self.TRACK_PADDING_RATIO)
+        left = max(bounds.left, x - padding)
+        top = max(bounds.top, y - padding)
+        right = min(bounds.left + bounds.width, x + w + padding)
+        bottom = min(bounds.top + bounds.height, y + h + padding)
+        if right <= left or bottom <= top:
+            return None
+        return Region(left=left, top=top, width=right - left, height=bottom - top)
+    
+    def _update_track(self, result: Optional[DetectionResult], tracking: bool) -> None:
+        """
+        색상 단계 결과로 추적 상태 갱신
+        
+        조건을 통과한 후보 박스가 있으면 (신뢰도가 임계값 미만이어도) 그 박스를 따라가고,
+        추적 창에서 TRACK_MAX_MISSES번 연속 못 찾거나 전체 탐색에서 못 찾으면 추적을 끝낸다.
+        """
+        if not self._use_tracking:
+            return
+        if result is not None and result.bbox is not None:
+            self._track_bbox = result.bbox
+            self._track_misses = 0
+            self._track_frames = self._track_frames + 1 if tracking else 0
+        elif tracking:
+            self._track_misses += 1
+            if self._track_misses >= self.TRACK_MAX_MISSES:
+                self.reset_tracking()
+        else:
+            self.reset_tracking()
+    
+    def reset_tracking(self) -> None:
+        """추적 중인 후보를 버리고 다음 틱부터 전체 탐색"""
+        self._track_bbox = None
+        self._track_misses = 0
+        self._track_frames = 0
+    
+    @property
+    def tracked_bbox(self) -> Optional[Tuple[int, int, int, int]]:
+        """추적 중인 후보 박스 (화면 기준 x/y/w/h), 없으면 None"""
+        return self._track_bbox
+    
+    def detect_goal_by_color_and_shape(
+        self,
+        image: np.ndarray,
+        screen_size: Optional[Tuple[int, int]] = None,
+        offset: Tuple[int, int] = (0, 0)
+    ) -> DetectionResult:
         """
         색상 + 형태 기반 GOAL 감지 (배경 변화에 강함)
         
         1단계: HSV 색상으로 오렌지-골드 영역 추출
         2단계: 형태학적 처리로 노이즈 제거
         3단계: 컨투어 분석으로 GOAL 크기/위치 검증
+        
+        Args:
+            image: BGR 이미지 (화면 전체 또는 ROI)
+            screen_size: 전체 화면 크기 (w, h), None이면 image 크기
+            offset: image 원점의 화면 기준 좌표 (ROI 캡처 시)
+        
+        검증 조건은 전체 화면 기준이므로 ROI만 넘겨도 결과가 같고,
+        반환되는 위치도 화면 기준 좌표다.
         """
         height, width = image.shape[:2]
+        screen_width, screen_height = screen_size or (width, height)
         
-        # BGR -> HSV 변환
-        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        # 색상 마스크 + 후보 추출
+        combined_mask = self._build_color_mask(image)
+        areas, boxes = self._find_color_candidates(
+            combined_mask, (screen_width, screen_height), offset
+        )
         
-        # 여러 색상 범위를 합쳐서 마스크 생성
-        combined_mask = np.zeros((height, width), dtype=np.uint8)
-        for lower, upper in self.HSV_RANGES:
-            mask = cv2.inRange(hsv, lower, upper)
-            combined_mask = cv2.bitwise_or(combined_mask, mask)
+        if len(areas) == 0:
+            return DetectionResult(detected=False, confidence=0.0, timestamp=time.time())
         
-        # 형태학적 처리 (노이즈 제거 + 영역 연결)
-        kernel_small = np.ones((3, 3), np.uint8)
-        kernel_large = np.ones((7, 7), np.uint8)
+        # 가장 큰 유효 후보 선택 + 신뢰도
+        best = int(np.argmax(areas))
+        x, y, w, h = (int(v) for v in boxes[best])
+        confidence = float(self._score_color_candidates(areas, boxes, (screen_width, screen_height))[best])
         
+        # 중심점 계산
+        cx = x + w // 2
+        cy = y + h // 2
+        
+        detected = confidence >= self.CONFIDENCE_THRESHOLD
+        
+        return DetectionResult(
+            detected=detected,
+            confidence=confidence,
+            location=(cx, cy) if detected else None,
+            timestamp=time.time(),
+            bbox=(x, y, w, h)
+        )
+    
+    def _workspace(self, shape: Tuple[int, ...]) -> _Workspace:
+        """해상도별 작업 버퍼 (처음 보는 해상도일 때만 새로 만듦)"""
+        key = (shape[0], shape[1])
+        workspace = self._workspaces.get(key)
+        if workspace is None:
+            workspace = _Workspace(key[0], key[1], self._reuse_buffers)
+            self._workspaces[key] = workspace
+            if len(self._workspaces) > self.WORKSPACE_CACHE_SIZE:
+                self._workspaces.popitem(last=False)
+        else:
+            self._workspaces.move_to_end(key)
+        return workspace
+    
+    def _build_color_mask(self, image: np.ndarray) -> np.ndarray:
+        """
+        HSV 색상 범위 + 형태학적 처리로 GOAL 색상 마스크 생성
+        
+        반환값은 작업 버퍼일 수 있으므로 같은 해상도로 다시 호출하기 전에 사용할 것
+        """
+        stripes = self._stripe_plan(image.shape)
+        if stripes is not None:
+            started = time.perf_counter()
+            mask = self._build_color_mask_striped(image, stripes)
+            self._add_timing("color_mask_striped", started)
+            return mask
+        
+        workspace = self._workspace(image.shape)
+        started = time.perf_counter()
+        classified = self._classify_colors(image, workspace)
+        self._add_timing("color_convert", started)
+        started = time.perf_counter()
+        mask = self._apply_morphology(classified, workspace)
+        self._add_timing("morphology", started)
+        return mask
+    
+    def _stripe_plan(self, shape: Tuple[int, ...]) -> Optional[List[Tuple[int, int, int, _Workspace]]]:
+        """
+        해상도별 띠 나누기 (띠 병렬 처리를 안 하거나 이미지가 작으면 None)
+        
+        Returns:
+            [(원본 시작 줄, 원본 끝 줄, 띠 안에서 결과로 쓸 시작 줄, 띠 작업 버퍼)]
+        """
+        if self._stripe_pool is None:
+            return None
+        height, width = shape[0], shape[1]
+        count = min(self._stripe_workers, height // self.STRIPE_MIN_ROWS)
+        if count < 2:
+            return None
+        
+        key = (height, width)
+        plan = self._stripe_workspaces.get(key)
+        if plan is None:
+            overlap = self.STRIPE_OVERLAP
+            bounds = np.linspace(0, height, count + 1).astype(int)
+            plan = []
+            for y0, y1 in zip(bounds[:-1], bounds[1:]):
+                src_y0 = max(0, y0 - overlap)
+                src_y1 = min(height, y1 + overlap)
+                workspace = _Workspace(src_y1 - src_y0, width, self._reuse_buffers)
+                plan.append((int(y0), int(y1), int(y0 - src_y0), workspace))
+            self._stripe_workspaces[key] = plan
+            if len(self._stripe_workspaces) > self.WORKSPACE_CACHE_SIZE:
+                self._stripe_workspaces.pop(next(iter(self._stripe_workspaces)))
+        return plan
+    
+    def _build_color_mask_striped(
+        self,
+        image: np.ndarray,
+        stripes: List[Tuple[int, int, int, _Workspace]]
+    ) -> np.ndarray:
+        """가로 띠별로 색상 마스크 + 형태학 처리를 동시에 하고 겹친 부분을 뺀 결과를 합침"""
+        height, width = image.shape[:2]
+        output = self._workspace(image.shape).buffer("stripe_mask")
+        if output is None:
+            output = np.empty((height, width), dtype=np.uint8)
+        
+        if self._use_color_lut:
+            self.get_color_lut()  # 스레드에서 동시에 만들지 않도록 미리
+        
+        overlap = self.STRIPE_OVERLAP
+        
+        def process(y0: int, y1: int, keep: int, workspace: _Workspace) -> None:
+            src_y0 = y0 - keep
+            src_y1 = min(height, y1 + overlap)
+            mask = self._color_mask_pipeline(image[src_y0:src_y1], workspace)
+            output[y0:y1] = mask[keep:keep + (y1 - y0)]
+        
+        futures = [self._stripe_pool.submit(process, *stripe) for stripe in stripes]
+        for future in futures:
+            future.result()
+        return output
+    
+    def _color_mask_pipeline(self, image: np.ndarray, workspace: _Workspace) -> np.ndarray:
+        """색상 분류 + 형태학 처리 (workspace 버퍼 사용)"""
+        return self._apply_morphology(self._classify_colors(image, workspace), workspace)
+    
+    def _apply_morphology(self, combined_mask: np.ndarray, workspace: _Workspace) -> np.ndarray:
+        """색상 마스크("mask" 버퍼) -> 노이즈 제거 + 글자 연결된 마스크"""
+        # 형태학적 처리 (노이즈 제거 + 영역 연결)
         # 작은 노이즈 제거
-        combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel_small)
+        opened = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, self._KERNEL_SMALL, dst=workspace.buffer("scratch"))
         # 가까운 영역 연결
-        combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel_large)
+        closed = cv2.morphologyEx(opened, cv2.MORPH_CLOSE, self._KERNEL_LARGE, dst=workspace.buffer("mask"))
         # 팽창으로 글자 연결
-        combined_mask = cv2.dilate(combined_mask, kernel_small, iterations=2)
+        combined_mask = cv2.dilate(closed, self._KERNEL_SMALL, dst=workspace.buffer("scratch"), iterations=2)
         
-        # 컨투어 찾기
-        contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return combined_mask
+    
+    def _classify_colors(self, image: np.ndarray, workspace: _Workspace) -> np.ndarray:
+        """GOAL 색상 픽셀 마스크 (형태학 처리 전, workspace의 "mask" 버퍼에 기록)"""
+        if self._use_color_lut:
+            # 룩업 테이블 한 번으로 색상 마스크 생성 (HSV 변환 없음)
+            return self._classify_colors_with_lut(image, workspace)
         
-        if not contours:
-            return DetectionResult(detected=False, confidence=0.0, timestamp=time.time())
+        # BGR -> HSV 변환
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=workspace.buffer("hsv", 3))
         
-        # GOAL 텍스트 조건에 맞는 컨투어 찾기
-        screen_area = width * height
-        valid_contours = []
+        # 여러 색상 범위를 합쳐서 마스크 생성
+        (lower, upper), *other_ranges = self.HSV_RANGES
+        combined_mask = cv2.inRange(hsv, lower, upper, dst=workspace.buffer("mask"))
+        for lower, upper in other_ranges:
+            mask = cv2.inRange(hsv, lower, upper, dst=workspace.buffer("scratch"))
+            cv2.bitwise_or(combined_mask, mask, dst=combined_mask)
+        return combined_mask
+    
+    def get_color_lut(self) -> np.ndarray:
+        """현재 HSV_RANGES로 만든 색상 룩업 테이블 (범위가 바뀌었을 때만 다시 생성)"""
+        key = tuple(
+            (tuple(int(v) for v in lower), tuple(int(v) for v in upper))
+            for lower, upper in self.HSV_RANGES
+        )
+        if self._color_lut is None or self._color_lut_key != key:
+            self._color_lut = build_color_lut(self.HSV_RANGES, self.COLOR_LUT_BITS)
+            self._color_lut_key = key
+        return self._color_lut
+    
+    def _classify_colors_with_lut(self, image: np.ndarray, workspace: _Workspace) -> np.ndarray:
+        """BGR 이미지 -> GOAL 색상 마스크 (룩업 테이블 인덱싱)"""
+        lut = self.get_color_lut()
+        bits = self.COLOR_LUT_BITS
         
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            
+        # 채널별 양자화 -> (B << 2*bits) | (G << bits) | R
+        quantized = np.right_shift(image, 8 - bits, out=workspace.buffer("quantized", 3))
+        blue, green, red = cv2.split(quantized)
+        index = np.left_shift(blue, 2 * bits, out=workspace.buffer("lut_index", dtype=np.uint16), dtype=np.uint16)
+        shifted = np.left_shift(green, bits, out=workspace.buffer("lut_scratch", dtype=np.uint16), dtype=np.uint16)
+        np.bitwise_or(index, shifted, out=index)
+        np.bitwise_or(index, red, out=index)
+        
+        return np.take(lut, index, out=workspace.buffer("mask"), mode="clip")
+    
+    def _find_color_candidates(
+        self,
+        mask: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        scale: float = 1.0,
+        relaxed: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        마스크에서 GOAL 조건에 맞는 후보 찾기
+        
+        컨투어 통계표 한 장에 조건을 배열 연산으로 한 번에 적용한다
+        (배경이 화려한 맵에서 덩어리가 수백 개여도 컨투어별 OpenCV 호출 없음).
+        
+        Args:
+            mask: 색상 마스크 (image를 scale 배로 축소한 크기일 수 있음)
+            screen_size: 전체 화면 크기 (w, h)
+            offset: 원본 image 원점의 화면 기준 좌표
+            scale: mask 해상도 / 원본 해상도
+            relaxed: 축소 프레임용 완화 조건 (후보를 놓치지 않는 쪽으로)
+        
+        Returns:
+            (면적 배열 (N,), 박스 배열 (N, 4) x/y/w/h) - 모두 원본 해상도의 화면 기준 값
+        """
+        screen_width, screen_height = screen_size
+        screen_area = screen_width * screen_height
+        min_width_ratio, max_width_ratio = self.WIDTH_RATIO_RANGE
+        min_area_ratio = self.MIN_AREA_RATIO
+        min_aspect_ratio = self.MIN_ASPECT_RATIO
+        max_y_ratio = self.MAX_Y_RATIO
+        
+        if relaxed:
+            # 축소 시 경계가 뭉개지므로 여유를 둔다
+            min_area_ratio *= 0.5
+            min_aspect_ratio *= 0.75
+            min_width_ratio *= 0.8
+            max_width_ratio *= 1.2
+            max_y_ratio += 0.05
+        
+        started = time.perf_counter()
+        areas, boxes = self._component_stats(mask, scale, offset)
+        widths, heights = boxes[:, 2], boxes[:, 3]
+        aspect_ratios = np.divide(widths, heights, out=np.zeros(len(boxes)), where=heights > 0)
+        width_ratios = widths / screen_width
+        
+        keep = (
             # 최소 크기 (화면의 0.5% 이상)
-            if area < screen_area * 0.005:
-                continue
-            
-            # 바운딩 박스 분석
-            x, y, w, h = cv2.boundingRect(contour)
-            
+            (areas >= screen_area * min_area_ratio)
             # 위치 검증: GOAL은 화면 상단~중앙에 위치
-            if y > height * 0.6:  # 너무 아래에 있으면 제외
-                continue
-            
+            & (boxes[:, 1] <= screen_height * max_y_ratio)
             # 가로가 세로보다 길어야 함 (GOAL은 가로로 긴 텍스트)
-            aspect_ratio = w / h if h > 0 else 0
-            if aspect_ratio < 1.5:  # 최소 1.5:1 비율
-                continue
-            
-            # 너비 검증: 화면 너비의 15~60%
-            width_ratio = w / width
-            if width_ratio < 0.15 or width_ratio > 0.7:
-                continue
-            
-            valid_contours.append((contour, area, (x, y, w, h)))
+            & (aspect_ratios >= min_aspect_ratio)
+            # 너비 검증: 화면 너비의 15~70%
+            & (width_ratios >= min_width_ratio) & (width_ratios <= max_width_ratio)
+        )
+        self._add_timing("contours", started)
+        return areas[keep], boxes[keep]
+    
+    @staticmethod
+    def _component_stats(
+        mask: np.ndarray,
+        scale: float = 1.0,
+        offset: Tuple[int, int] = (0, 0)
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        마스크의 바깥 컨투어별 (면적, 바운딩 박스) 통계표
+        원본 해상도의 화면 기준 좌표로 변환해서 반환
         
-        if not valid_contours:
-            return DetectionResult(detected=False, confidence=0.0, timestamp=time.time())
+        컨투어 점들을 한 배열로 이어 붙여서 박스(min/max)와 면적(신발끈 공식,
+        contourArea와 같은 값)을 컨투어 단위 reduceat으로 한 번에 구한다.
+        connectedComponentsWithStats는 모든 픽셀에 라벨을 쓰느라
+        드문드문한 마스크에서는 findContours보다 훨씬 느려서 쓰지 않는다.
+        """
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return np.zeros(0), np.zeros((0, 4), dtype=np.int64)
         
-        # 가장 큰 유효 컨투어 선택
-        best = max(valid_contours, key=lambda x: x[1])
-        contour, area, (x, y, w, h) = best
+        lengths = np.fromiter(map(len, contours), dtype=np.int64, count=len(contours))
+        starts = np.zeros(len(contours), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        ends = starts + lengths - 1
+        points = np.concatenate(contours).reshape(-1, 2)
+        xs = np.ascontiguousarray(points[:, 0], dtype=np.int64)
+        ys = np.ascontiguousarray(points[:, 1], dtype=np.int64)
         
-        # 중심점 계산
-        cx = x + w // 2
-        cy = y + h // 2
+        # 바운딩 박스 (boundingRect와 같은 정수 박스)
+        x0 = np.minimum.reduceat(xs, starts)
+        y0 = np.minimum.reduceat(ys, starts)
+        widths = np.maximum.reduceat(xs, starts) - x0 + 1
+        heights = np.maximum.reduceat(ys, starts) - y0 + 1
         
-        # 신뢰도 계산 (영역 크기 + 위치 기반)
-        # 영역이 크고 화면 중앙 상단에 있을수록 높은 신뢰도
-        size_score = min(area / (screen_area * 0.05), 1.0)  # 5% 면적이면 만점
-        position_score = 1.0 - (y / height)  # 상단일수록 높은 점수
-        aspect_score = min(w/h / 4.0, 1.0)  # GOAL은 약 4:1 비율
+        # 면적: 각 점과 다음 점의 외적 합 (컨투어 마지막 점의 다음 점은 첫 점)
+        cross = xs * np.roll(ys, -1) - np.roll(xs, -1) * ys
+        cross[ends] = xs[ends] * ys[starts] - xs[starts] * ys[ends]
+        areas = np.abs(np.add.reduceat(cross, starts)) / 2.0 / (scale * scale)
         
-        confidence = (size_score * 0.4 + position_score * 0.3 + aspect_score * 0.3)
+        boxes = np.stack([x0, y0, widths, heights], axis=1)
+        if scale != 1.0:
+            boxes = (boxes / scale).astype(np.int64)
+        boxes[:, 0] += offset[0]
+        boxes[:, 1] += offset[1]
+        return areas, boxes
+    
+    @staticmethod
+    def _score_color_candidates(
+        areas: np.ndarray,
+        boxes: np.ndarray,
+        screen_size: Tuple[int, int]
+    ) -> np.ndarray:
+        """
+        후보별 신뢰도 (영역 크기 + 위치 + 비율)
+        영역이 크고 화면 중앙 상단에 있을수록 높은 신뢰도
+        """
+        screen_width, screen_height = screen_size
+        size_score = np.minimum(areas / (screen_width * screen_height * 0.05), 1.0)  # 5% 면적이면 만점
+        position_score = 1.0 - boxes[:, 1] / screen_height  # 상단일수록 높은 점수
+        aspect_score = np.minimum(boxes[:, 2] / boxes[:, 3] / 4.0, 1.0)  # GOAL은 약 4:1 비율
+        return size_score * 0.4 + position_score * 0.3 + aspect_score * 0.3
+    
+    def detect_goal_coarse_to_fine(
+        self,
+        image: np.ndarray,
+        screen_size: Optional[Tuple[int, int]] = None,
+        offset: Tuple[int, int] = (0, 0)
+    ) -> DetectionResult:
+        """
+        다중 해상도 색상 + 형태 감지
         
-        detected = confidence >= self.CONFIDENCE_THRESHOLD
+        1단계: PYRAMID_SCALE로 축소한 프레임에서 후보 박스 탐색
+        2단계: 후보가 있을 때만 해당 박스 주변을 원본 해상도로 정밀 분석
         
-        return DetectionResult(
-            detected=detected,
-            confidence=confidence,
-            location=(cx, cy) if detected else None,
-            timestamp=time.time()
+        GOAL이 없는 대부분의 프레임은 1단계에서 끝난다.
+        인자와 반환값은 detect_goal_by_color_and_shape와 동일
+        """
+        height, width = image.shape[:2]
+        screen_size = screen_size or (width, height)
+        offset_x, offset_y = offset
+        scale = self.PYRAMID_SCALE
+        
+        # 1단계: 축소 프레임에서 후보 탐색
+        # INTER_AREA는 축소 자체가 HSV 변환만큼 느려서 INTER_LINEAR 사용
+        small_size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+        small = cv2.resize(
+            image, small_size,
+            dst=self._workspace((small_size[1], small_size[0])).buffer("bgr", 3),
+            interpolation=cv2.INTER_LINEAR
+        )
+        coarse_mask = self._build_color_mask(small)
+        _, candidates = self._find_color_candidates(
+            coarse_mask, screen_size, offset, scale=scale, relaxed=True
         )
+        
+        best = DetectionResult(detected=False, confidence=0.0, timestamp=time.time())
+        
+        # 2단계: 후보 박스 주변만 원본 해상도로 분석
+        # 축소 오차 + 형태학 커널 반경만큼 여유를 둔다
+        padding = int(self.PYRAMID_PADDING / scale)
+        for x, y, w, h in candidates.tolist():
+            x0 = max(0, x - offset_x - padding)
+            y0 = max(0, y - offset_y - padding)
+            x1 = min(width, x - offset_x + w + padding)
+            y1 = min(height, y - offset_y + h + padding)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            
+            result = self.detect_goal_by_color_and_shape(
+                image[y0:y1, x0:x1], screen_size, (offset_x + x0, offset_y + y0)
+            )
+            if result.confidence > best.confidence:
+                best = result
+        
+        return best
     
-    def detect_goal_by_edge(self, image: np.ndarray) -> DetectionResult:
+    def detect_goal_by_edge(
+        self,
+        image: np.ndarray,
+        screen_size: Optional[Tuple[int, int]] = None,
+        offset: Tuple[int, int] = (0, 0)
+    ) -> DetectionResult:
         """
         에지 검출 기반 GOAL 감지 (보조 방법)
         GOAL 텍스트의 흰색 테두리를 감지
+        
+        screen_size / offset은 detect_goal_by_color_and_shape와 동일
         """
+        workspace = self._workspace(image.shape)
+        
         # 그레이스케일 변환
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=workspace.buffer("gray"))
         
         # 밝은 영역 추출 (흰색 테두리)
-        _, bright = cv2.threshold(gray, 230, 255, cv2.THRESH_BINARY)
+        _, bright = cv2.threshold(gray, 230, 255, cv2.THRESH_BINARY, dst=workspace.buffer("bright"))
         
         # 에지 검출
-        edges = cv2.Canny(gray, 100, 200)
+        edges = cv2.Canny(gray, 100, 200, edges=workspace.buffer("edges"))
         
         # 밝은 영역과 에지 결합
-        combined = cv2.bitwise_and(edges, bright)
+        combined = cv2.bitwise_and(edges, bright, dst=workspace.buffer("combined"))
         
         # 형태학적 처리
-        kernel = np.ones((5, 5), np.uint8)
-        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
-        
-        # 컨투어 분석
-        contours, _ = cv2.findContours(combined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, self._KERNEL_EDGE, dst=workspace.buffer("edges"))
         
+        # 컨투어 분석 (조건은 배열 연산으로 한 번에)
         height, width = image.shape[:2]
+        screen_width, screen_height = screen_size or (width, height)
+        areas, boxes = self._component_stats(combined, offset=offset)
+        widths, heights = boxes[:, 2], boxes[:, 3]
         
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # GOAL 조건 검사
-            if w > width * 0.15 and h > height * 0.05:
-                if w/h > 2.0 and y < height * 0.5:
-                    return DetectionResult(
-                        detected=True,
-                        confidence=0.7,
-                        location=(x + w//2, y + h//2),
-                        timestamp=time.time()
-                    )
+        # GOAL 조건 검사
+        keep = (
+            (widths > screen_width * self.WIDTH_RATIO_RANGE[0])
+            & (heights > screen_height * 0.05)
+            & (widths > heights * 2.0)
+            & (boxes[:, 1] < screen_height * self.EDGE_MAX_Y_RATIO)
+        )
+        if keep.any():
+            # 조건에 맞는 것 중 가장 큰 덩어리
+            best = int(np.flatnonzero(keep)[np.argmax(areas[keep])])
+            x, y, w, h = (int(v) for v in boxes[best])
+            return DetectionResult(
+                detected=True,
+                confidence=0.7,
+                location=(x + w//2, y + h//2),
+                timestamp=time.time(),
+                bbox=(x, y, w, h)
+            )
         
         return DetectionResult(detected=False, confidence=0.0, timestamp=time.time())
     
@@ -206,14 +990,262 @@ class GoalDetector:
         if current_time - self._last_detection_time < self.COOLDOWN_SECONDS:
             return None
         
-        # 화면 캡처
-        screen = capture_primary_monitor()
+        # 화면 캡처 (ROI만) + 단계별 분석
+        started = time.perf_counter()
+        with self._screen() as (screen, screen_size, offset, tracking):
+            capture_ms = (time.perf_counter() - started) * 1000
+            analysis_started = time.time()
+            result = self.analyze_frame(screen, screen_size, offset, current_time, tracking)
+        self.last_timings["capture"] = capture_ms
+        self.last_trace = {
+            "captured": self._last_frame_time,
+            "analysis_started": analysis_started,
+            "analysis_finished": time.time()
+        }
+        return result
+    
+    def analyze_frame(
+        self,
+        screen: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        current_time: float,
+        tracking: bool = False
+    ) -> DetectionResult:
+        """
+        캡처된 화면 한 장에 대해 감지 단계(캐스케이드) 실행
+        
+        Args:
+            screen: BGR 이미지 (ROI 또는 화면 전체)
+            screen_size: 전체 화면 크기 (w, h)
+            offset: screen 원점의 화면 기준 좌표
+            current_time: 이번 틱 시각 (쿨다운 기록용)
+            tracking: screen이 추적 창이면 True (변화 감지/간이 필터 생략, 원본 해상도로 바로 분석)
+        """
+        self.last_timings = {}
+        
+        if tracking:
+            # 추적 창은 작고 후보가 있던 자리라서 앞 단계 없이 바로 색상 분석
+            started = time.perf_counter()
+            result1 = self.detect_goal_by_color_and_shape(screen, screen_size, offset)
+            self._record_stage("color", result1.detected, started)
+            self._update_track(result1, tracking=True)
+            return self._confirm(screen, screen_size, offset, current_time, result1)
         
-        # 1차: 색상 + 형태 기반 감지
-        result1 = self.detect_goal_by_color_and_shape(screen)
+        # 0단계: 화면 변화 확인 (변화 없으면 이전 음성 결과 유지)
+        started = time.perf_counter()
+        changed = self.has_frame_changed(screen)
+        self._record_stage("change_gate", changed, started)
+        if not changed:
+            return DetectionResult(
+                detected=False, confidence=0.0, timestamp=current_time, skipped=True
+            )
         
-        # 2차: 에지 기반 감지 (보조)
-        result2 = self.detect_goal_by_edge(screen)
+        # 각 단계는 음성이면 바로 종료 (뒤 단계일수록 비쌈)
+        # 1단계: 서브샘플링 색상 필터
+        started = time.perf_counter()
+        passed = self.passes_prefilter(screen, screen_size)
+        self._record_stage("prefilter", passed, started)
+        if not passed:
+            self._update_track(None, tracking=False)
+            return self._finish_check(current_time, None, None)
+        
+        # 2단계: 색상 + 형태 기반 감지
+        started = time.perf_counter()
+        if self._use_pyramid:
+            result1 = self.detect_goal_coarse_to_fine(screen, screen_size, offset)
+        else:
+            result1 = self.detect_goal_by_color_and_shape(screen, screen_size, offset)
+        self._record_stage("color", result1.detected, started)
+        self._update_track(result1, tracking=False)
+        return self._confirm(screen, screen_size, offset, current_time, result1)
+    
+    def _confirm(
+        self,
+        screen: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        current_time: float,
+        result1: DetectionResult
+    ) -> DetectionResult:
+        """색상 후보를 템플릿/에지로 확인하고 최종 판정 (캐스케이드 3단계)"""
+        if not result1.detected:
+            return self._finish_check(current_time, result1, None)
+        
+        # 3단계: 템플릿 매칭으로 확인 (후보 박스 주변만)
+        result2 = None
+        if self._template_matcher is not None and result1.bbox is not None:
+            started = time.perf_counter()
+            result2 = self._confirm_by_template(screen, screen_size, offset, result1.bbox)
+            self._record_stage("template", result2.detected, started)
+        
+        # 템플릿이 없거나 매칭 실패 시 에지 기반 확인 (후보 박스 주변만)
+        if result2 is None or not result2.detected:
+            started = time.perf_counter()
+            result2 = self._confirm_by_edge(screen, screen_size, offset, result1.bbox)
+            self._record_stage("edge", result2.detected, started)
+        
+        return self._finish_check(current_time, result1, result2)
+    
+    def has_frame_changed(self, image: np.ndarray) -> bool:
+        """
+        마지막으로 분석한 프레임과 비교해서 화면이 바뀌었는지 확인
+        
+        서브샘플링한 흑백 썸네일에서 CHANGE_GATE_PIXEL_DELTA 넘게 바뀐 픽셀 수로 판단한다.
+        (화면 전체 평균 차이는 작은 GOAL 배너가 나타나도 거의 변하지 않음)
+        직전 분석 결과가 양성이었거나 연속 생략이 CHANGE_GATE_MAX_SKIPS를 넘으면
+        변화가 없어도 True (다시 분석).
+        """
+        stride = self.CHANGE_GATE_STRIDE
+        thumbnail = cv2.cvtColor(np.ascontiguousarray(image[::stride, ::stride]), cv2.COLOR_BGR2GRAY)
+        previous = self._last_thumbnail
+        
+        if previous is not None and previous.shape == thumbnail.shape:
+            changed_pixels = np.count_nonzero(cv2.absdiff(thumbnail, previous) > self.CHANGE_GATE_PIXEL_DELTA)
+            if changed_pixels < self.CHANGE_GATE_MIN_PIXELS:
+                if not self._last_analyzed_detected and self._skipped_frames < self.CHANGE_GATE_MAX_SKIPS:
+                    self._skipped_frames += 1
+                    return False
+            else:
+                self._last_change_time = time.time()
+        else:
+            self._last_change_time = time.time()
+        
+        self._last_thumbnail = thumbnail
+        self._skipped_frames = 0
+        return True
+    
+    @property
+    def idle_seconds(self) -> float:
+        """화면 변화가 마지막으로 감지된 뒤 지난 시간"""
+        return time.time() - self._last_change_time
+    
+    def passes_prefilter(self, image: np.ndarray, screen_size: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        간이 색상 필터 (캐스케이드 1단계)
+        
+        STRIDE 간격으로 샘플링한 픽셀만 HSV로 변환해서 GOAL 색상 픽셀 수를 센다.
+        GOAL 최소 면적에 한참 못 미치면 False.
+        """
+        height, width = image.shape[:2]
+        screen_width, screen_height = screen_size or (width, height)
+        stride = self.PREFILTER_STRIDE
+        
+        samples = np.ascontiguousarray(image[::stride, ::stride])
+        hsv = cv2.cvtColor(samples, cv2.COLOR_BGR2HSV)
+        
+        mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
+        for lower, upper in self.HSV_RANGES:
+            mask |= cv2.inRange(hsv, lower, upper)
+        
+        # 샘플 비율을 원본 픽셀 수로 환산
+        estimated_pixels = cv2.countNonZero(mask) * (height * width) / mask.size
+        min_pixels = screen_width * screen_height * self.MIN_AREA_RATIO * self.PREFILTER_RELAX
+        return estimated_pixels >= min_pixels
+    
+    def _find_template_text_bbox(self, template: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """
+        템플릿 이미지에서 GOAL 글자 영역 찾기
+        
+        실제 화면에서 색상 단계가 만드는 후보 박스와 같은 기준이 되도록
+        같은 색상 마스크로 구한다. 못 찾으면 None (템플릿 전체 사용).
+        """
+        mask = self._build_color_mask(template)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        min_area = template.shape[0] * template.shape[1] * self.TEMPLATE_TEXT_MIN_AREA_RATIO
+        boxes = [stats[i, :4] for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] >= min_area]
+        if not boxes:
+            return None
+        
+        boxes = np.array(boxes)
+        x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+        x1 = (boxes[:, 0] + boxes[:, 2]).max()
+        y1 = (boxes[:, 1] + boxes[:, 3]).max()
+        return (int(x0), int(y0), int(x1 - x0), int(y1 - y0))
+    
+    def _confirm_by_template(
+        self,
+        image: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        bbox: Tuple[int, int, int, int]
+    ) -> DetectionResult:
+        """색상 후보 박스 주변에서 템플릿 매칭 (점수를 신뢰도로 사용)"""
+        score, matched_bbox = self._template_matcher.match(image, screen_size, offset, bbox)
+        detected = score >= self._template_matcher.MATCH_THRESHOLD
+        location = None
+        if detected and matched_bbox is not None:
+            x, y, w, h = matched_bbox
+            location = (x + w // 2, y + h // 2)
+        return DetectionResult(
+            detected=detected,
+            confidence=score,
+            location=location,
+            timestamp=time.time(),
+            bbox=matched_bbox
+        )
+    
+    def _confirm_by_edge(
+        self,
+        image: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        bbox: Optional[Tuple[int, int, int, int]]
+    ) -> DetectionResult:
+        """색상 후보 박스 주변만 잘라서 에지 감지 (캐스케이드 3단계)"""
+        if bbox is None:
+            return self.detect_goal_by_edge(image, screen_size, offset)
+        
+        height, width = image.shape[:2]
+        offset_x, offset_y = offset
+        x, y, w, h = bbox
+        padding = int(screen_size[0] * self.CONFIRM_PADDING_RATIO)
+        x0 = max(0, x - offset_x - padding)
+        y0 = max(0, y - offset_y - padding)
+        x1 = min(width, x - offset_x + w + padding)
+        y1 = min(height, y - offset_y + h + padding)
+        
+        return self.detect_goal_by_edge(
+            image[y0:y1, x0:x1], screen_size, (offset_x + x0, offset_y + y0)
+        )
+    
+    def _record_stage(self, name: str, passed: bool, started: float) -> None:
+        """단계 실행 결과 기록"""
+        elapsed = time.perf_counter() - started
+        stats = self._stage_stats[name]
+        stats.runs += 1
+        stats.passes += int(passed)
+        stats.total_seconds += elapsed
+        self.last_timings[name] = elapsed * 1000
+    
+    def get_stage_stats(self) -> Dict[str, dict]:
+        """단계별 통과율/평균 소요 시간 (단계 순서 튜닝용)"""
+        return {
+            name: {**asdict(stats), "pass_rate": stats.pass_rate, "avg_ms": stats.avg_ms}
+            for name, stats in self._stage_stats.items()
+        }
+    
+    def reset_stage_stats(self) -> None:
+        self._stage_stats = {name: StageStats() for name in self.STAGES}
+    
+    def _add_timing(self, name: str, started: float) -> None:
+        """단계 안의 세부 작업 시간 누적 (한 프레임에 여러 번 실행될 수 있음)"""
+        self.last_timings[name] = self.last_timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
+    
+    def _finish_check(
+        self,
+        current_time: float,
+        result1: Optional[DetectionResult],
+        result2: Optional[DetectionResult]
+    ) -> DetectionResult:
+        """
+        색상 결과(result1)와 확인 결과(result2)를 합쳐 최종 판정
+        
+        확인 단계가 음성이어도 색상 결과만으로 감지될 수 있다 (기존 동작 유지).
+        """
+        result1 = result1 or DetectionResult(detected=False, confidence=0.0)
+        result2 = result2 or DetectionResult(detected=False, confidence=0.0)
+        self._last_analyzed_detected = result1.detected
         
         # 둘 다 감지하면 높은 신뢰도
         if result1.detected and result2.detected:
@@ -226,24 +1258,35 @@ class GoalDetector:
             final_confidence = 0.0
             self._consecutive_detections = 0
         
-        # 연속 2회 이상 감지되면 확정
-        detected = final_confidence >= self.CONFIDENCE_THRESHOLD and self._consecutive_detections >= 1
+        # confirm_frames번 연속 감지되면 확정
+        detected = (
+            final_confidence >= self.CONFIDENCE_THRESHOLD
+            and self._consecutive_detections >= self._confirm_frames
+        )
         
         if detected:
             self._last_detection_time = current_time
             self._consecutive_detections = 0
+            # 쿨다운 동안 GOAL 화면이 사라지므로 추적도 끝
+            self.reset_tracking()
         
         return DetectionResult(
             detected=detected,
             confidence=final_confidence,
             location=result1.location,
-            timestamp=current_time
+            timestamp=current_time,
+            bbox=result1.bbox
         )
     
     @property
     def is_in_cooldown(self) -> bool:
         return time.time() - self._last_detection_time < self.COOLDOWN_SECONDS
     
+    @property
+    def cooldown_remaining(self) -> float:
+        """쿨다운 남은 시간 (초)"""
+        return max(0.0, self._last_detection_time + self.COOLDOWN_SECONDS - time.time())
+    
     def reset_cooldown(self) -> None:
         self._last_detection_time = 0.0
 
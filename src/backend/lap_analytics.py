@@ -0,0 +1,271 @@
+"""
+완주 기록 분석 모듈
+연속된 GOAL 사이 간격(완주 시간)을 맵별로 모아서 최고/중앙값/백분위/추세를 제공:
+1. 완주 기록은 laps 테이블에 (map_id, finished_at) 인덱스와 함께 저장
+2. 맵별 하루 단위 집계 (횟수, 합계, 최고, 로그 간격 히스토그램)를 완주마다 갱신
+   -> 조회는 원본 기록을 다시 읽지 않고 며칠치 집계만 합침
+3. 쓰기는 이벤트 로그 작성 스레드에 맡김 (이벤트 루프를 막지 않음)
+
+완주 시간 정의는 PollingScheduler.record_goal과 같음
+(GOAL 시점에 포커스된 맵 = 직전 GOAL 이후 달린 맵).
+"""
+
+import bisect
+import json
+import math
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from event_store import DEFAULT_DB_PATH
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS laps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    map_id TEXT NOT NULL,
+    source_id TEXT,
+    finished_at REAL NOT NULL,
+    lap_seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_laps_map_time ON laps (map_id, finished_at);
+CREATE TABLE IF NOT EXISTS lap_daily (
+    map_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total_seconds REAL NOT NULL,
+    best_seconds REAL NOT NULL,
+    buckets TEXT NOT NULL,
+    PRIMARY KEY (map_id, day)
+);
+"""
+
+# 히스토그램 구간: 5초 ~ 30분을 5% 간격 로그 스케일로 (백분위 오차 약 ±2.5%)
+BUCKET_MIN_SECONDS = 5.0
+BUCKET_MAX_SECONDS = 30 * 60.0
+BUCKET_RATIO = 1.05
+BUCKET_EDGES = [BUCKET_MIN_SECONDS]
+while BUCKET_EDGES[-1] < BUCKET_MAX_SECONDS:
+    BUCKET_EDGES.append(BUCKET_EDGES[-1] * BUCKET_RATIO)
+NUM_BUCKETS = len(BUCKET_EDGES) - 1
+
+
+def _bucket_index(seconds: float) -> int:
+    return min(max(bisect.bisect_right(BUCKET_EDGES, seconds) - 1, 0), NUM_BUCKETS - 1)
+
+
+def _day_of(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).date().isoformat()
+
+
+@dataclass
+class LapAggregate:
+    """완주 시간 집계 (하루치 또는 여러 날을 합친 것)"""
+    count: int = 0
+    total_seconds: float = 0.0
+    best_seconds: float = math.inf
+    buckets: List[int] = field(default_factory=lambda: [0] * NUM_BUCKETS)
+    
+    def add(self, lap_seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += lap_seconds
+        self.best_seconds = min(self.best_seconds, lap_seconds)
+        self.buckets[_bucket_index(lap_seconds)] += 1
+    
+    def merge(self, other: "LapAggregate") -> None:
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.best_seconds = min(self.best_seconds, other.best_seconds)
+        for index, bucket_count in enumerate(other.buckets):
+            if bucket_count:
+                self.buckets[index] += bucket_count
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        히스토그램으로 근사한 백분위 (q: 0~100)
+        
+        해당 구간 안에서는 선형 보간하고, 최고 기록보다 빠르게 나오지 않게 자른다.
+        """
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if not bucket_count:
+                continue
+            if cumulative + bucket_count >= rank:
+                low, high = BUCKET_EDGES[index], BUCKET_EDGES[index + 1]
+                fraction = (rank - cumulative) / bucket_count
+                return max(self.best_seconds, low + (high - low) * fraction)
+            cumulative += bucket_count
+        return BUCKET_EDGES[-1]
+    
+    def to_dict(self, percentiles: Sequence[float] = (50, 90)) -> dict:
+        if self.count == 0:
+            return {"count": 0, "best": None, "mean": None, "median": None, "percentiles": {}}
+        return {
+            "count": self.count,
+            "best": round(self.best_seconds, 2),
+            "mean": round(self.total_seconds / self.count, 2),
+            "median": round(self.percentile(50), 2),
+            "percentiles": {f"p{q:g}": round(self.percentile(q), 2) for q in percentiles},
+        }
+    
+    # DB 저장용 (빈 구간은 생략)
+    def buckets_json(self) -> str:
+        return json.dumps({str(i): c for i, c in enumerate(self.buckets) if c})
+    
+    @classmethod
+    def from_row(cls, count: int, total_seconds: float, best_seconds: float, buckets: str) -> "LapAggregate":
+        aggregate = cls(count=count, total_seconds=total_seconds, best_seconds=best_seconds)
+        for index, bucket_count in json.loads(buckets).items():
+            aggregate.buckets[int(index)] = bucket_count
+        return aggregate
+
+
+class LapAnalytics:
+    """
+    맵별 완주 기록 + 하루 단위 증분 집계
+    
+    집계는 메모리에 전부 올려 두고 (맵 수 x 날짜 수라서 작음) 조회는 메모리에서만 답한다.
+    DB 쓰기는 execute 콜백 (EventStore.execute)으로 넘기며, 없으면 메모리에만 기록한다.
+    """
+    
+    MAX_HISTORY_LIMIT = 500         # 원본 기록 조회 최대 개수
+    MAX_DAYS = 366                  # 요약/추이 조회 최대 기간 (일)
+    
+    def __init__(
+        self,
+        path: Path = DEFAULT_DB_PATH,
+        execute: Optional[Callable[[str, tuple], None]] = None
+    ):
+        self.path = Path(path)
+        self._execute = execute
+        self._daily: Dict[str, Dict[str, LapAggregate]] = {}
+    
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path))
+        connection.executescript(_SCHEMA)
+        return connection
+    
+    def load(self) -> None:
+        """저장된 하루 단위 집계 읽기 (시작 시 한 번)"""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT map_id, day, count, total_seconds, best_seconds, buckets FROM lap_daily"
+            ).fetchall()
+        finally:
+            connection.close()
+        for map_id, day, count, total_seconds, best_seconds, buckets in rows:
+            self._daily.setdefault(map_id, {})[day] = LapAggregate.from_row(
+                count, total_seconds, best_seconds, buckets
+            )
+        print(f"[INFO] Lap analytics loaded ({len(rows)} daily aggregates)")
+    
+    # ========================================
+    # 기록
+    # ========================================
+    
+    def record_lap(self, map_id: str, lap_seconds: float, finished_at: float, source_id: Optional[str] = None) -> None:
+        """완주 1회 기록 (집계 갱신 + DB 쓰기 요청)"""
+        day = _day_of(finished_at)
+        aggregate = self._daily.setdefault(map_id, {}).setdefault(day, LapAggregate())
+        aggregate.add(lap_seconds)
+        
+        if self._execute is None:
+            return
+        self._execute(
+            "INSERT INTO laps (map_id, source_id, finished_at, lap_seconds) VALUES (?, ?, ?, ?)",
+            (map_id, source_id, finished_at, lap_seconds)
+        )
+        self._execute(
+            "INSERT OR REPLACE INTO lap_daily (map_id, day, count, total_seconds, best_seconds, buckets)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (map_id, day, aggregate.count, aggregate.total_seconds, aggregate.best_seconds, aggregate.buckets_json())
+        )
+    
+    # ========================================
+    # 조회 (집계만 사용)
+    # ========================================
+    
+    def _aggregate(self, map_id: str, since_day: str, until_day: Optional[str] = None) -> LapAggregate:
+        total = LapAggregate()
+        for day, aggregate in self._daily.get(map_id, {}).items():
+            if day >= since_day and (until_day is None or day < until_day):
+                total.merge(aggregate)
+        return total
+    
+    @classmethod
+    def check_days(cls, days: int) -> None:
+        """
+        조회 기간 검사
+        
+        Raises:
+            ValueError: 1 ~ MAX_DAYS 밖의 기간
+        """
+        if not 1 <= days <= cls.MAX_DAYS:
+            raise ValueError(f"days must be between 1 and {cls.MAX_DAYS}")
+    
+    def summary(self, map_id: str, days: int = 30, percentiles: Sequence[float] = (50, 90)) -> dict:
+        """
+        최근 days일 최고/평균/중앙값/백분위
+        
+        Raises:
+            ValueError: 범위를 벗어난 days
+        """
+        self.check_days(days)
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        return {"map_id": map_id, "days": days, **self._aggregate(map_id, since).to_dict(percentiles)}
+    
+    def summaries(self, days: int = 30) -> List[dict]:
+        """기록이 있는 모든 맵 요약"""
+        self.check_days(days)
+        return [self.summary(map_id, days) for map_id in sorted(self._daily)]
+    
+    def trend(self, map_id: str, days: int = 28, period: str = "day") -> dict:
+        """
+        기간별 (day | week) 최고/중앙값 추이
+        
+        Raises:
+            ValueError: 알 수 없는 period 또는 범위를 벗어난 days
+        """
+        self.check_days(days)
+        if period not in ("day", "week"):
+            raise ValueError(f"Unknown trend period: {period}")
+        step = 7 if period == "week" else 1
+        today = date.today()
+        start = today - timedelta(days=days - 1)
+        
+        points = []
+        period_start = start
+        while period_start <= today:
+            period_end = period_start + timedelta(days=step)
+            aggregate = self._aggregate(map_id, period_start.isoformat(), period_end.isoformat())
+            points.append({"start": period_start.isoformat(), **aggregate.to_dict(percentiles=())})
+            period_start = period_end
+        return {"map_id": map_id, "period": period, "points": points}
+    
+    # ========================================
+    # 원본 기록 (인덱스 사용)
+    # ========================================
+    
+    def history(self, map_id: str, limit: int = 50, since: Optional[float] = None) -> List[dict]:
+        """최근 완주 기록 (map_id, finished_at 인덱스로 역순 조회)"""
+        limit = max(1, min(limit, self.MAX_HISTORY_LIMIT))
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT finished_at, lap_seconds, source_id FROM laps"
+                " WHERE map_id = ? AND finished_at >= ? ORDER BY finished_at DESC LIMIT ?",
+                (map_id, since or 0.0, limit)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [
+            {"finished_at": finished_at, "lap_seconds": round(lap_seconds, 2), "source_id": source_id}
+            for finished_at, lap_seconds, source_id in rows
+        ]
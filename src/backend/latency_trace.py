@@ -0,0 +1,202 @@
+"""
+GOAL 지연 추적 모듈
+GOAL 감지 하나마다 시각을 기록해서 화면에 GOAL이 뜬 뒤 카드가 올라가기까지 구간별 지연을 집계:
+
+    captured            캡처 스레드가 프레임을 찍은 시각
+    analysis_started    감지기가 그 프레임 분석을 시작한 시각 (폴링 간격만큼 늦어질 수 있음)
+    analysis_finished   분석 끝
+    received            서버(이벤트 루프)가 작업자 결과를 받은 시각
+    enqueued            goal_detected 메시지를 클라이언트 대기열에 넣은 시각
+    sent                클라이언트별 전송 완료 시각
+    acked               클라이언트의 goal_ack를 받은 시각 (render_ms: 받은 뒤 그리기까지)
+
+브라우저 시계는 서버와 다를 수 있으므로 클라이언트는 소요 시간(render_ms)만 보내고,
+네트워크 편도 시간은 (acked - sent - render_ms) / 2로 추정한다.
+"""
+
+import itertools
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+from metrics import registry as metrics
+
+
+# 구간 이름 (집계/응답 순서)
+SEGMENTS = (
+    "frame_wait",       # captured -> analysis_started
+    "analysis",         # analysis_started -> analysis_finished
+    "worker_return",    # analysis_finished -> received
+    "server",           # received -> enqueued
+    "send_queue",       # enqueued -> sent (클라이언트별)
+    "network",          # 추정 편도 네트워크 시간 (클라이언트별)
+    "render",           # 클라이언트가 메시지를 받은 뒤 그리기까지 (클라이언트별)
+    "end_to_end",       # captured -> 화면에 그려짐 (추정, 클라이언트별)
+)
+
+LATENCY_SECONDS = metrics.histogram(
+    "tr_goal_latency_seconds", "GOAL latency per segment from capture to client render", ("segment",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+@dataclass
+class GoalTrace:
+    """GOAL 감지 하나의 시각 기록"""
+    trace_id: str
+    source_id: str
+    map_id: Optional[str]
+    stamps: Dict[str, float]                                    # 서버 쪽 시각 (time.time)
+    sent: Dict[int, float] = field(default_factory=dict)        # 클라이언트 ID -> 전송 완료 시각
+    acks: Dict[int, dict] = field(default_factory=dict)         # 클라이언트 ID -> 클라이언트 구간 (초)
+    
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "source_id": self.source_id,
+            "map_id": self.map_id,
+            "stamps": self.stamps,
+            "clients": {
+                str(client_id): {"sent": sent_at, **self.acks.get(client_id, {})}
+                for client_id, sent_at in self.sent.items()
+            },
+        }
+
+
+class LatencyTracker:
+    """
+    진행 중인 추적 + 구간별 최근 표본
+    
+    표본은 구간마다 최근 SAMPLE_WINDOW개만 보관하고, 조회할 때 정렬해서 백분위를 낸다.
+    클라이언트 구간(render/network/end_to_end)은 추적마다 첫 ack 하나만 기록한다
+    (탭이 여러 개 열려 있어도 GOAL 하나당 표본 하나).
+    응답(ack)이 안 온 추적은 MAX_PENDING개를 넘거나 ACK_TIMEOUT이 지나면 버린다.
+    """
+    
+    SAMPLE_WINDOW = 500             # 구간별 보관할 최근 표본 수
+    MAX_PENDING = 64                # ack를 기다리는 추적 최대 개수
+    ACK_TIMEOUT = 30.0              # 이 시간(초) 안에 ack가 없으면 버림
+    RECENT_TRACES = 20              # API에 보여줄 최근 추적 수
+    
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._ids = itertools.count(1)
+        self._pending: "OrderedDict[str, GoalTrace]" = OrderedDict()
+        self._recent: Deque[GoalTrace] = deque(maxlen=self.RECENT_TRACES)
+        self._samples: Dict[str, Deque[float]] = {name: deque(maxlen=self.SAMPLE_WINDOW) for name in SEGMENTS}
+    
+    def _observe(self, segment: str, seconds: float) -> None:
+        seconds = max(0.0, seconds)
+        self._samples[segment].append(seconds)
+        LATENCY_SECONDS.labels(segment).observe(seconds)
+    
+    # ========================================
+    # 기록
+    # ========================================
+    
+    def start(self, source_id: str, map_id: Optional[str], worker_trace: Dict[str, float]) -> GoalTrace:
+        """작업자 결과를 받은 시점에 추적 시작 (worker_trace: captured/analysis_* 시각)"""
+        self._expire()
+        trace = GoalTrace(
+            trace_id=f"{int(self._clock() * 1000):x}-{next(self._ids)}",
+            source_id=source_id,
+            map_id=map_id,
+            stamps={**worker_trace, "received": self._clock()}
+        )
+        self._pending[trace.trace_id] = trace
+        self._recent.append(trace)
+        while len(self._pending) > self.MAX_PENDING:
+            self._pending.popitem(last=False)
+        return trace
+    
+    def mark_enqueued(self, trace: GoalTrace) -> None:
+        """브로드캐스트 대기열에 넣은 시점 -> 서버 쪽 구간 확정"""
+        stamps = trace.stamps
+        stamps["enqueued"] = self._clock()
+        if "captured" in stamps and "analysis_started" in stamps:
+            self._observe("frame_wait", stamps["analysis_started"] - stamps["captured"])
+        if "analysis_started" in stamps and "analysis_finished" in stamps:
+            self._observe("analysis", stamps["analysis_finished"] - stamps["analysis_started"])
+        if "analysis_finished" in stamps:
+            self._observe("worker_return", stamps["received"] - stamps["analysis_finished"])
+        self._observe("server", stamps["enqueued"] - stamps["received"])
+    
+    def mark_sent(self, trace_id: str, client_id: int) -> None:
+        """클라이언트 하나에 전송 완료 (브로드캐스터 전송 태스크에서 호출)"""
+        trace = self._pending.get(trace_id)
+        if trace is None or "enqueued" not in trace.stamps:
+            return
+        now = self._clock()
+        trace.sent[client_id] = now
+        self._observe("send_queue", now - trace.stamps["enqueued"])
+    
+    def ack(self, trace_id: str, client_id: int, render_ms: float) -> bool:
+        """
+        클라이언트가 보낸 goal_ack 처리
+        
+        Returns:
+            해당 추적을 찾아서 기록했으면 True (이미 다른 ack를 기록한 추적이면 False)
+        """
+        trace = self._pending.get(trace_id)
+        if trace is None or client_id not in trace.sent or trace.acks:
+            return False
+        now = self._clock()
+        render = max(0.0, render_ms / 1000.0)
+        network = max(0.0, (now - trace.sent[client_id] - render) / 2)
+        self._observe("render", render)
+        self._observe("network", network)
+        
+        segments = {"acked": now, "render": render, "network": network}
+        if "captured" in trace.stamps:
+            # 클라이언트가 그린 시각 ≈ 전송 완료 + 편도 네트워크 + 그리기
+            end_to_end = trace.sent[client_id] + network + render - trace.stamps["captured"]
+            self._observe("end_to_end", end_to_end)
+            segments["end_to_end"] = end_to_end
+        trace.acks[client_id] = segments
+        self._pending.pop(trace_id, None)
+        return True
+    
+    def _expire(self) -> None:
+        deadline = self._clock() - self.ACK_TIMEOUT
+        while self._pending:
+            trace = next(iter(self._pending.values()))
+            if trace.stamps.get("received", 0.0) >= deadline:
+                break
+            self._pending.popitem(last=False)
+    
+    # ========================================
+    # 조회
+    # ========================================
+    
+    @staticmethod
+    def _distribution(samples: Deque[float]) -> dict:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        count = len(ordered)
+        
+        def percentile(q: float) -> float:
+            return round(ordered[min(count - 1, int(q / 100.0 * count))] * 1000, 2)
+        
+        return {
+            "count": count,
+            "mean_ms": round(sum(ordered) / count * 1000, 2),
+            "p50_ms": percentile(50),
+            "p90_ms": percentile(90),
+            "p99_ms": percentile(99),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+    
+    def summary(self) -> dict:
+        """구간별 최근 지연 분포 (ms) + 최근 추적"""
+        return {
+            "segments": {name: self._distribution(self._samples[name]) for name in SEGMENTS},
+            "recent": [trace.to_dict() for trace in reversed(self._recent)],
+        }
+    
+    def reset(self) -> None:
+        """표본 초기화 (폴링 간격/감지기 설정을 바꾼 뒤 비교용)"""
+        for samples in self._samples.values():
+            samples.clear()
+        self._recent.clear()
@@ -4,21 +4,30 @@ WebSocket을 통해 GOAL 감지 이벤트를 프론트엔드로 전송
 """
 
 import asyncio
-import json
 import os
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Set
+from typing import Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
-from goal_detector import get_detector, DetectionResult
+from broadcaster import Broadcaster
+from event_store import EventStore
+from lap_analytics import LapAnalytics
+from latency_trace import GoalTrace, LatencyTracker
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics
+from multi_source import DetectionSource, SourceManager, load_source_configs
 from screen_capture import cleanup as cleanup_screen_capture
+from state_store import StateStore
+from static_assets import StaticAssets
+from ws_protocol import negotiate
 
 
 # ========================================
@@ -39,6 +48,8 @@ class AppState(BaseModel):
     """앱 전체 상태"""
     maps: dict[str, MapProgress] = {}
     auto_detect_enabled: bool = True
+    focused_map_id: Optional[str] = None
+    focused_source_id: Optional[str] = None  # 포커스된 맵을 플레이 중인 소스 (None이면 첫 번째 소스)
     session_start_time: str = ""
     total_session_seconds: int = 0
 
@@ -67,88 +78,290 @@ INITIAL_MAPS = {
 
 # 앱 상태
 app_state = AppState(
-    maps=INITIAL_MAPS.copy(),
+    # 상태는 제자리에서 수정하므로 맵 객체까지 복사
+    maps={map_id: map_progress.model_copy() for map_id, map_progress in INITIAL_MAPS.items()},
     session_start_time=datetime.now().isoformat()
 )
 
-# WebSocket 연결 관리
-connected_clients: Set[WebSocket] = set()
+# 버전 관리 (변경분만 state_patch로 전송)
+state_store = StateStore(app_state)
 
-# GOAL 감지 태스크 핸들
-detection_task: asyncio.Task = None
+# 이 시간(초) 안에 들어온 상태 변경은 state_patch 하나로 묶어서 보냄
+STATE_PATCH_WINDOW = 0.05
+state_flush_task: Optional[asyncio.Task] = None
+
+# WebSocket 연결 관리 (클라이언트별 전송 대기열)
+broadcaster = Broadcaster(snapshot_provider=state_store.snapshot)
+
+# 소스별 GOAL 감지 태스크 핸들
+detection_tasks: list[asyncio.Task] = []
+
+# 캡처 소스 (게임 클라이언트별 감지기 + 폴링 스케줄러)
+source_manager: Optional[SourceManager] = None
+
+# 진행 상태 이벤트 로그 (SQLite, 열 수 없으면 None -> 메모리에만)
+event_store: Optional[EventStore] = None
+
+# GOAL 감지 -> 클라이언트 화면까지 구간별 지연
+latency_tracker = LatencyTracker()
+
+# 맵별 완주 시간 기록/집계
+lap_analytics: Optional[LapAnalytics] = None
+
+# 스냅샷에서 제외할 필드 (실행마다 새로 정해지는 값)
+SESSION_FIELDS = {"session_start_time", "total_session_seconds"}
+
+
+# ========================================
+# 메트릭 (/api/metrics, TR_METRICS=0이면 기록 안 함)
+# ========================================
+
+STAGE_SECONDS = metrics.histogram(
+    "tr_detector_stage_seconds", "Detector stage and sub-step time per tick", ("source", "stage")
+)
+TICK_SECONDS = metrics.histogram(
+    "tr_detection_tick_seconds", "Whole detection tick including the worker round trip", ("source",)
+)
+EXECUTOR_DELAY_SECONDS = metrics.histogram(
+    "tr_executor_queue_delay_seconds", "Time a detection job waited before its worker started it", ("source",)
+)
+TICKS_TOTAL = metrics.counter("tr_detection_ticks_total", "Detection ticks run", ("source",))
+COOLDOWN_SKIPS_TOTAL = metrics.counter(
+    "tr_frames_skipped_cooldown_total", "Ticks skipped because the detector was in cooldown", ("source",)
+)
+UNCHANGED_SKIPS_TOTAL = metrics.counter(
+    "tr_frames_skipped_unchanged_total", "Frames skipped because the screen had not changed", ("source",)
+)
+DETECTIONS_TOTAL = metrics.counter("tr_goal_detections_total", "GOAL detections", ("source",))
+DETECTION_ERRORS_TOTAL = metrics.counter("tr_detection_errors_total", "Detection loop errors", ("source",))
+BROADCAST_SECONDS = metrics.histogram(
+    "tr_broadcast_fanout_seconds", "Time to serialise one message and queue it for every client", ("type",)
+)
+CONNECTED_CLIENTS = metrics.gauge("tr_connected_clients", "Connected WebSocket clients")
 
 
 # ========================================
 # WebSocket 브로드캐스트
 # ========================================
 
-async def broadcast_message(message: dict) -> None:
-    """모든 연결된 클라이언트에게 메시지 전송"""
-    if not connected_clients:
-        return
-    
-    message_json = json.dumps(message, ensure_ascii=False)
-    disconnected = set()
+async def broadcast_message(message: dict, on_sent=None) -> None:
+    """
+    모든 연결된 클라이언트에게 메시지 전송
+    클라이언트별 대기열에 넣기만 하므로 느린 클라이언트를 기다리지 않는다
     
-    for client in connected_clients:
-        try:
-            await client.send_text(message_json)
-        except Exception:
-            disconnected.add(client)
+    Args:
+        on_sent: 클라이언트마다 전송이 끝나면 클라이언트 ID로 호출 (지연 추적용)
+    """
+    if not broadcaster.clients:
+        return
     
-    # 연결 끊긴 클라이언트 제거
-    connected_clients.difference_update(disconnected)
+    started = time.perf_counter()
+    broadcaster.broadcast(message, on_sent)
+    BROADCAST_SECONDS.labels(message.get("type", "")).observe(time.perf_counter() - started)
 
 
-async def broadcast_state_update() -> None:
-    """현재 앱 상태를 모든 클라이언트에게 브로드캐스트"""
-    await broadcast_message({
-        "type": "state_update",
-        "data": app_state.model_dump()
-    })
+async def broadcast_state_patch(ops: list[dict]) -> None:
+    """
+    상태 변경분을 모아 두고 STATE_PATCH_WINDOW 뒤에 seq가 붙은 JSON Patch 하나로 브로드캐스트
+    (연타/연속 감지로 들어온 변경이 메시지 하나로 합쳐짐)
+    """
+    global state_flush_task
+    state_store.stage(ops)
+    if state_flush_task is None or state_flush_task.done():
+        state_flush_task = asyncio.create_task(flush_state_patch_later())
 
 
-async def broadcast_goal_detected(map_id: str = None) -> None:
-    """GOAL 감지 이벤트 브로드캐스트"""
-    await broadcast_message({
-        "type": "goal_detected",
-        "data": {
-            "map_id": map_id,
-            "timestamp": datetime.now().isoformat()
-        }
-    })
+async def flush_state_patch_later() -> None:
+    await asyncio.sleep(STATE_PATCH_WINDOW)
+    message = state_store.flush()
+    if message is not None:
+        await broadcast_message(message)
+
+
+# ========================================
+# 이벤트 (상태 변경 + 기록)
+# ========================================
+
+def apply_event(event_type: str, payload: dict) -> list[dict]:
+    """
+    이벤트 하나를 상태에 반영 (실시간 요청과 시작 시 재생이 같은 경로를 씀)
+    
+    Returns:
+        상태 패치 연산 목록 (상태가 바뀌지 않는 이벤트는 빈 목록)
+    """
+    map_id = payload.get("map_id")
+    
+    if event_type == "increment":
+        if map_id not in app_state.maps:
+            return []
+        new_count = app_state.maps[map_id].current_count + 1
+        return [state_store.replace("maps", map_id, "current_count", value=new_count)]
+    
+    if event_type == "reset":
+        if map_id not in app_state.maps:
+            return []
+        return [
+            state_store.replace("maps", map_id, "current_count", value=0),
+            state_store.replace("maps", map_id, "total_time_seconds", value=0)
+        ]
+    
+    if event_type == "map_added":
+        if map_id in app_state.maps:
+            return []
+        new_map = MapProgress(map_id=map_id, map_name=payload["map_name"], category=payload["category"])
+        return [state_store.add("maps", map_id, value=new_map)]
+    
+    if event_type == "auto_detect_toggled":
+        return [state_store.replace("auto_detect_enabled", value=bool(payload["enabled"]))]
+    
+    if event_type == "focus_changed":
+        source_id = payload.get("source_id")
+        ops = []
+        if map_id != app_state.focused_map_id:
+            ops.append(state_store.replace("focused_map_id", value=map_id))
+        if source_id != app_state.focused_source_id:
+            ops.append(state_store.replace("focused_source_id", value=source_id))
+        return ops
+    
+    # goal_detected 등 기록만 하는 이벤트
+    return []
+
+
+def record_event(event_type: str, payload: dict) -> None:
+    """이벤트 로그에 추가 (기다리지 않음) + 필요하면 스냅샷"""
+    if event_store is None:
+        return
+    event_store.append(event_type, payload)
+    if event_store.snapshot_due:
+        event_store.snapshot(app_state.model_dump(exclude=SESSION_FIELDS))
+
+
+async def commit_event(event_type: str, payload: dict) -> list[dict]:
+    """이벤트 반영 + 기록 + 변경분 브로드캐스트"""
+    ops = apply_event(event_type, payload)
+    record_event(event_type, payload)
+    if ops:
+        await broadcast_state_patch(ops)
+    return ops
+
+
+def restore_state() -> None:
+    """최신 스냅샷 + 이후 이벤트 재생으로 진행 상태 복원"""
+    snapshot, events = event_store.load()
+    if snapshot is not None:
+        restored = AppState.model_validate(snapshot)
+        # 코드에 새로 추가된 기본 맵은 그대로 두고 저장된 맵을 덮어씀
+        app_state.maps.update(restored.maps)
+        app_state.auto_detect_enabled = restored.auto_detect_enabled
+        app_state.focused_map_id = restored.focused_map_id
+        app_state.focused_source_id = restored.focused_source_id
+    for event in events:
+        apply_event(event.type, event.payload)
+    print(f"[INFO] Progress restored (snapshot: {snapshot is not None}, replayed events: {len(events)})")
+
+
+async def broadcast_goal_detected(
+    map_id: str = None,
+    source_id: str = None,
+    trace: Optional[GoalTrace] = None
+) -> None:
+    """
+    GOAL 감지 이벤트 브로드캐스트
+    trace가 있으면 trace_id를 붙여 보내고, 클라이언트가 그린 뒤 goal_ack로 돌려준다
+    """
+    data = {
+        "map_id": map_id,
+        "source_id": source_id,
+        "timestamp": datetime.now().isoformat()
+    }
+    on_sent = None
+    if trace is not None:
+        data["trace_id"] = trace.trace_id
+        on_sent = partial(latency_tracker.mark_sent, trace.trace_id)
+    
+    await broadcast_message({"type": "goal_detected", "data": data}, on_sent)
+    if trace is not None:
+        latency_tracker.mark_enqueued(trace)
 
 
 # ========================================
 # GOAL 감지 백그라운드 태스크
 # ========================================
 
-async def goal_detection_loop() -> None:
-    """0.5초마다 화면을 캡처하여 GOAL 감지"""
-    # 템플릿 경로 설정
-    template_path = Path(__file__).parent / "assets" / "goal_template.png"
-    detector = get_detector(str(template_path) if template_path.exists() else None)
+def record_check_metrics(source_id: str, check, submitted_at: float, elapsed: float) -> None:
+    """감지 1회 결과를 메트릭에 기록"""
+    TICKS_TOTAL.labels(source_id).inc()
+    TICK_SECONDS.labels(source_id).observe(elapsed)
+    EXECUTOR_DELAY_SECONDS.labels(source_id).observe(max(0.0, check.started_at - submitted_at))
+    
+    result = check.result
+    if result is None:
+        COOLDOWN_SKIPS_TOTAL.labels(source_id).inc()
+        return
+    if result.skipped:
+        UNCHANGED_SKIPS_TOTAL.labels(source_id).inc()
+    if result.detected:
+        DETECTIONS_TOTAL.labels(source_id).inc()
+    for stage, elapsed_ms in check.timings.items():
+        STAGE_SECONDS.labels(source_id, stage).observe(elapsed_ms / 1000)
+
+
+def focused_source_id() -> Optional[str]:
+    """포커스된 맵을 플레이 중인 소스 (지정이 없거나 없는 소스면 첫 번째 소스)"""
+    sources = source_manager.sources if source_manager else {}
+    if app_state.focused_source_id in sources:
+        return app_state.focused_source_id
+    return next(iter(sources), None)
+
+
+async def goal_detection_loop(source: DetectionSource) -> None:
+    """소스 하나에 대해 스케줄러가 정한 간격으로 GOAL 감지 (감지는 소스 전용 작업자에서)"""
+    scheduler = source.scheduler
     
     while True:
         try:
             # 자동 감지가 활성화된 경우에만 실행
             if app_state.auto_detect_enabled:
-                # 동기 함수를 비동기로 실행
-                result = await asyncio.get_event_loop().run_in_executor(
-                    None, detector.check_for_goal
-                )
+                submitted_at = time.time()
+                started = time.perf_counter()
+                check = await source.check_for_goal()
+                record_check_metrics(source.source_id, check, submitted_at, time.perf_counter() - started)
+                result = check.result
                 
                 if result and result.detected:
-                    print(f"[GOAL DETECTED] Confidence: {result.confidence:.2f}")
-                    await broadcast_goal_detected()
+                    map_id = app_state.focused_map_id
+                    trace = latency_tracker.start(source.source_id, map_id, check.trace)
+                    print(f"[GOAL DETECTED] Source: {source.source_id}, Confidence: {result.confidence:.2f}")
+                    # 포커스된 맵을 플레이하지 않는 소스의 완주는 그 맵 기록에 섞지 않음
+                    lap_map_id = map_id if source.source_id == focused_source_id() else None
+                    lap_seconds = scheduler.record_goal(lap_map_id)
+                    if lap_map_id is None:
+                        lap_seconds = None  # 판 시작 시각만 갱신
+                    if lap_seconds is not None and lap_analytics is not None:
+                        lap_analytics.record_lap(lap_map_id, lap_seconds, result.timestamp, source.source_id)
+                    record_event("goal_detected", {
+                        "map_id": map_id,
+                        "source_id": source.source_id,
+                        "confidence": round(result.confidence, 4),
+                        "lap_seconds": round(lap_seconds, 3) if lap_seconds is not None else None
+                    })
+                    await broadcast_goal_detected(map_id, source.source_id, trace)
             
-            await asyncio.sleep(0.5)
+            # 쿨다운/정지 화면/예상 완주 시간에 맞춰 다음 감지까지 대기
+            await scheduler.wait(
+                active=app_state.auto_detect_enabled,
+                cooldown_remaining=source.cooldown_remaining,
+                idle_seconds=source.idle_seconds,
+                map_id=app_state.focused_map_id
+            )
             
         except asyncio.CancelledError:
             break
         except Exception as e:
-            print(f"[ERROR] Detection loop error: {e}")
+            print(f"[ERROR] Detection loop error ({source.source_id}): {e}")
+            DETECTION_ERRORS_TOTAL.labels(source.source_id).inc()
             await asyncio.sleep(1.0)
+            scheduler.reset_deadline()
 
 
 # ========================================
@@ -158,23 +371,50 @@ async def goal_detection_loop() -> None:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 리소스 관리"""
-    global detection_task
+    global source_manager, event_store, lap_analytics
+    
+    # 시작 시: 프론트엔드 파일 해시/압축
+    static_assets.load()
+    
+    # 저장된 진행 상태 복원 + 이벤트 기록 스레드 시작
+    try:
+        event_store = EventStore()
+        restore_state()
+        event_store.start()
+    except Exception as e:
+        print(f"[WARNING] Progress log unavailable, running in memory only: {e}")
+        event_store = None
     
-    # 시작 시: GOAL 감지 루프 시작
-    detection_task = asyncio.create_task(goal_detection_loop())
+    lap_analytics = LapAnalytics(execute=event_store.execute if event_store else None)
+    if event_store is not None:
+        try:
+            lap_analytics.load()
+        except Exception as e:
+            print(f"[WARNING] Lap analytics load failed: {e}")
+    
+    # 시작 시: 소스별 작업자 + GOAL 감지 루프 시작
+    template_path = Path(__file__).parent / "assets" / "goal_template.png"
+    source_manager = SourceManager(
+        load_source_configs(),
+        template_path=str(template_path) if template_path.exists() else None
+    )
+    for source in source_manager.start():
+        detection_tasks.append(asyncio.create_task(goal_detection_loop(source)))
     print("[INFO] GOAL detection loop started")
     
     yield
     
     # 종료 시: 정리
-    if detection_task:
-        detection_task.cancel()
-        try:
-            await detection_task
-        except asyncio.CancelledError:
-            pass
+    for task in detection_tasks:
+        task.cancel()
+    await asyncio.gather(*detection_tasks, return_exceptions=True)
+    detection_tasks.clear()
     
+    source_manager.shutdown()
     cleanup_screen_capture()
+    
+    if event_store is not None:
+        event_store.close(final_state=app_state.model_dump(exclude=SESSION_FIELDS))
     print("[INFO] Cleanup completed")
 
 
@@ -198,8 +438,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 정적 파일 서빙 (Frontend)
+# 정적 파일 서빙 (Frontend, 시작 시 해시 + 압축본 생성)
 frontend_path = Path(__file__).parent.parent / "frontend"
+static_assets = StaticAssets(frontend_path)
 
 
 # ========================================
@@ -207,30 +448,39 @@ frontend_path = Path(__file__).parent.parent / "frontend"
 # ========================================
 
 @app.get("/")
-async def root():
-    """프론트엔드 페이지 반환"""
-    index_path = frontend_path / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
+async def root(request: Request):
+    """프론트엔드 페이지 반환 (CSS/JS는 해시 URL로 참조)"""
+    asset = static_assets.get("index.html")
+    if asset is not None:
+        return static_assets.respond(asset, request)
     return {"message": "TalesRunner Practice Tracker API"}
 
 
 @app.get("/styles.css")
-async def get_styles():
-    """CSS 파일 반환"""
-    css_path = frontend_path / "styles.css"
-    if css_path.exists():
-        return FileResponse(str(css_path), media_type="text/css")
-    return {"error": "CSS not found"}, 404
+async def get_styles(request: Request):
+    """CSS 파일 반환 (예전 URL, 매번 ETag로 재검증)"""
+    asset = static_assets.get("styles.css")
+    if asset is None:
+        return JSONResponse({"error": "CSS not found"}, status_code=404)
+    return static_assets.respond(asset, request)
 
 
 @app.get("/app.js")
-async def get_app_js():
-    """JS 파일 반환"""
-    js_path = frontend_path / "app.js"
-    if js_path.exists():
-        return FileResponse(str(js_path), media_type="application/javascript")
-    return {"error": "JS not found"}, 404
+async def get_app_js(request: Request):
+    """JS 파일 반환 (예전 URL, 매번 ETag로 재검증)"""
+    asset = static_assets.get("app.js")
+    if asset is None:
+        return JSONResponse({"error": "JS not found"}, status_code=404)
+    return static_assets.respond(asset, request)
+
+
+@app.get("/static/{filename:path}")
+async def get_hashed_asset(filename: str, request: Request):
+    """내용 해시가 들어간 URL (내용이 바뀌면 URL도 바뀌므로 immutable 캐시)"""
+    asset = static_assets.get_hashed(filename)
+    if asset is None:
+        return JSONResponse({"error": "Asset not found"}, status_code=404)
+    return static_assets.respond(asset, request, immutable=True)
 
 
 @app.get("/api/state")
@@ -239,50 +489,121 @@ async def get_state():
     return app_state.model_dump()
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    CONNECTED_CLIENTS.set(len(broadcaster.clients))
+    broadcaster.update_metrics()
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/latency")
+async def get_latency():
+    """GOAL 감지 지연 분포 (캡처 -> 분석 -> 전송 -> 클라이언트 그리기, 구간별 ms)"""
+    return latency_tracker.summary()
+
+
+@app.post("/api/latency/reset")
+async def reset_latency():
+    """지연 표본 초기화 (폴링 간격/감지기 설정을 바꾼 뒤 비교할 때)"""
+    latency_tracker.reset()
+    return {"success": True}
+
+
+@app.get("/api/sources")
+async def get_sources():
+    """캡처 소스별 상태 조회"""
+    sources = source_manager.sources.values() if source_manager else []
+    return {
+        "sources": [
+            {
+                "source_id": source.source_id,
+                "backend": source.config.backend,
+                "cooldown_remaining": source.cooldown_remaining,
+                "idle_seconds": source.idle_seconds,
+                "last_timings": source.last_check.timings if source.last_check else {},
+            }
+            for source in sources
+        ]
+    }
+
+
+@app.get("/api/laps")
+async def get_lap_summaries(days: int = 30):
+    """기록이 있는 모든 맵의 완주 시간 요약"""
+    try:
+        LapAnalytics.check_days(days)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {"maps": lap_analytics.summaries(days) if lap_analytics else []}
+
+
+@app.get("/api/laps/{map_id}")
+async def get_lap_summary(map_id: str, days: int = 30, percentiles: str = "50,90,95"):
+    """맵 하나의 최고/평균/중앙값/백분위 (최근 days일)"""
+    try:
+        LapAnalytics.check_days(days)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        quantiles = [float(q) for q in percentiles.split(",") if q.strip()]
+    except ValueError:
+        return JSONResponse({"error": f"Invalid percentiles: {percentiles}"}, status_code=400)
+    if not all(0 <= q <= 100 for q in quantiles):
+        return JSONResponse({"error": "Percentiles must be between 0 and 100"}, status_code=400)
+    if lap_analytics is None:
+        return {"map_id": map_id, "days": days, "count": 0}
+    return lap_analytics.summary(map_id, days, quantiles)
+
+
+@app.get("/api/laps/{map_id}/trend")
+async def get_lap_trend(map_id: str, days: int = 28, period: str = "day"):
+    """기간별 (day | week) 완주 시간 추이"""
+    try:
+        LapAnalytics.check_days(days)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if lap_analytics is None:
+        return {"map_id": map_id, "period": period, "points": []}
+    try:
+        return lap_analytics.trend(map_id, days, period)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.get("/api/laps/{map_id}/history")
+async def get_lap_history(map_id: str, limit: int = 50):
+    """최근 완주 기록 원본"""
+    if lap_analytics is None or event_store is None:
+        return {"map_id": map_id, "laps": []}
+    laps = await asyncio.to_thread(lap_analytics.history, map_id, limit)
+    return {"map_id": map_id, "laps": laps}
+
+
 @app.post("/api/maps/{map_id}/increment")
 async def increment_count(map_id: str):
     """맵 완주 카운트 +1"""
     if map_id not in app_state.maps:
-        return {"error": "Map not found"}, 404
-    
-    current_map = app_state.maps[map_id]
-    updated_map = MapProgress(
-        **{
-            **current_map.model_dump(),
-            "current_count": current_map.current_count + 1
-        }
-    )
-    app_state.maps[map_id] = updated_map
+        return JSONResponse({"error": "Map not found"}, status_code=404)
     
-    await broadcast_state_update()
-    return {"success": True, "new_count": updated_map.current_count}
+    await commit_event("increment", {"map_id": map_id})
+    return {"success": True, "new_count": app_state.maps[map_id].current_count}
 
 
 @app.post("/api/maps/{map_id}/reset")
 async def reset_count(map_id: str):
     """맵 완주 카운트 리셋"""
     if map_id not in app_state.maps:
-        return {"error": "Map not found"}, 404
-    
-    current_map = app_state.maps[map_id]
-    updated_map = MapProgress(
-        **{
-            **current_map.model_dump(),
-            "current_count": 0,
-            "total_time_seconds": 0
-        }
-    )
-    app_state.maps[map_id] = updated_map
+        return JSONResponse({"error": "Map not found"}, status_code=404)
     
-    await broadcast_state_update()
+    await commit_event("reset", {"map_id": map_id})
     return {"success": True}
 
 
 @app.post("/api/auto-detect/toggle")
 async def toggle_auto_detect():
     """자동 GOAL 감지 토글"""
-    app_state.auto_detect_enabled = not app_state.auto_detect_enabled
-    await broadcast_state_update()
+    await commit_event("auto_detect_toggled", {"enabled": not app_state.auto_detect_enabled})
     return {"auto_detect_enabled": app_state.auto_detect_enabled}
 
 
@@ -292,16 +613,9 @@ async def add_custom_map(map_name: str, category: str = "custom"):
     map_id = f"custom_{map_name.replace(' ', '_').lower()}"
     
     if map_id in app_state.maps:
-        return {"error": "Map already exists"}, 400
+        return JSONResponse({"error": "Map already exists"}, status_code=400)
     
-    new_map = MapProgress(
-        map_id=map_id,
-        map_name=map_name,
-        category=category
-    )
-    app_state.maps[map_id] = new_map
-    
-    await broadcast_state_update()
+    await commit_event("map_added", {"map_id": map_id, "map_name": map_name, "category": category})
     return {"success": True, "map_id": map_id}
 
 
@@ -311,22 +625,26 @@ async def add_custom_map(map_name: str, category: str = "custom"):
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket 연결 처리"""
-    await websocket.accept()
-    connected_clients.add(websocket)
-    print(f"[WS] Client connected. Total: {len(connected_clients)}")
+    """
+    WebSocket 연결 처리
+    서브프로토콜 tr.msgpack.v1을 제시하면 msgpack 바이너리, 아니면 JSON 텍스트
+    """
+    codec = negotiate(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=codec.subprotocol)
+    client = broadcaster.add(websocket, codec)
+    print(f"[WS] Client connected ({codec.name}). Total: {len(broadcaster.clients)}")
     
     try:
-        # 연결 시 현재 상태 전송
-        await websocket.send_text(json.dumps({
-            "type": "state_update",
-            "data": app_state.model_dump()
-        }, ensure_ascii=False))
+        # 연결 시 현재 상태 전송 (이후로는 state_patch만 받음)
+        broadcaster.send(client, state_store.snapshot())
         
         # 클라이언트 메시지 수신 대기
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            data = received.get("bytes")
+            message = codec.decode(data if data is not None else received.get("text", ""))
             
             # 메시지 타입별 처리
             if message.get("type") == "increment":
@@ -342,12 +660,34 @@ async def websocket_endpoint(websocket: WebSocket):
             elif message.get("type") == "toggle_auto_detect":
                 await toggle_auto_detect()
                 
+            elif message.get("type") == "goal_ack":
+                # goal_detected를 받아 화면에 그리기까지 걸린 시간 (클라이언트 기준 ms)
+                trace_id = message.get("trace_id")
+                render_ms = message.get("render_ms")
+                if trace_id and isinstance(render_ms, (int, float)):
+                    latency_tracker.ack(str(trace_id), client.client_id, float(render_ms))
+                
+            elif message.get("type") == "request_snapshot":
+                # 클라이언트가 seq 누락을 발견한 경우 전체 상태를 다시 보냄
+                broadcaster.send(client, state_store.snapshot())
+                
+            elif message.get("type") == "focus":
+                # 포커스된 맵 (감지 간격 조절 + GOAL 이벤트에 사용)
+                # 프론트엔드에서만 만든 커스텀 맵도 있으므로 ID는 검사하지 않음
+                # source_id: 그 맵을 플레이 중인 소스 (없으면 첫 번째 소스, 완주 시간은 이 소스만 기록)
+                map_id = message.get("map_id") or None
+                source_id = message.get("source_id") or None
+                if map_id != app_state.focused_map_id or source_id != app_state.focused_source_id:
+                    await commit_event("focus_changed", {"map_id": map_id, "source_id": source_id})
+                    for source in (source_manager.sources.values() if source_manager else []):
+                        source.scheduler.record_focus_change()
+                
     except WebSocketDisconnect:
-        connected_clients.discard(websocket)
-        print(f"[WS] Client disconnected. Total: {len(connected_clients)}")
+        await broadcaster.remove(client)
+        print(f"[WS] Client disconnected. Total: {len(broadcaster.clients)}")
     except Exception as e:
         print(f"[WS ERROR] {e}")
-        connected_clients.discard(websocket)
+        await broadcaster.remove(client)
 
 
 # ========================================
@@ -0,0 +1,297 @@
+"""
+메트릭 모듈
+감지 단계별 소요 시간, 틱/감지 횟수, 브로드캐스트 시간 등을 모아서
+Prometheus 텍스트 형식으로 내보냄 (/api/metrics)
+
+TR_METRICS=0 (또는 off/false)이면 모든 기록이 아무것도 하지 않는 no-op이 된다.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# 기본 히스토그램 구간 (초): 0.5ms ~ 2.5s
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metrics_enabled_from_env() -> bool:
+    return os.environ.get("TR_METRICS", "1").strip().lower() not in ("0", "off", "false", "no")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ========================================
+# 메트릭 값
+# ========================================
+
+class _CounterValue:
+    def __init__(self):
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeValue:
+    def __init__(self):
+        self.value = 0.0
+    
+    def set(self, value: float) -> None:
+        self.value = value
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        # 구간 수가 적어서 선형 탐색이 bisect보다 빠르다
+        index = 0
+        for bound in self.buckets:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+    
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class _NoopValue:
+    """메트릭을 끈 경우 모든 기록을 무시"""
+    
+    def inc(self, amount: float = 1.0) -> None:
+        pass
+    
+    def dec(self, amount: float = 1.0) -> None:
+        pass
+    
+    def set(self, value: float) -> None:
+        pass
+    
+    def observe(self, value: float) -> None:
+        pass
+    
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        yield
+    
+    def labels(self, *values: str, **kwargs: str) -> "_NoopValue":
+        return self
+
+
+_NOOP = _NoopValue()
+
+
+# ========================================
+# 메트릭 (라벨별 값 묶음)
+# ========================================
+
+class _Metric:
+    """
+    이름 + 라벨 이름이 같은 값들의 묶음
+    
+    라벨이 없으면 메트릭 자체에 inc/set/observe를 호출하고,
+    있으면 labels(...)로 라벨 값별 값을 얻어서 호출한다.
+    """
+    
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _new_value(self):
+        raise NotImplementedError
+    
+    def labels(self, *values: str, **kwargs: str):
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.label_names)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        value = self._values.get(values)
+        if value is None:
+            with self._lock:
+                value = self._values.setdefault(values, self._new_value())
+        return value
+    
+    def _unlabelled(self):
+        return self.labels()
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for label_values, value in sorted(self._values.items()):
+            lines.extend(self._render_value(label_values, value))
+        return lines
+    
+    def _render_value(self, label_values: Tuple[str, ...], value) -> List[str]:
+        labels = _format_labels(self.label_names, label_values)
+        return [f"{self.name}{labels} {_format_value(value.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_value(self) -> _CounterValue:
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    
+    def _new_value(self) -> _GaugeValue:
+        return _GaugeValue()
+    
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+    
+    def time(self):
+        return self._unlabelled().time()
+    
+    def _render_value(self, label_values: Tuple[str, ...], value: _HistogramValue) -> List[str]:
+        lines = []
+        cumulative = 0
+        bounds = list(value.buckets) + [math.inf]
+        for bound, count in zip(bounds, value.counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, label_values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value.sum)}")
+        lines.append(f"{self.name}_count{labels} {value.count}")
+        return lines
+
+
+# ========================================
+# 레지스트리
+# ========================================
+
+class MetricsRegistry:
+    """
+    메트릭 등록/출력
+    
+    같은 이름으로 다시 요청하면 기존 메트릭을 돌려준다.
+    비활성화 상태면 no-op 객체를 돌려주므로 기록 비용이 거의 없다.
+    """
+    
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = _metrics_enabled_from_env() if enabled is None else enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name: str, documentation: str, label_names: Sequence[str], **kwargs):
+        if not self.enabled:
+            return _NOOP
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, label_names, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+    
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+    
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, label_names)
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+    
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 출력"""
+        if not self.enabled:
+            return "# metrics disabled (TR_METRICS=0)\n"
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 서버 전체에서 쓰는 레지스트리
+registry = MetricsRegistry()
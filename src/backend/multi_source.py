@@ -0,0 +1,270 @@
+"""
+다중 캡처 소스 관리 모듈
+게임 클라이언트 여러 개를 한 트래커에서 감지:
+1. 소스마다 캡처 백엔드 + GoalDetector (쿨다운/화면 변화 상태 독립)
+2. 소스마다 전용 작업자 1개 (소스가 여러 개면 프로세스, 하나면 스레드)
+   -> 감지기 상태는 작업자 안에만 있고, 감지 작업은 코어 수만큼 병렬로 돈다
+3. 소스 설정은 sources.json (없으면 주 모니터 하나)
+
+sources.json 예시:
+    {
+        "sources": [
+            {"id": "client1", "backend": "region", "left": 0, "top": 0, "width": 1280, "height": 720},
+            {"id": "client2", "backend": "region", "left": 1280, "top": 0, "width": 1280, "height": 720},
+            {"id": "obs", "backend": "shared_memory", "name": "talesrunner-frames"}
+        ]
+    }
+
+감지기 옵션 (소스별, 선택):
+    "tracking": true         후보를 찾으면 다음 틱부터 그 주변 창만 캡처/분석
+    "confirm_frames": 2      연속 2프레임 감지되어야 GOAL 확정
+
+해상도별 보정 프로필 (calibration.py로 생성)이 있으면 소스 ID로 찾아서 자동 적용
+"""
+
+import asyncio
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from capture_backends import (
+    CaptureBackend,
+    ImageSequenceBackend,
+    MssMonitorBackend,
+    MssRegionBackend,
+    SharedMemoryBackend,
+    VideoBackend,
+)
+from calibration import ProfileStore
+from goal_detector import DetectionResult, GoalDetector
+from scheduler import PollingScheduler
+
+
+# 기본 설정 파일 위치
+DEFAULT_SOURCES_PATH = Path(__file__).parent / "sources.json"
+PRIMARY_SOURCE_ID = "primary"
+
+
+@dataclass
+class SourceConfig:
+    """캡처 소스 설정"""
+    source_id: str
+    backend: str = "monitor"    # monitor | region | video | images | shared_memory
+    options: dict = field(default_factory=dict)  # 백엔드 생성 인자
+    roi: Optional[List[float]] = None            # 캡처 ROI 비율 (left, top, right, bottom)
+    use_roi: bool = True
+    tracking: bool = False                       # 후보 추적 모드 (GoalDetector use_tracking)
+    confirm_frames: int = 1                      # 연속 감지 확정 횟수
+
+
+@dataclass
+class SourceCheck:
+    """작업자가 돌려주는 감지 결과 + 스케줄링에 필요한 감지기 상태"""
+    source_id: str
+    result: Optional[DetectionResult]
+    cooldown_remaining: float
+    idle_seconds: float
+    timings: Dict[str, float]
+    started_at: float = 0.0     # 작업자가 작업을 시작한 시각 (time.time, 대기열 지연 계산용)
+    trace: Dict[str, float] = field(default_factory=dict)  # 캡처/분석 시각 (GoalDetector.last_trace)
+
+
+def load_source_configs(path: Path = DEFAULT_SOURCES_PATH) -> List[SourceConfig]:
+    """
+    소스 설정 읽기 (파일이 없으면 주 모니터 하나)
+    
+    Raises:
+        ValueError: 설정 형식 오류 (ID 누락/중복)
+    """
+    if not path.exists():
+        return [SourceConfig(source_id=PRIMARY_SOURCE_ID)]
+    
+    data = json.loads(path.read_text(encoding="utf-8"))
+    configs = []
+    for entry in data.get("sources", []):
+        entry = dict(entry)
+        source_id = entry.pop("id", None)
+        if not source_id:
+            raise ValueError(f"Source without id in {path}")
+        configs.append(SourceConfig(
+            source_id=source_id,
+            backend=entry.pop("backend", "monitor"),
+            roi=entry.pop("roi", None),
+            use_roi=entry.pop("use_roi", True),
+            tracking=entry.pop("tracking", False),
+            confirm_frames=entry.pop("confirm_frames", 1),
+            options=entry
+        ))
+    
+    ids = [config.source_id for config in configs]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate source id in {path}")
+    return configs or [SourceConfig(source_id=PRIMARY_SOURCE_ID)]
+
+
+def create_backend(config: SourceConfig) -> CaptureBackend:
+    """소스 설정 -> 캡처 백엔드"""
+    options = config.options
+    if config.backend == "monitor":
+        return MssMonitorBackend(**options)
+    if config.backend == "region":
+        return MssRegionBackend(**options)
+    if config.backend == "video":
+        return VideoBackend(**options)
+    if config.backend == "images":
+        return ImageSequenceBackend(**options)
+    if config.backend == "shared_memory":
+        return SharedMemoryBackend(**options)
+    raise ValueError(f"Unknown capture backend: {config.backend}")
+
+
+# ========================================
+# 작업자 쪽 (프로세스/스레드 안에서 실행)
+# ========================================
+
+# 감지 요청이 이보다 오래 끊기면 캡처 스레드를 멈춤
+# 기본 감지 간격보다 길어야 평상시 틱 사이에 멈췄다가 동기 캡처를 기다리지 않는다
+# (쿨다운/정지 화면 백오프/자동 감지 OFF에서만 멈춤)
+CAPTURE_LINGER = PollingScheduler.BASE_INTERVAL * 2
+
+# 작업자 안의 소스별 감지기 (프로세스 작업자는 자기 소스 하나만 가진다)
+_worker_detectors: Dict[str, GoalDetector] = {}
+
+
+def _init_worker(config: SourceConfig, template_path: Optional[str], capture_interval: float) -> None:
+    """작업자 초기화: 감지기 생성 (소스 이름의 보정 프로필 사용) + 캡처 전용 스레드 시작
+    
+    캡처 스레드는 감지 요청(lease)이 CAPTURE_LINGER 안에 있을 때만 capture_interval로 캡처하므로
+    쿨다운/정지 화면 백오프/자동 감지 OFF 동안에는 캡처도 멈춘다.
+    """
+    detector = GoalDetector(
+        template_path,
+        roi=tuple(config.roi) if config.roi else None,
+        use_roi=config.use_roi,
+        capture_backend=create_backend(config),
+        use_tracking=config.tracking,
+        confirm_frames=config.confirm_frames,
+        profile_provider=ProfileStore(config.source_id).get
+    )
+    detector.start_capture_thread(interval=capture_interval, linger=CAPTURE_LINGER)
+    _worker_detectors[config.source_id] = detector
+
+
+def _worker_check(source_id: str) -> SourceCheck:
+    """작업자에서 감지 1회"""
+    started_at = time.time()
+    detector = _worker_detectors[source_id]
+    result = detector.check_for_goal()
+    return SourceCheck(
+        source_id=source_id,
+        result=result,
+        cooldown_remaining=detector.cooldown_remaining,
+        idle_seconds=detector.idle_seconds,
+        timings=dict(detector.last_timings),
+        started_at=started_at,
+        trace=dict(detector.last_trace) if result is not None else {}
+    )
+
+
+def _worker_stage_stats(source_id: str) -> Dict[str, dict]:
+    return _worker_detectors[source_id].get_stage_stats()
+
+
+def _worker_shutdown(source_id: str) -> None:
+    """캡처 스레드 정지 + 백엔드 정리"""
+    detector = _worker_detectors.pop(source_id, None)
+    if detector is None:
+        return
+    detector.stop_capture_thread()
+    detector.capture_backend.close()
+
+
+# ========================================
+# 서버 쪽
+# ========================================
+
+class DetectionSource:
+    """
+    캡처 소스 하나 (서버 쪽 핸들)
+    
+    감지기는 전용 작업자 안에 있고, 여기서는 작업 요청과 스케줄링만 한다.
+    """
+    
+    def __init__(self, config: SourceConfig, executor: Executor):
+        self.config = config
+        self.scheduler = PollingScheduler()
+        self.last_check: Optional[SourceCheck] = None
+        self._executor = executor
+    
+    @property
+    def source_id(self) -> str:
+        return self.config.source_id
+    
+    async def check_for_goal(self) -> SourceCheck:
+        loop = asyncio.get_running_loop()
+        self.last_check = await loop.run_in_executor(self._executor, _worker_check, self.source_id)
+        return self.last_check
+    
+    async def get_stage_stats(self) -> Dict[str, dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _worker_stage_stats, self.source_id)
+    
+    @property
+    def cooldown_remaining(self) -> float:
+        return self.last_check.cooldown_remaining if self.last_check else 0.0
+    
+    @property
+    def idle_seconds(self) -> float:
+        return self.last_check.idle_seconds if self.last_check else 0.0
+    
+    def shutdown(self) -> None:
+        try:
+            self._executor.submit(_worker_shutdown, self.source_id).result(timeout=5.0)
+        except Exception as e:
+            print(f"[WARNING] Source {self.source_id} shutdown failed: {e}")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SourceManager:
+    """소스 목록과 소스별 작업자 관리"""
+    
+    def __init__(
+        self,
+        configs: List[SourceConfig],
+        template_path: Optional[str] = None,
+        capture_interval: float = PollingScheduler.FAST_INTERVAL
+    ):
+        self._configs = configs
+        self._template_path = template_path
+        self._capture_interval = capture_interval
+        self.sources: Dict[str, DetectionSource] = {}
+    
+    def start(self) -> List[DetectionSource]:
+        """
+        소스별 작업자 시작
+        
+        소스가 하나면 프로세스를 띄울 이유가 없으므로 스레드 작업자를 쓴다.
+        """
+        use_processes = len(self._configs) > 1
+        for config in self._configs:
+            initargs = (config, self._template_path, self._capture_interval)
+            if use_processes:
+                executor = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=initargs)
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"detector-{config.source_id}",
+                    initializer=_init_worker, initargs=initargs
+                )
+            self.sources[config.source_id] = DetectionSource(config, executor)
+        
+        kind = "process" if use_processes else "thread"
+        print(f"[INFO] {len(self.sources)} capture source(s) started ({kind} workers)")
+        return list(self.sources.values())
+    
+    def shutdown(self) -> None:
+        for source in self.sources.values():
+            source.shutdown()
+        self.sources.clear()
@@ -0,0 +1,160 @@
+"""
+GOAL 감지 폴링 스케줄러
+고정 0.5초 sleep 대신 마감 시각 기준으로 다음 감지 시점을 정함:
+1. 드리프트 없는 고정 마감 시각
+2. 쿨다운 동안은 감지하지 않고 대기
+3. 화면이 오래 멈춰 있으면 감지 간격을 늘림
+4. 포커스된 맵의 평소 완주 시간 근처에서는 감지 간격을 줄임
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+
+class PollingScheduler:
+    """
+    적응형 폴링 스케줄러
+    
+    완주 시간은 연속된 GOAL 사이 간격으로 맵별 지수 이동 평균을 낸다.
+    (GOAL 후 프론트엔드가 다음 맵으로 포커스를 옮기므로,
+    GOAL 시점에 포커스된 맵의 완주 시간 = 직전 GOAL 이후 경과 시간)
+    """
+    
+    BASE_INTERVAL = 0.5         # 기본 감지 간격
+    FAST_INTERVAL = 0.25        # 예상 완주 시간 근처 감지 간격
+    IDLE_INTERVAL = 2.0         # 정지 화면 / 자동 감지 OFF 감지 간격
+    IDLE_AFTER_SECONDS = 30.0   # 이 시간 이상 화면 변화가 없으면 IDLE
+    
+    FINISH_WINDOW_RATIO = 0.25  # 예상 완주 시간 ±25% 구간에서 빠르게 감지
+    LAP_EMA_ALPHA = 0.3         # 완주 시간 이동 평균 가중치
+    LAP_MIN_SECONDS = 5.0       # 이보다 짧은 간격은 완주로 보지 않음
+    LAP_MAX_SECONDS = 30 * 60.0 # 이보다 긴 간격은 연습 중단으로 보고 무시
+    FOCUS_AFTER_GOAL_GRACE = 5.0  # GOAL 직후 자동 포커스 이동은 새 판 시작으로 보지 않음
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._deadline: Optional[float] = None
+        self._lap_estimates: Dict[str, float] = {}
+        self._last_goal_at: Optional[float] = None
+        self._run_started_at: Optional[float] = None
+    
+    def record_goal(self, map_id: Optional[str]) -> Optional[float]:
+        """
+        GOAL 감지 기록 (포커스된 맵의 완주 시간 갱신)
+        
+        Returns:
+            이번 완주 시간 (초), 유효하지 않으면 None
+        """
+        now = self._clock()
+        lap = None
+        # 판 시작 시각 = 직전 GOAL 또는 그 뒤 사용자가 포커스를 바꾼 시각
+        started_at = self._run_started_at if self._run_started_at is not None else self._last_goal_at
+        if started_at is not None:
+            elapsed = now - started_at
+            if self.LAP_MIN_SECONDS <= elapsed <= self.LAP_MAX_SECONDS:
+                lap = elapsed
+        
+        if lap is not None and map_id:
+            previous = self._lap_estimates.get(map_id)
+            if previous is None:
+                self._lap_estimates[map_id] = lap
+            else:
+                self._lap_estimates[map_id] = previous + self.LAP_EMA_ALPHA * (lap - previous)
+        
+        self._last_goal_at = now
+        self._run_started_at = now
+        return lap
+    
+    def record_focus_change(self) -> None:
+        """사용자가 직접 포커스를 바꾸면 그 시점부터 새 판으로 본다"""
+        now = self._clock()
+        if self._last_goal_at is not None and now - self._last_goal_at < self.FOCUS_AFTER_GOAL_GRACE:
+            return
+        self._run_started_at = now
+    
+    def expected_lap(self, map_id: Optional[str]) -> Optional[float]:
+        """맵별 예상 완주 시간 (기록이 없으면 None)"""
+        return self._lap_estimates.get(map_id) if map_id else None
+    
+    def next_interval(
+        self,
+        *,
+        active: bool,
+        cooldown_remaining: float = 0.0,
+        idle_seconds: float = 0.0,
+        map_id: Optional[str] = None
+    ) -> float:
+        """
+        다음 감지까지 대기 시간 계산
+        
+        Args:
+            active: 자동 감지 활성화 여부
+            cooldown_remaining: 감지기 쿨다운 남은 시간
+            idle_seconds: 화면 변화가 없었던 시간
+            map_id: 포커스된 맵 ID
+        """
+        if not active:
+            return self.IDLE_INTERVAL
+        
+        # 쿨다운 중에는 감지해도 None이므로 끝날 때까지 대기
+        if cooldown_remaining > 0:
+            return max(cooldown_remaining, self.FAST_INTERVAL)
+        
+        # 예상 완주 시간 근처면 빠르게
+        expected = self.expected_lap(map_id)
+        if expected is not None and self._run_started_at is not None:
+            elapsed = self._clock() - self._run_started_at
+            window = expected * self.FINISH_WINDOW_RATIO
+            if expected - window <= elapsed <= expected + window:
+                return self.FAST_INTERVAL
+        
+        # 오래 멈춘 화면 (로비/메뉴/일시정지)
+        if idle_seconds >= self.IDLE_AFTER_SECONDS:
+            return self.IDLE_INTERVAL
+        
+        return self.BASE_INTERVAL
+    
+    async def wait(
+        self,
+        *,
+        active: bool,
+        cooldown_remaining: float = 0.0,
+        idle_seconds: float = 0.0,
+        map_id: Optional[str] = None
+    ) -> float:
+        """
+        다음 감지 시점까지 대기 (인자는 next_interval과 동일)
+        
+        이전 마감 시각 + 간격까지 기다리므로 처리 시간만큼 주기가 밀리지 않는다.
+        이미 마감이 지났으면 (처리가 늦어진 경우) 밀린 틱은 버리고 바로 반환.
+        쿨다운 대기는 쿨다운이 끝나는 시각에 정확히 맞춘다.
+        
+        Returns:
+            이번에 적용한 감지 간격 (초)
+        """
+        interval = self.next_interval(
+            active=active,
+            cooldown_remaining=cooldown_remaining,
+            idle_seconds=idle_seconds,
+            map_id=map_id
+        )
+        now = self._clock()
+        
+        if self._deadline is None:
+            self._deadline = now
+        if active and cooldown_remaining > 0:
+            self._deadline = now + interval
+        else:
+            self._deadline += interval
+        
+        if self._deadline <= now:
+            self._deadline = now
+            await asyncio.sleep(0)
+        else:
+            await asyncio.sleep(self._deadline - now)
+        return interval
+    
+    def reset_deadline(self) -> None:
+        """다음 wait부터 현재 시각 기준으로 다시 시작 (오류 복구 후 등)"""
+        self._deadline = None
@@ -1,23 +1,39 @@
 """
 화면 캡처 모듈
-mss 라이브러리를 사용하여 게임 화면을 캡처하는 유틸리티
+캡처 백엔드(기본: mss 주 모니터)로 게임 화면을 캡처하는 유틸리티
 """
 
-import mss
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+
 import numpy as np
 from PIL import Image
-from typing import Optional
 
-# 싱글톤 패턴으로 mss 인스턴스 관리
-_sct: Optional[mss.mss] = None
+from capture_backends import CaptureBackend, MssMonitorBackend
+
+# 기본 백엔드 (주 모니터). mss 인스턴스는 백엔드가 스레드별로 관리
+_default_backend: Optional[MssMonitorBackend] = None
+
+
+def get_default_backend() -> MssMonitorBackend:
+    """주 모니터 캡처 백엔드를 반환 (싱글톤)"""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = MssMonitorBackend(monitor_index=1)
+    return _default_backend
 
 
-def get_screen_capture_instance() -> mss.mss:
-    """mss 인스턴스를 반환 (싱글톤)"""
-    global _sct
-    if _sct is None:
-        _sct = mss.mss()
-    return _sct
+def get_primary_monitor() -> Dict[str, int]:
+    """
+    주 모니터의 위치와 크기를 반환
+    
+    Returns:
+        dict: left, top, width, height (가상 화면 기준 좌표)
+    """
+    return get_default_backend().get_monitor()
 
 
 def capture_primary_monitor() -> np.ndarray:
@@ -27,14 +43,8 @@ def capture_primary_monitor() -> np.ndarray:
     Returns:
         np.ndarray: BGR 형식의 이미지 배열 (OpenCV 호환)
     """
-    sct = get_screen_capture_instance()
-    # monitor[1]은 주 모니터
-    monitor = sct.monitors[1]
-    screenshot = sct.grab(monitor)
-    
-    # BGRA -> BGR 변환 (OpenCV 호환)
-    img = np.array(screenshot)
-    return img[:, :, :3]
+    backend = get_default_backend()
+    return backend.grab(backend.get_monitor())
 
 
 def capture_region(left: int, top: int, width: int, height: int) -> np.ndarray:
@@ -50,16 +60,13 @@ def capture_region(left: int, top: int, width: int, height: int) -> np.ndarray:
     Returns:
         np.ndarray: BGR 형식의 이미지 배열
     """
-    sct = get_screen_capture_instance()
     monitor = {
         "left": left,
         "top": top,
         "width": width,
         "height": height
     }
-    screenshot = sct.grab(monitor)
-    img = np.array(screenshot)
-    return img[:, :, :3]
+    return get_default_backend().grab(monitor)
 
 
 def save_screenshot(image: np.ndarray, filepath: str) -> None:
@@ -75,9 +82,214 @@ def save_screenshot(image: np.ndarray, filepath: str) -> None:
     pil_image.save(filepath)
 
 
+# ========================================
+# 캡처 전용 스레드 + 프레임 링 버퍼
+# ========================================
+
+@dataclass
+class CapturedFrame:
+    """캡처 스레드가 넘겨주는 프레임 (image는 링 버퍼의 뷰)"""
+    image: np.ndarray
+    sequence: int
+    timestamp: float
+    monitor: Dict[str, int]  # 주 모니터 위치/크기
+    rect: Dict[str, int]     # 실제 캡처 영역 (가상 화면 기준)
+    slot: int
+    generation: int
+
+
+class CaptureThread:
+    """
+    캡처 백엔드로 일정 간격으로 화면을 캡처하는 전용 스레드
+    
+    미리 할당한 BGR 버퍼 여러 개(링)를 돌려 쓰므로 매 프레임 메모리 할당이 없다.
+    캡처 영역이 바뀌어도 (후보 추적 창 등) 더 커질 때만 링을 다시 할당하고,
+    작은 영역은 슬롯 앞부분을 연속 메모리 뷰로 쓴다.
+    소비자는 lease_latest()로 최신 프레임을 빌려 쓰고,
+    빌려간 슬롯은 반납 전까지 덮어쓰지 않는다.
+    
+    캡처는 요청이 있을 때만 한다: 마지막 lease_latest()부터 linger초가 지나면
+    (쿨다운 대기, 정지 화면 백오프, 자동 감지 OFF 등) 캡처를 멈추고,
+    멈춘 뒤 들어온 요청은 새로 캡처한 프레임을 기다려서 받는다.
+    -> 폴링 스케줄러의 감지 간격이 캡처 빈도도 정한다.
+    """
+    
+    LINGER_INTERVALS = 1.5          # linger를 안 주면 캡처 간격의 이 배 (요청 간격이 캡처 간격과 같을 때용)
+    
+    def __init__(
+        self,
+        rect_provider: Optional[Callable[[Dict[str, int]], Dict[str, int]]] = None,
+        interval: float = 0.25,
+        slots: int = 3,
+        backend: Optional[CaptureBackend] = None,
+        linger: Optional[float] = None
+    ):
+        """
+        Args:
+            rect_provider: 모니터 정보 -> 캡처 영역(left/top/width/height) 함수
+                           None이면 모니터 전체
+            interval: 캡처 간격 (초)
+            slots: 링 버퍼 개수 (최소 3: 최신 1 + 대여 1 + 쓰기 1)
+            backend: 캡처 백엔드 (None이면 주 모니터)
+            linger: 마지막 요청 후 캡처를 계속할 시간 (초), None이면 interval x LINGER_INTERVALS
+                    요청하는 쪽의 가장 느린 평상시 간격보다 길게 줘야 틱마다 멈추지 않음
+        """
+        self._backend = backend or get_default_backend()
+        self._rect_provider = rect_provider
+        self._interval = interval
+        self._slots = max(3, slots)
+        self._linger = linger if linger is not None else interval * self.LINGER_INTERVALS
+        
+        self._ring: Optional[np.ndarray] = None  # (슬롯 수, 슬롯 바이트) - 프레임은 앞부분 뷰
+        self._latest: Optional[CapturedFrame] = None
+        self._generation = 0               # 링 재할당 횟수
+        self._leased: Dict[tuple, int] = {}  # (generation, slot) -> 대여 횟수
+        self._sequence = 0
+        
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._demand = threading.Event()   # 멈춘 캡처를 깨우는 요청 신호
+        self._last_demand = time.monotonic()  # 시작 직후 첫 프레임은 미리 캡처
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[Exception] = None
+    
+    def start(self) -> "CaptureThread":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        self._demand.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    @property
+    def is_paused(self) -> bool:
+        """최근 요청이 없어서 캡처를 멈춘 상태"""
+        return time.monotonic() - self._last_demand > self._linger
+    
+    def _run(self) -> None:
+        # mss 백엔드는 이 스레드 전용 mss 인스턴스를 만들어 쓴다
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            if self.is_paused:
+                # clear 후 다시 확인 (그 사이 들어온 요청을 놓치지 않게)
+                self._demand.clear()
+                if self.is_paused:
+                    self._demand.wait()
+                    if self._stop_event.is_set():
+                        break
+                next_time = time.monotonic()
+            
+            try:
+                self._grab_into_ring()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+            
+            next_time += self._interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                # 캡처가 간격보다 오래 걸리면 밀린 틱은 버린다
+                next_time = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+    
+    def _grab_into_ring(self) -> None:
+        """한 프레임 캡처해서 빈 슬롯에 기록"""
+        monitor = self._backend.get_monitor()
+        rect = self._rect_provider(monitor) if self._rect_provider else monitor
+        shape = (rect["height"], rect["width"], 3)
+        size = shape[0] * shape[1] * 3
+        
+        with self._lock:
+            # 슬롯보다 큰 영역이면 링 재할당 (대여 중인 프레임은 예전 배열을 계속 참조)
+            if self._ring is None or self._ring.shape[1] < size:
+                self._ring = np.empty((self._slots, size), dtype=np.uint8)
+                self._generation += 1
+                self._latest = None
+            ring = self._ring
+            generation = self._generation
+            slot = self._pick_free_slot()
+        
+        # 캡처/변환은 락 밖에서 (이 슬롯은 최신도 대여 중도 아님)
+        image = ring[slot, :size].reshape(shape)
+        self._backend.grab(rect, dst=image)
+        
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._sequence += 1
+            self._latest = CapturedFrame(
+                image=image,
+                sequence=self._sequence,
+                timestamp=time.time(),
+                monitor=monitor,
+                rect=dict(rect),
+                slot=slot,
+                generation=generation
+            )
+            self._frame_ready.notify_all()
+    
+    def _pick_free_slot(self) -> int:
+        """최신 프레임/대여 중 슬롯이 아닌 슬롯 (락 안에서 호출)"""
+        latest_slot = self._latest.slot if self._latest else -1
+        start = (latest_slot + 1) % self._slots
+        for i in range(self._slots):
+            slot = (start + i) % self._slots
+            if slot != latest_slot and (self._generation, slot) not in self._leased:
+                return slot
+        # 슬롯 수 >= 3이고 소비자가 하나면 여기 오지 않는다
+        raise RuntimeError("No free capture slot")
+    
+    @contextmanager
+    def lease_latest(self, timeout: float = 1.0) -> Iterator[CapturedFrame]:
+        """
+        최신 프레임을 빌려옴 (with 블록 안에서만 유효)
+        캡처가 멈춰 있었으면 다시 시작하고 새 프레임을 기다린다
+        
+        Raises:
+            TimeoutError: timeout 안에 첫 프레임 또는 멈춘 뒤의 새 프레임이 준비되지 않은 경우
+                          (쿨다운/정지 화면 이전의 프레임은 돌려주지 않음)
+        """
+        with self._lock:
+            # 멈춰 있던 동안의 프레임은 오래됐으므로 새로 캡처한 프레임을 기다림
+            stale = self._latest is None or self.is_paused
+            self._last_demand = time.monotonic()
+            self._demand.set()
+            if stale:
+                seen = self._latest.sequence if self._latest is not None else 0
+                fresh = self._frame_ready.wait_for(
+                    lambda: self._latest is not None and self._latest.sequence > seen, timeout
+                )
+                if not fresh:
+                    raise TimeoutError(f"No fresh captured frame: {self.last_error}")
+            frame = self._latest
+            key = (frame.generation, frame.slot)
+            self._leased[key] = self._leased.get(key, 0) + 1
+        
+        try:
+            yield frame
+        finally:
+            with self._lock:
+                count = self._leased.get(key, 0) - 1
+                if count > 0:
+                    self._leased[key] = count
+                else:
+                    self._leased.pop(key, None)
+
+
 def cleanup() -> None:
-    """mss 인스턴스 정리"""
-    global _sct
-    if _sct is not None:
-        _sct.close()
-        _sct = None
+    """기본 백엔드의 mss 인스턴스 정리"""
+    global _default_backend
+    if _default_backend is not None:
+        _default_backend.close()
+        _default_backend = None
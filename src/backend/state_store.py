@@ -0,0 +1,142 @@
+"""
+버전 관리 상태 모듈
+앱 상태를 제자리에서 바꾸고, 바뀐 부분만 JSON Patch (RFC 6902) 연산으로 기록:
+1. 변경마다 seq가 1씩 올라감 -> 클라이언트는 빠진 seq가 보이면 스냅샷을 다시 요청
+2. 전체 상태 대신 바뀐 값만 보내므로 맵이 늘어도 메시지 크기/CPU가 일정
+3. 모델을 다시 만들고 검증하지 않고 필드에 바로 대입
+4. 짧은 시간 안에 들어온 변경은 stage()로 모았다가 flush()에서 state_patch 하나로 보냄
+   (같은 경로는 마지막 값만 남김 -> 버튼 연타도 메시지 하나)
+
+메시지 형식:
+    {"type": "state_update", "seq": 12, "data": {...전체 상태...}}
+    {"type": "state_patch", "seq": 13, "ops": [{"op": "replace", "path": "/maps/x/current_count", "value": 3}]}
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def escape_pointer_token(token: str) -> str:
+    """JSON Pointer 토큰 이스케이프 (커스텀 맵 ID에 '/', '~'가 들어갈 수 있음)"""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def pointer(*tokens: str) -> str:
+    """토큰 목록 -> JSON Pointer 문자열"""
+    return "".join("/" + escape_pointer_token(str(token)) for token in tokens)
+
+
+def _to_json(value: Any) -> Any:
+    return value.model_dump() if isinstance(value, BaseModel) else value
+
+
+class StateStore:
+    """
+    앱 상태 + 버전
+    
+    replace/add/remove는 상태를 바로 바꾸고 해당 패치 연산을 돌려준다.
+    한 요청에서 나온 연산들을 commit()으로 묶으면 seq가 하나 올라간 state_patch 메시지가 된다.
+    """
+    
+    def __init__(self, state: BaseModel):
+        self.state = state
+        self.seq = 0
+        self._pending: Dict[str, dict] = {}  # 경로 -> 보내지 않은 연산 (삽입 순서 유지)
+    
+    # ========================================
+    # 경로 탐색
+    # ========================================
+    
+    def _resolve_parent(self, tokens: Tuple[str, ...]) -> Tuple[Any, str]:
+        """
+        Raises:
+            KeyError: 경로가 없음
+        """
+        if not tokens:
+            raise KeyError("Empty state path")
+        node: Any = self.state
+        for token in tokens[:-1]:
+            node = self._child(node, token)
+        return node, tokens[-1]
+    
+    @staticmethod
+    def _child(node: Any, token: str) -> Any:
+        if isinstance(node, BaseModel):
+            if token not in type(node).model_fields:
+                raise KeyError(token)
+            return getattr(node, token)
+        return node[token]
+    
+    # ========================================
+    # 변경 (제자리 수정 + 패치 연산)
+    # ========================================
+    
+    def replace(self, *tokens: str, value: Any) -> dict:
+        """기존 값 교체"""
+        parent, key = self._resolve_parent(tokens)
+        if isinstance(parent, BaseModel):
+            if key not in type(parent).model_fields:
+                raise KeyError(key)
+            setattr(parent, key, value)
+        else:
+            if key not in parent:
+                raise KeyError(key)
+            parent[key] = value
+        return {"op": "replace", "path": pointer(*tokens), "value": _to_json(value)}
+    
+    def add(self, *tokens: str, value: Any) -> dict:
+        """딕셔너리에 새 항목 추가 (예: 커스텀 맵)"""
+        parent, key = self._resolve_parent(tokens)
+        parent[key] = value
+        return {"op": "add", "path": pointer(*tokens), "value": _to_json(value)}
+    
+    def remove(self, *tokens: str) -> dict:
+        """딕셔너리 항목 삭제"""
+        parent, key = self._resolve_parent(tokens)
+        del parent[key]
+        return {"op": "remove", "path": pointer(*tokens)}
+    
+    # ========================================
+    # 메시지
+    # ========================================
+    
+    def commit(self, ops: List[dict]) -> dict:
+        """연산 묶음 -> state_patch 메시지 (seq 증가)"""
+        self.seq += 1
+        return {"type": "state_patch", "seq": self.seq, "ops": ops}
+    
+    def stage(self, ops: List[dict]) -> None:
+        """
+        보낼 연산 모으기 (flush()에서 한 번에 보냄)
+        
+        replace/add는 상태 값 그대로라서 같은 경로의 이전 연산은 버려도 결과가 같다.
+        """
+        for op in ops:
+            path = op["path"]
+            previous = self._pending.pop(path, None)
+            if op["op"] == "remove":
+                # 삭제된 항목 아래 경로의 연산은 필요 없음
+                prefix = path + "/"
+                for pending_path in [p for p in self._pending if p.startswith(prefix)]:
+                    del self._pending[pending_path]
+            elif previous is not None and previous["op"] == "add":
+                # 이번 묶음에서 추가된 항목이면 계속 add로 보냄
+                op = {**op, "op": "add"}
+            self._pending[path] = op
+    
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+    
+    def flush(self) -> Optional[dict]:
+        """모아 둔 연산 -> state_patch 메시지 (없으면 None)"""
+        if not self._pending:
+            return None
+        ops = list(self._pending.values())
+        self._pending.clear()
+        return self.commit(ops)
+    
+    def snapshot(self) -> dict:
+        """전체 상태 메시지 (현재 seq 포함)"""
+        return {"type": "state_update", "seq": self.seq, "data": self.state.model_dump()}
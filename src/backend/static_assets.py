@@ -0,0 +1,203 @@
+"""
+정적 파일 서빙 모듈
+frontend/ 파일을 시작할 때 한 번 읽어서:
+1. 내용 해시로 ETag + 해시가 들어간 URL (/static/app.<hash>.js) 생성
+2. gzip / brotli 압축본을 미리 만들어 두고 Accept-Encoding에 맞춰 전송
+3. If-None-Match가 맞으면 304 (본문 없음)
+4. index.html은 해시 URL을 가리키도록 바꿔서 제공
+   -> 해시 URL은 immutable 캐시, index.html / 원래 URL은 매번 ETag로 재검증
+
+brotli는 선택 의존성: 설치되어 있지 않으면 gzip만 쓴다.
+파일을 고치면 서버를 다시 시작해야 반영된다.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 압축본 선호 순서
+ENCODING_PREFERENCE = ("br", "gzip")
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+}
+
+HASHED_PREFIX = "/static/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def _content_type(path: Path) -> str:
+    return CONTENT_TYPES.get(path.suffix) or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {인코딩: q}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+@dataclass
+class StaticAsset:
+    """미리 읽고 압축해 둔 파일 하나"""
+    name: str                       # frontend/ 기준 상대 경로 (예: app.js)
+    content_type: str
+    digest: str                     # 원본 내용 해시 (앞 12자리)
+    variants: Dict[str, bytes] = field(default_factory=dict)  # 인코딩 ("identity"/"gzip"/"br") -> 본문
+    
+    @property
+    def hashed_name(self) -> str:
+        stem, dot, suffix = self.name.rpartition(".")
+        return f"{stem}.{self.digest}.{suffix}" if dot else f"{self.name}.{self.digest}"
+    
+    def etag(self, encoding: str) -> str:
+        # 표현(압축 방식)마다 다른 강한 ETag
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+    
+    def choose_encoding(self, accept_encoding: str) -> str:
+        """받아들이는 압축본 중 q가 가장 높은 것 (같으면 ENCODING_PREFERENCE 순), 없으면 identity"""
+        accepted = _parse_accept_encoding(accept_encoding)
+        best, best_q = "identity", 0.0
+        for encoding in ENCODING_PREFERENCE:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if encoding in self.variants and q > best_q:
+                best, best_q = encoding, q
+        return best
+
+
+class StaticAssets:
+    """frontend/ 파일 캐시 + 응답 생성"""
+    
+    MIN_COMPRESS_SIZE = 512         # 이보다 작은 파일은 압축하지 않음
+    GZIP_LEVEL = 9                  # 시작할 때 한 번만 압축하므로 최고 압축률
+    BROTLI_QUALITY = 11
+    INDEX_NAME = "index.html"
+    
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._assets: Dict[str, StaticAsset] = {}
+        self._hashed: Dict[str, StaticAsset] = {}
+    
+    def load(self) -> None:
+        """파일 읽기 + 해시 + 압축본 생성 (시작 시 한 번)"""
+        self._assets.clear()
+        self._hashed.clear()
+        if not self.root.is_dir():
+            print(f"[WARNING] Frontend folder not found: {self.root}")
+            return
+        
+        paths = sorted(p for p in self.root.rglob("*") if p.is_file())
+        # index.html은 다른 파일의 해시 URL이 필요하므로 마지막에
+        paths.sort(key=lambda p: p.name == self.INDEX_NAME)
+        for path in paths:
+            name = path.relative_to(self.root).as_posix()
+            body = path.read_bytes()
+            if name == self.INDEX_NAME:
+                body = self._rewrite_index(body)
+            asset = self._build_asset(name, _content_type(path), body)
+            self._assets[name] = asset
+            self._hashed[asset.hashed_name] = asset
+        
+        sizes = ", ".join(
+            f"{name} {len(a.variants['identity'])}->{min(len(v) for v in a.variants.values())}B"
+            for name, a in self._assets.items()
+        )
+        print(f"[INFO] Static assets ready ({sizes})")
+    
+    def _build_asset(self, name: str, content_type: str, body: bytes) -> StaticAsset:
+        asset = StaticAsset(
+            name=name,
+            content_type=content_type,
+            digest=hashlib.sha256(body).hexdigest()[:12],
+            variants={"identity": body}
+        )
+        if len(body) < self.MIN_COMPRESS_SIZE:
+            return asset
+        # 압축해서 더 작아지는 경우만 보관
+        compressed = gzip.compress(body, compresslevel=self.GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            asset.variants["gzip"] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=self.BROTLI_QUALITY)
+            if len(compressed) < len(body):
+                asset.variants["br"] = compressed
+        return asset
+    
+    def _rewrite_index(self, body: bytes) -> bytes:
+        """index.html의 로컬 파일 참조 (href="styles.css" 등)를 해시 URL로 교체"""
+        html = body.decode("utf-8")
+        
+        def replace(match: re.Match) -> str:
+            asset = self._assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group(1)}="{HASHED_PREFIX}{asset.hashed_name}"'
+        
+        return re.sub(r'\b(href|src)="([^":/?#]+(?:/[^":?#]+)*)"', replace, html).encode("utf-8")
+    
+    # ========================================
+    # 조회
+    # ========================================
+    
+    def get(self, name: str) -> Optional[StaticAsset]:
+        return self._assets.get(name)
+    
+    def get_hashed(self, hashed_name: str) -> Optional[StaticAsset]:
+        return self._hashed.get(hashed_name)
+    
+    # ========================================
+    # 응답
+    # ========================================
+    
+    @staticmethod
+    def respond(asset: StaticAsset, request: Request, immutable: bool = False) -> Response:
+        """
+        Accept-Encoding에 맞는 압축본 응답, If-None-Match가 맞으면 304
+        
+        Args:
+            immutable: 해시 URL 요청이면 True (1년 immutable 캐시)
+        """
+        encoding = asset.choose_encoding(request.headers.get("accept-encoding", ""))
+        etag = asset.etag(encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE,
+            "Vary": "Accept-Encoding",
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # 약한 비교 (W/ 접두사 무시), 어느 압축본의 ETag든 내용은 같다
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in candidates or candidates & {asset.etag(e) for e in asset.variants}:
+                return Response(status_code=304, headers=headers)
+        
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.variants[encoding], media_type=asset.content_type, headers=headers)
@@ -0,0 +1,245 @@
+"""
+GOAL 템플릿 매칭 모듈
+assets/goal_template.png를 여러 크기로 미리 만들어 두고 (디스크 캐시)
+색상 단계가 찾은 후보 박스 주변에서만 매칭해서 GOAL 여부를 확인
+"""
+
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+# 템플릿 피라미드 디스크 캐시 위치
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "templates"
+
+
+class TemplateMatcher:
+    """
+    다중 크기 GOAL 템플릿 매처
+    
+    템플릿 이미지 안의 GOAL 글자 영역(text_bbox)이 색상 단계의 후보 박스와
+    같은 크기가 되도록 맞춘 크기들을 피라미드로 만든다.
+    매칭은 후보 박스 주변 창에서만, MATCH_DOWNSCALE로 줄인 흑백 이미지로 한다.
+    """
+    
+    # 피라미드 설정: GOAL 너비가 화면 너비의 width_range (기본 WIDTH_RANGE) 안에 있다고 보고
+    # SCALE_STEP 배 간격으로 템플릿 크기를 만든다
+    WIDTH_RANGE = (0.15, 0.7)
+    SCALE_STEP = 1.08
+    MATCH_DOWNSCALE = 4             # 매칭 해상도 (원본의 1/4)
+    TEXT_MARGIN_RATIO = 0.1         # 글자 영역 바깥으로 포함할 여유 (글자 박스 대비)
+    
+    # 매칭 설정
+    MATCH_THRESHOLD = 0.55          # TM_CCOEFF_NORMED 점수 기준
+    SCALE_TOLERANCE = 0.15          # 후보 너비 대비 사용할 템플릿 크기 범위 (±15%)
+    CACHE_VERSION = 1
+    
+    def __init__(
+        self,
+        template: np.ndarray,
+        text_bbox: Optional[Tuple[int, int, int, int]] = None,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        width_range: Optional[Tuple[float, float]] = None
+    ):
+        """
+        Args:
+            template: BGR 템플릿 이미지
+            text_bbox: 템플릿 안의 GOAL 글자 영역 (x, y, w, h), None이면 전체
+            cache_dir: 피라미드 디스크 캐시 폴더 (None이면 메모리에만)
+            width_range: 화면 너비 대비 GOAL 너비 범위 (None이면 WIDTH_RANGE)
+        """
+        height, width = template.shape[:2]
+        self._text_bbox = text_bbox or (0, 0, width, height)
+        self._cache_dir = cache_dir
+        self._width_range = tuple(width_range or self.WIDTH_RANGE)
+        
+        # 글자 영역 + 여유만 잘라서 흑백으로 보관
+        x, y, w, h = self._text_bbox
+        margin_x = int(w * self.TEXT_MARGIN_RATIO)
+        margin_y = int(h * self.TEXT_MARGIN_RATIO)
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1, y1 = min(width, x + w + margin_x), min(height, y + h + margin_y)
+        self._crop_origin = (x - x0, y - y0)  # 잘라낸 이미지 안의 글자 영역 원점
+        self._template_gray = cv2.cvtColor(
+            np.ascontiguousarray(template[y0:y1, x0:x1]), cv2.COLOR_BGR2GRAY
+        )
+        
+        self._hash = hashlib.sha1(
+            template.tobytes() + np.array(self._text_bbox, dtype=np.int64).tobytes()
+        ).hexdigest()[:16]
+        
+        self._pyramid: Optional[List[Tuple[int, np.ndarray]]] = None
+        self._pyramid_screen: Optional[Tuple[int, int]] = None
+    
+    @classmethod
+    def from_file(
+        cls,
+        template_path: str,
+        text_bbox: Optional[Tuple[int, int, int, int]] = None,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        width_range: Optional[Tuple[float, float]] = None
+    ) -> Optional["TemplateMatcher"]:
+        """파일에서 템플릿 로드 (읽을 수 없으면 None)"""
+        template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+        if template is None:
+            return None
+        return cls(template, text_bbox, cache_dir, width_range)
+    
+    @property
+    def width_range(self) -> Tuple[float, float]:
+        return self._width_range
+    
+    def set_width_range(self, width_range: Optional[Tuple[float, float]]) -> None:
+        """GOAL 너비 범위 변경 (해상도별 보정 프로필), 바뀌면 피라미드를 다시 만듦"""
+        width_range = tuple(width_range or self.WIDTH_RANGE)
+        if width_range != self._width_range:
+            self._width_range = width_range
+            self._pyramid = None
+            self._pyramid_screen = None
+    
+    # ========================================
+    # 템플릿 피라미드
+    # ========================================
+    
+    def get_pyramid(self, screen_size: Tuple[int, int]) -> List[Tuple[int, np.ndarray]]:
+        """
+        화면 해상도에 맞는 템플릿 피라미드
+        
+        Returns:
+            [(글자 영역 너비 (원본 해상도 px), 축소된 흑백 템플릿)] - 너비 오름차순
+        """
+        if self._pyramid is not None and self._pyramid_screen == screen_size:
+            return self._pyramid
+        
+        pyramid = self._load_cached_pyramid(screen_size)
+        if pyramid is None:
+            pyramid = self._build_pyramid(screen_size)
+            self._save_cached_pyramid(screen_size, pyramid)
+        
+        self._pyramid = pyramid
+        self._pyramid_screen = screen_size
+        return pyramid
+    
+    def _build_pyramid(self, screen_size: Tuple[int, int]) -> List[Tuple[int, np.ndarray]]:
+        screen_width = screen_size[0]
+        text_width = self._text_bbox[2]
+        min_width = screen_width * self._width_range[0]
+        max_width = screen_width * self._width_range[1]
+        
+        pyramid = []
+        level_width = min_width
+        while level_width <= max_width * self.SCALE_STEP:
+            # 글자 영역이 level_width가 되도록 맞춘 뒤 매칭 해상도로 축소
+            scale = level_width / text_width / self.MATCH_DOWNSCALE
+            height, width = self._template_gray.shape
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            resized = cv2.resize(self._template_gray, size, interpolation=cv2.INTER_AREA)
+            pyramid.append((int(round(level_width)), resized))
+            level_width *= self.SCALE_STEP
+        return pyramid
+    
+    def _cache_path(self, screen_size: Tuple[int, int]) -> Optional[Path]:
+        if self._cache_dir is None:
+            return None
+        width, height = screen_size
+        min_ratio, max_ratio = self._width_range
+        return self._cache_dir / (
+            f"goal_{self._hash}_{width}x{height}_v{self.CACHE_VERSION}"
+            f"_d{self.MATCH_DOWNSCALE}_s{self.SCALE_STEP}_w{min_ratio:g}-{max_ratio:g}.npz"
+        )
+    
+    def _load_cached_pyramid(self, screen_size: Tuple[int, int]) -> Optional[List[Tuple[int, np.ndarray]]]:
+        path = self._cache_path(screen_size)
+        if path is None or not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                widths = data["widths"]
+                return [(int(widths[i]), data[f"level_{i}"]) for i in range(len(widths))]
+        except Exception as e:
+            print(f"[WARNING] Template cache load failed: {e}")
+            return None
+    
+    def _save_cached_pyramid(self, screen_size: Tuple[int, int], pyramid: List[Tuple[int, np.ndarray]]) -> None:
+        path = self._cache_path(screen_size)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            levels = {f"level_{i}": level for i, (_, level) in enumerate(pyramid)}
+            np.savez_compressed(path, widths=np.array([w for w, _ in pyramid]), **levels)
+        except OSError as e:
+            print(f"[WARNING] Template cache save failed: {e}")
+    
+    # ========================================
+    # 매칭
+    # ========================================
+    
+    def match(
+        self,
+        image: np.ndarray,
+        screen_size: Tuple[int, int],
+        offset: Tuple[int, int],
+        bbox: Tuple[int, int, int, int]
+    ) -> Tuple[float, Optional[Tuple[int, int, int, int]]]:
+        """
+        후보 박스 주변에서 템플릿 매칭
+        
+        Args:
+            image: BGR 이미지 (ROI 또는 화면 전체)
+            screen_size: 전체 화면 크기 (w, h)
+            offset: image 원점의 화면 기준 좌표
+            bbox: 색상 단계 후보 박스 (x, y, w, h), 화면 기준
+        
+        Returns:
+            (최고 점수, 매칭된 글자 영역 (x, y, w, h) 화면 기준) - 매칭 불가면 (0.0, None)
+        """
+        x, y, w, h = bbox
+        levels = [
+            (level_width, level) for level_width, level in self.get_pyramid(screen_size)
+            if w / (1 + self.SCALE_TOLERANCE) <= level_width <= w * (1 + self.SCALE_TOLERANCE)
+        ]
+        if not levels:
+            return 0.0, None
+        
+        # 가장 큰 템플릿 + 위치 오차만큼 여유를 둔 창
+        down = self.MATCH_DOWNSCALE
+        text_width = self._text_bbox[2]
+        max_scale = max(level_width for level_width, _ in levels) / text_width
+        template_height, template_width = self._template_gray.shape
+        pad_x = int((template_width - text_width) * max_scale) + w // 8
+        pad_y = int((template_height - self._text_bbox[3]) * max_scale) + h // 2
+        
+        image_height, image_width = image.shape[:2]
+        offset_x, offset_y = offset
+        x0 = max(0, x - offset_x - pad_x)
+        y0 = max(0, y - offset_y - pad_y)
+        x1 = min(image_width, x - offset_x + w + pad_x)
+        y1 = min(image_height, y - offset_y + h + pad_y)
+        if x1 <= x0 or y1 <= y0:
+            return 0.0, None
+        
+        window = cv2.cvtColor(np.ascontiguousarray(image[y0:y1, x0:x1]), cv2.COLOR_BGR2GRAY)
+        window = cv2.resize(
+            window, (max(1, (x1 - x0) // down), max(1, (y1 - y0) // down)),
+            interpolation=cv2.INTER_AREA
+        )
+        
+        best_score = 0.0
+        best_bbox = None
+        for level_width, level in levels:
+            if level.shape[0] > window.shape[0] or level.shape[1] > window.shape[1]:
+                continue
+            scores = cv2.matchTemplate(window, level, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+            if score > best_score:
+                scale = level_width / text_width
+                text_x = x0 + offset_x + match_x * down + int(self._crop_origin[0] * scale)
+                text_y = y0 + offset_y + match_y * down + int(self._crop_origin[1] * scale)
+                best_score = float(score)
+                best_bbox = (text_x, text_y, level_width, int(self._text_bbox[3] * scale))
+        
+        return best_score, best_bbox
@@ -0,0 +1,94 @@
+"""
+WebSocket 메시지 형식 모듈
+연결할 때 클라이언트가 제시한 서브프로토콜로 형식을 정함:
+    (없음)          JSON 텍스트 (기존 브라우저 UI)
+    tr.msgpack.v1   msgpack 바이너리 + 짧은 키
+
+짧은 키는 메시지 봉투와 패치 연산에만 적용한다.
+상태 데이터 (data, value) 안의 키는 맵 ID 같은 사용자 값이라 그대로 둔다.
+
+msgpack은 선택 의존성: 설치되어 있지 않으면 JSON만 제공한다.
+"""
+
+import json
+from typing import Any, Dict, Optional, Sequence, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+MSGPACK_SUBPROTOCOL = "tr.msgpack.v1"
+
+# 긴 키 -> 짧은 키
+SHORT_KEYS = {
+    "type": "t",
+    "seq": "s",
+    "data": "d",
+    "ops": "o",
+    "op": "p",
+    "path": "h",
+    "value": "v",
+    "map_id": "m",
+    "source_id": "r",
+    "timestamp": "ts",
+}
+LONG_KEYS = {short: long for long, short in SHORT_KEYS.items()}
+
+
+def _shorten(message: Dict[str, Any]) -> Dict[str, Any]:
+    short = {SHORT_KEYS.get(key, key): value for key, value in message.items()}
+    ops = message.get("ops")
+    if ops is not None:
+        short["o"] = [{SHORT_KEYS.get(key, key): value for key, value in op.items()} for op in ops]
+    return short
+
+
+def _lengthen(message: Dict[str, Any]) -> Dict[str, Any]:
+    return {LONG_KEYS.get(key, key): value for key, value in message.items()}
+
+
+class JsonCodec:
+    """JSON 텍스트 (기본)"""
+    
+    name = "json"
+    subprotocol: Optional[str] = None
+    
+    def encode(self, message: dict) -> str:
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+    
+    def decode(self, data: Union[str, bytes]) -> dict:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """msgpack 바이너리 + 짧은 키"""
+    
+    name = "msgpack"
+    subprotocol = MSGPACK_SUBPROTOCOL
+    
+    def encode(self, message: dict) -> bytes:
+        return msgpack.packb(_shorten(message), use_bin_type=True)
+    
+    def decode(self, data: Union[str, bytes]) -> dict:
+        if isinstance(data, str):
+            # 바이너리 프로토콜에서도 텍스트 JSON은 받아 줌 (디버깅용)
+            return json.loads(data)
+        return _lengthen(msgpack.unpackb(data, raw=False))
+
+
+JSON_CODEC = JsonCodec()
+MSGPACK_CODEC = MsgpackCodec() if msgpack is not None else None
+
+
+def negotiate(offered: Sequence[str]):
+    """
+    클라이언트가 제시한 서브프로토콜 중 지원하는 것 선택
+    
+    Returns:
+        코덱 (codec.subprotocol을 accept()에 넘김), 맞는 게 없으면 JSON
+    """
+    if MSGPACK_CODEC is not None and MSGPACK_SUBPROTOCOL in offered:
+        return MSGPACK_CODEC
+    return JSON_CODEC
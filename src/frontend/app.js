@@ -38,11 +38,40 @@ const AppState = {
     // 목표 횟수 수정 대상
     editingMapId: null,
 
+    // 서버 상태 사본 (state_update로 받고 state_patch로 갱신)
+    serverState: null,
+    serverSeq: null,
+    snapshotRequested: false,
+
     ws: null,
     timerInterval: null,
     tabTimerInterval: null
 };
 
+// 맵 카드 DOM 캐시 (map_id -> 카드 요소 + 마지막으로 그린 값)
+const mapCards = new Map();
+
+// 다음 프레임에 한 번에 처리할 DOM 갱신 (키 -> 함수)
+const frameTasks = new Map();
+let frameRequested = false;
+
+// ========================================
+// 프레임 단위 DOM 갱신
+// ========================================
+
+function scheduleFrame(key, task) {
+    // 같은 키는 마지막 것만 실행, 탭이 숨겨져 있으면 실행되지 않음
+    frameTasks.set(key, task);
+    if (frameRequested) return;
+    frameRequested = true;
+    requestAnimationFrame(() => {
+        frameRequested = false;
+        const tasks = Array.from(frameTasks.values());
+        frameTasks.clear();
+        tasks.forEach(task => task());
+    });
+}
+
 // ========================================
 // WebSocket 연결
 // ========================================
@@ -61,10 +90,15 @@ function connectWebSocket() {
         console.log('[WS] Connected');
         document.body.classList.add('ws-connected');
         showToast('서버 연결됨', 'success');
+        syncFocusToServer();
     };
 
     AppState.ws.onclose = () => {
         console.log('[WS] Disconnected');
+        // 다시 연결하면 스냅샷부터 받음
+        AppState.serverState = null;
+        AppState.serverSeq = null;
+        AppState.snapshotRequested = false;
         document.body.classList.remove('ws-connected');
         setTimeout(connectWebSocket, 3000);
     };
@@ -82,24 +116,115 @@ function connectWebSocket() {
 function handleWebSocketMessage(message) {
     switch (message.type) {
         case 'state_update':
-            // 서버 상태와 로컬 상태 병합
-            if (message.data && message.data.maps) {
-                Object.keys(message.data.maps).forEach(mapId => {
-                    if (!AppState.maps[mapId]) {
-                        AppState.maps[mapId] = message.data.maps[mapId];
-                    }
-                });
-            }
-            renderMaps();
-            updateStats();
+            // 전체 상태 (연결 직후 또는 스냅샷 요청 응답)
+            AppState.serverState = message.data || {};
+            AppState.serverSeq = message.seq ?? null;
+            AppState.snapshotRequested = false;
+            mergeServerMaps();
+            break;
+
+        case 'state_patch':
+            handleStatePatch(message);
             break;
 
-        case 'goal_detected':
-            handleGoalDetected();
+        case 'goal_detected': {
+            const receivedAt = performance.now();
+            // 카드를 실제로 갱신한 경우에만 지연 추적 응답
+            if (handleGoalDetected()) {
+                acknowledgeGoal(message.data, receivedAt);
+            }
             break;
+        }
     }
 }
 
+// GOAL 지연 추적: 카드가 화면에 그려진 뒤 받은 시점부터 걸린 시간을 서버에 알림
+function acknowledgeGoal(data, receivedAt) {
+    // 숨겨진 탭은 그리기가 멈춰 있으므로 응답하지 않음
+    if (!data || !data.trace_id || document.hidden) return;
+
+    // rAF 콜백은 그리기 직전, 그 뒤 setTimeout은 그리기 직후에 실행됨
+    requestAnimationFrame(() => setTimeout(() => {
+        if (AppState.ws && AppState.ws.readyState === WebSocket.OPEN) {
+            AppState.ws.send(JSON.stringify({
+                type: 'goal_ack',
+                trace_id: data.trace_id,
+                render_ms: performance.now() - receivedAt
+            }));
+        }
+    }, 0));
+}
+
+// ========================================
+// 서버 상태 동기화 (seq + JSON Patch)
+// ========================================
+
+function handleStatePatch(message) {
+    // 스냅샷을 아직 못 받았거나 이미 반영한 seq는 무시
+    if (!AppState.serverState || AppState.serverSeq === null || message.seq <= AppState.serverSeq) {
+        return;
+    }
+
+    // seq가 빠졌으면 (대기열에서 버려진 경우 등) 전체 상태를 다시 요청
+    if (message.seq !== AppState.serverSeq + 1) {
+        requestSnapshot();
+        return;
+    }
+
+    try {
+        message.ops.forEach(op => applyPatchOp(AppState.serverState, op));
+    } catch (e) {
+        console.log('[WS] Patch failed, requesting snapshot', e);
+        requestSnapshot();
+        return;
+    }
+    AppState.serverSeq = message.seq;
+    mergeServerMaps();
+}
+
+function requestSnapshot() {
+    if (AppState.snapshotRequested) return;
+    if (AppState.ws && AppState.ws.readyState === WebSocket.OPEN) {
+        AppState.snapshotRequested = true;
+        AppState.ws.send(JSON.stringify({ type: 'request_snapshot' }));
+    }
+}
+
+function applyPatchOp(target, op) {
+    // JSON Pointer -> 토큰 ('~1' = '/', '~0' = '~')
+    const tokens = op.path.split('/').slice(1)
+        .map(token => token.replace(/~1/g, '/').replace(/~0/g, '~'));
+    const key = tokens.pop();
+    const parent = tokens.reduce((node, token) => {
+        if (node === null || typeof node !== 'object' || !(token in node)) {
+            throw new Error(`Invalid patch path: ${op.path}`);
+        }
+        return node[token];
+    }, target);
+
+    if (op.op === 'add' || op.op === 'replace') {
+        parent[key] = op.value;
+    } else if (op.op === 'remove') {
+        delete parent[key];
+    } else {
+        throw new Error(`Unsupported patch op: ${op.op}`);
+    }
+}
+
+function mergeServerMaps() {
+    // 서버 상태와 로컬 상태 병합 (로컬에 없는 맵만 추가)
+    const serverMaps = AppState.serverState && AppState.serverState.maps;
+    if (serverMaps) {
+        Object.keys(serverMaps).forEach(mapId => {
+            if (!AppState.maps[mapId]) {
+                AppState.maps[mapId] = { ...serverMaps[mapId] };
+            }
+        });
+    }
+    renderMaps();
+    updateStats();
+}
+
 // ========================================
 // 오프라인 모드 초기화
 // ========================================
@@ -257,6 +382,13 @@ function focusMap(mapId) {
     saveToLocalStorage();
 }
 
+// 서버에 포커스된 맵 알림 (GOAL 감지 간격 조절용)
+function syncFocusToServer() {
+    if (AppState.ws && AppState.ws.readyState === WebSocket.OPEN) {
+        AppState.ws.send(JSON.stringify({ type: 'focus', map_id: AppState.focusedMapId }));
+    }
+}
+
 function updateFocusIndicator() {
     const nameEl = document.getElementById('focusMapName');
     const indicatorEl = document.getElementById('focusIndicator');
@@ -269,20 +401,23 @@ function updateFocusIndicator() {
         nameEl.textContent = '-';
         indicatorEl.classList.remove('active');
     }
+
+    syncFocusToServer();
 }
 
 // ========================================
 // GOAL 감지 처리
 // ========================================
 
+// 포커스된 맵 카드를 갱신했으면 true
 function handleGoalDetected() {
     if (!AppState.focusedMapId) {
         showToast('포커스된 맵이 없습니다', 'warning');
-        return;
+        return false;
     }
 
     const map = AppState.maps[AppState.focusedMapId];
-    if (!map) return;
+    if (!map) return false;
 
     // 카운트 증가
     incrementMapCount(AppState.focusedMapId);
@@ -291,6 +426,7 @@ function handleGoalDetected() {
 
     // 다음 맵으로 이동
     setTimeout(moveToNextMap, 500);
+    return true;
 }
 
 // ========================================
@@ -313,6 +449,14 @@ function renderMaps() {
 
     const filteredMaps = getFilteredMaps();
 
+    // 삭제된 맵의 카드는 캐시에서도 제거
+    mapCards.forEach((entry, mapId) => {
+        if (!AppState.maps[mapId]) {
+            entry.el.remove();
+            mapCards.delete(mapId);
+        }
+    });
+
     if (filteredMaps.length === 0) {
         grid.innerHTML = `
             <div class="empty-state">
@@ -323,8 +467,76 @@ function renderMaps() {
         return;
     }
 
-    grid.innerHTML = filteredMaps.map(map => createMapCard(map)).join('');
-    attachCardEventListeners();
+    const emptyState = grid.querySelector('.empty-state');
+    if (emptyState) emptyState.remove();
+
+    // 키(map_id)별로 카드를 재사용하고 바뀐 부분만 고침, 순서가 다를 때만 이동
+    const visible = new Set();
+    let previous = null;
+    filteredMaps.forEach(map => {
+        visible.add(map.map_id);
+        const entry = syncMapCard(map);
+        const expected = previous ? previous.nextElementSibling : grid.firstElementChild;
+        if (expected !== entry.el) {
+            grid.insertBefore(entry.el, expected);
+        }
+        previous = entry.el;
+    });
+
+    // 다른 탭 카드는 떼어 두기만 함 (탭을 다시 열면 재사용)
+    mapCards.forEach((entry, mapId) => {
+        if (!visible.has(mapId)) entry.el.remove();
+    });
+}
+
+function syncMapCard(map) {
+    const isFocused = map.map_id === AppState.focusedMapId;
+    const isCompleted = map.current_count >= map.target_count;
+    // 포커스/완료/이름이 바뀌면 카드 구조가 달라지므로 새로 만듦
+    const structureKey = `${isFocused}|${isCompleted}|${map.map_name}|${map.category}`;
+
+    let entry = mapCards.get(map.map_id);
+    if (!entry || entry.structureKey !== structureKey) {
+        const template = document.createElement('template');
+        template.innerHTML = createMapCard(map).trim();
+        const el = template.content.firstElementChild;
+        if (entry) entry.el.replaceWith(el);
+
+        entry = {
+            el,
+            structureKey,
+            count: map.current_count,
+            target: map.target_count,
+            time: map.practice_time || 0,
+            countEl: el.querySelector('.progress-header span:last-child'),
+            fillEl: el.querySelector('.progress-fill'),
+            timeText: el.querySelector('.practice-time').lastChild,
+            decrementBtn: el.querySelector('[data-action="decrement"]')
+        };
+        mapCards.set(map.map_id, entry);
+        return entry;
+    }
+
+    // 카운트/목표가 바뀐 경우만 진행도 갱신
+    if (entry.count !== map.current_count || entry.target !== map.target_count) {
+        entry.count = map.current_count;
+        entry.target = map.target_count;
+        entry.countEl.textContent = `${map.current_count} / ${map.target_count}`;
+        entry.fillEl.style.width = `${Math.min((map.current_count / map.target_count) * 100, 100)}%`;
+        const canDecrement = map.current_count > 0;
+        entry.decrementBtn.disabled = !canDecrement;
+        entry.decrementBtn.style.opacity = canDecrement ? '' : '0.3';
+    }
+
+    updateCardTime(entry, map);
+    return entry;
+}
+
+function updateCardTime(entry, map) {
+    const time = map.practice_time || 0;
+    if (entry.time === time) return;
+    entry.time = time;
+    entry.timeText.nodeValue = ` ${formatTime(time)}`;
 }
 
 function createMapCard(map) {
@@ -382,42 +594,29 @@ function createMapCard(map) {
     `;
 }
 
-function attachCardEventListeners() {
-    // -1
-    document.querySelectorAll('[data-action="decrement"]').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            e.stopPropagation();
-            decrementMapCount(btn.closest('.map-card').dataset.mapId);
-        });
-    });
-
-    // 완주 +1
-    document.querySelectorAll('[data-action="increment"]').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            e.stopPropagation();
-            incrementMapCount(btn.closest('.map-card').dataset.mapId);
-        });
-    });
+// 카드 버튼 동작 (data-action -> 처리 함수)
+const CARD_ACTIONS = {
+    decrement: decrementMapCount,
+    increment: incrementMapCount,
+    reset: resetMapCount,
+    delete: deleteMap
+};
 
-    // 리셋
-    document.querySelectorAll('[data-action="reset"]').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            e.stopPropagation();
-            resetMapCount(btn.closest('.map-card').dataset.mapId);
-        });
-    });
+function setupMapGridEvents() {
+    // 그리드 하나에 리스너 하나 (카드를 다시 그려도 다시 붙일 필요 없음)
+    document.getElementById('mapGrid').addEventListener('click', (e) => {
+        const card = e.target.closest('.map-card');
+        if (!card) return;
 
-    // 삭제
-    document.querySelectorAll('[data-action="delete"]').forEach(btn => {
-        btn.addEventListener('click', (e) => {
-            e.stopPropagation();
-            deleteMap(btn.closest('.map-card').dataset.mapId);
-        });
-    });
+        const mapId = card.dataset.mapId;
+        const actionBtn = e.target.closest('[data-action]');
+        if (actionBtn) {
+            if (!actionBtn.disabled) CARD_ACTIONS[actionBtn.dataset.action](mapId);
+            return;
+        }
 
-    // 카드 클릭 = 포커스
-    document.querySelectorAll('.map-card').forEach(card => {
-        card.addEventListener('click', () => focusMap(card.dataset.mapId));
+        // 카드 클릭 = 포커스
+        focusMap(mapId);
     });
 }
 
@@ -600,7 +799,8 @@ function updateStats() {
 function startSessionTimer() {
     AppState.sessionStartTime = new Date();
 
-    // 세션 타이머
+    // 세션 타이머 (표시는 다음 프레임에 다른 타이머와 함께)
+    const sessionTimerEl = document.getElementById('sessionTimer');
     AppState.timerInterval = setInterval(() => {
         const elapsed = Math.floor((new Date() - AppState.sessionStartTime) / 1000);
 
@@ -608,22 +808,28 @@ function startSessionTimer() {
         const m = String(Math.floor((elapsed % 3600) / 60)).padStart(2, '0');
         const s = String(elapsed % 60).padStart(2, '0');
 
-        document.getElementById('sessionTimer').textContent = `${h}:${m}:${s}`;
+        scheduleFrame('sessionTimer', () => { sessionTimerEl.textContent = `${h}:${m}:${s}`; });
     }, 1000);
 
     // 탭별 타이머 (현재 탭만 증가) + 포커스된 맵 시간 증가
     AppState.tabTimerInterval = setInterval(() => {
         AppState.tabTimers[AppState.currentTab]++;
 
-        // 포커스된 맵 시간 증가
-        if (AppState.focusedMapId && AppState.maps[AppState.focusedMapId]) {
-            AppState.maps[AppState.focusedMapId] = {
-                ...AppState.maps[AppState.focusedMapId],
-                practice_time: (AppState.maps[AppState.focusedMapId].practice_time || 0) + 1
+        // 포커스된 맵 시간 증가 (해당 카드의 시간 글자만 갱신)
+        const focusedId = AppState.focusedMapId;
+        if (focusedId && AppState.maps[focusedId]) {
+            AppState.maps[focusedId] = {
+                ...AppState.maps[focusedId],
+                practice_time: (AppState.maps[focusedId].practice_time || 0) + 1
             };
+            scheduleFrame('focusedCardTime', () => {
+                const entry = mapCards.get(focusedId);
+                const map = AppState.maps[focusedId];
+                if (entry && map) updateCardTime(entry, map);
+            });
         }
 
-        updateTabTimers();
+        scheduleFrame('tabTimers', updateTabTimers);
 
         // 10초마다 저장
         if (AppState.tabTimers[AppState.currentTab] % 10 === 0) {
@@ -638,8 +844,11 @@ function updateTabTimers() {
         const m = String(Math.floor(seconds / 60)).padStart(2, '0');
         const s = String(seconds % 60).padStart(2, '0');
 
+        // 아이콘은 그대로 두고 글자 노드만 교체
         const el = document.getElementById(`${tab}Timer`);
-        if (el) {
+        if (el && el.lastChild && el.lastChild.nodeType === Node.TEXT_NODE) {
+            el.lastChild.nodeValue = ` ${m}:${s}`;
+        } else if (el) {
             el.innerHTML = `<i class="fa-solid fa-stopwatch"></i> ${m}:${s}`;
         }
     });
@@ -836,6 +1045,7 @@ function initApp() {
     setupSettingsModal();
     setupResetAllBtn();
     setupEditTargetModal();
+    setupMapGridEvents();
     startSessionTimer();
     updateTabTimers();
     updateFocusIndicator();